@@ -0,0 +1,62 @@
+"""Add notification_intents (queued fusion auto-notifications)
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+UTC_NOW = sa.text("timezone('UTC', now())")
+
+
+def upgrade() -> None:
+    intent_status = postgresql.ENUM(
+        'pending', 'sending', 'sent', 'skipped', 'failed', name='notificationintentstatus'
+    )
+    # Shared with notification_templates / notification_dispatches.
+    notification_type = postgresql.ENUM(name='notificationtype', create_type=False)
+
+    op.create_table(
+        'notification_intents',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('location_id', sa.Integer(), nullable=False),
+        sa.Column('type', notification_type, nullable=False),
+        sa.Column('status', intent_status, nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error_message', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=UTC_NOW, nullable=False),
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_notification_intents_status_created_at',
+        'notification_intents',
+        ['status', 'created_at'],
+    )
+    op.create_index(
+        'ix_notification_intents_location_type_processed_at',
+        'notification_intents',
+        ['location_id', 'type', 'processed_at'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_intents_location_type_processed_at', table_name='notification_intents')
+    op.drop_index('ix_notification_intents_status_created_at', table_name='notification_intents')
+    op.drop_table('notification_intents')
+    op.execute('DROP TYPE IF EXISTS notificationintentstatus')
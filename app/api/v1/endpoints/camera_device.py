@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from app.services import camera_device_service
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.api.v1.dependencies import require_auth
+from app.models import CameraROI
+
+router = APIRouter(prefix="/camera-devices", tags=["camera-devices"])
+
+
+@router.get("/{id}/roi", response_model=CameraROI | None, dependencies=[Depends(require_auth)])
+async def get_camera_roi(id: int = 1, db: AsyncSession = Depends(get_db)) -> CameraROI | None:
+    return await camera_device_service.get_roi(db=db, camera_device_id=id)
+
+
+@router.put("/{id}/roi", response_model=CameraROI, dependencies=[Depends(require_auth)])
+async def update_camera_roi(roi: CameraROI, id: int = 1, db: AsyncSession = Depends(get_db)) -> CameraROI:
+    return await camera_device_service.update_roi(db=db, camera_device_id=id, roi=roi)
+
+
+@router.delete("/{id}/roi", status_code=204, dependencies=[Depends(require_auth)])
+async def clear_camera_roi(id: int = 1, db: AsyncSession = Depends(get_db)) -> None:
+    await camera_device_service.update_roi(db=db, camera_device_id=id, roi=None)
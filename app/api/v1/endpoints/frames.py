@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from app.services.frame_storage import frame_store, LocalFrameStore
+
+router = APIRouter(prefix="/frames", tags=["frames"])
+
+# Frame paths are content hashes, so a given URL never changes.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{year}/{month}/{day}/{name}")
+async def get_frame(year: str, month: str, day: str, name: str, request: Request):
+    """Serve a frame from the local frame store (FRAME_STORAGE_BACKEND=local)."""
+    if not isinstance(frame_store, LocalFrameStore):
+        raise HTTPException(status_code=404, detail="Frame not found")
+
+    path = frame_store.resolve(year, month, day, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Frame not found")
+
+    etag = f'"{path.stem}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
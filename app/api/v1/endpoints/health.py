@@ -74,6 +74,31 @@ async def health_check(db: AsyncSession = Depends(get_db)):
     except Exception:
         components["websocket_connections"] = 0
 
+    # ML model (session config + warm-up latency)
+    try:
+        from app.services import ml_service
+        components["ml_model"] = ml_service.model_report() or "placeholder"
+    except Exception:
+        components["ml_model"] = "unknown"
+
+    # Fusion state ownership across workers
+    try:
+        from app.core.fusion_cluster import fusion_cluster
+        components["fusion_cluster"] = fusion_cluster.report()
+        if fusion_cluster.enabled and not components["fusion_cluster"]["connected"]:
+            overall_healthy = False
+    except Exception:
+        components["fusion_cluster"] = "unknown"
+
+    # Dashboard broadcasts across workers
+    try:
+        from app.core.ws_manager import ws_manager
+        components["ws_backplane"] = ws_manager.backplane.report()
+        if components["ws_backplane"].get("connected") is False:
+            overall_healthy = False
+    except Exception:
+        components["ws_backplane"] = "unknown"
+
     status_code = 200 if overall_healthy else 503
     return JSONResponse(
         status_code=status_code,
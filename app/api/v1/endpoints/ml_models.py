@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.api.v1.dependencies import CurrentUser, require_superuser
+from app.schemas import ModelRegistryResponse, ShadowStartRequest
+from app.services import model_registry_service
+
+router = APIRouter(prefix="/ml-models", tags=["ml-models"])
+
+
+@router.get("", response_model=ModelRegistryResponse, dependencies=[Depends(require_superuser)])
+async def list_ml_models() -> ModelRegistryResponse:
+    return await model_registry_service.list_models()
+
+
+@router.post("/{version}/activate", response_model=None)
+async def activate_ml_model(
+    version: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(require_superuser)) -> dict:
+
+    return await model_registry_service.activate(db=db, version=version, current_user=current_user)
+
+
+@router.post("/{version}/shadow", response_model=None)
+async def start_ml_model_shadow(
+    version: str,
+    body: ShadowStartRequest | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(require_superuser)) -> dict:
+
+    return await model_registry_service.start_shadow(
+        db=db, version=version, sample_rate=body.sample_rate if body else None, current_user=current_user
+    )
+
+
+@router.get("/shadow", response_model=None, dependencies=[Depends(require_superuser)])
+async def get_ml_model_shadow() -> dict:
+    return model_registry_service.get_shadow()
+
+
+@router.delete("/shadow", response_model=None)
+async def stop_ml_model_shadow(
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(require_superuser)) -> dict:
+
+    return await model_registry_service.stop_shadow(db=db, current_user=current_user)
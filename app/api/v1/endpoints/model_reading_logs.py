@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.v1.dependencies import require_auth
 from app.core.database import get_db
 from app.schemas.model_reading_log import ModelReadingDetailResponse, ModelReadingPaginatedResponse
 from app.services.model_reading_log_service import model_reading_log_service
+from app.services.annotated_frame_service import annotated_frame_service
 
 router = APIRouter(prefix="/model-reading-logs", tags=["model-reading-logs"])
 
@@ -35,3 +36,14 @@ async def get_model_reading_detail(
     if result is None:
         raise HTTPException(status_code=404, detail="Model reading not found")
     return result
+
+
+@router.get("/{reading_id}/annotated", dependencies=[Depends(require_auth)])
+async def get_model_reading_annotated_image(
+    reading_id: int,
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    image = await annotated_frame_service.get_annotated(db=db, reading_id=reading_id)
+    if image is None:
+        raise HTTPException(status_code=404, detail="Annotated image not found")
+    return Response(content=image, media_type="image/jpeg", headers={"Cache-Control": "private, max-age=86400"})
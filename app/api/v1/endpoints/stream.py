@@ -1,4 +1,3 @@
-import base64
 import logging
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
@@ -52,16 +51,8 @@ async def upload_camera_image(
 
     camera_status_service.record_frame(location_id)
 
-    encoded = base64.b64encode(image_bytes).decode("utf-8")
-    await ws_manager.broadcast_to_location(
-        {
-            "type": "camera_update",
-            "data": {
-                "image": encoded,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        },
-        location_id=location_id,
+    await ws_manager.broadcast_camera_frame(
+        image_bytes, location_id=location_id, timestamp=datetime.now(timezone.utc)
     )
 
     await ml_service.process_frame_bytes(
@@ -70,4 +61,5 @@ async def upload_camera_image(
         location_id=location_id,
     )
 
-    return {"status": "ok"}
+    capture = ml_service.get_capture_schedule(camera_device_id, location_id)
+    return {"status": "ok", "capture": capture.model_dump(mode="json")}
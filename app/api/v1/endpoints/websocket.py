@@ -1,12 +1,16 @@
 import json
-import base64
+import asyncio
 import logging
 from datetime import datetime, timezone
+from typing import Awaitable, Callable
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
-from app.core.ws_manager import ws_manager
+from app.core.ws_manager import ws_manager, ClientConnection, CAMERA_SUBPROTOCOL
+from app.utils.camera_renditions import CAMERA_RENDITIONS, DEFAULT_RENDITION
 from app.services.websocket_service import websocket_service
 from app.services.ml_service import ml_service
 from app.services.camera_status_service import camera_status_service
+from app.services.stream import LatestFrameSlot
+from app.core.metrics import CAMERA_FRAMES_OVERWRITTEN
 from app.core.database import AsyncSessionLocal
 
 logger = logging.getLogger(__name__)
@@ -19,7 +23,20 @@ async def websocket_endpoint(websocket: WebSocket):
 
     location_id = websocket.query_params.get("location_id")
 
-    await websocket.accept()
+    # Camera frame delivery: binary if the client offers the camera subprotocol
+    # (or asks via ?camera=binary), legacy base64 JSON otherwise; ?camera=off opts out.
+    offered = websocket.scope.get("subprotocols") or []
+    camera_param = websocket.query_params.get("camera")
+    binary_camera = CAMERA_SUBPROTOCOL in offered or camera_param == "binary"
+    # Optional preview subscription: ?rendition=thumbnail|medium|original&max_fps=2
+    rendition = websocket.query_params.get("rendition", DEFAULT_RENDITION)
+    max_fps = _parse_max_fps(websocket.query_params.get("max_fps"))
+    # ?fusion=delta: fusion_analysis_delta patches (with seq) instead of full updates
+    fusion_delta = websocket.query_params.get("fusion") == "delta"
+
+    await websocket.accept(
+        subprotocol=CAMERA_SUBPROTOCOL if CAMERA_SUBPROTOCOL in offered else None
+    )
 
     if not location_id:
         await websocket.close(
@@ -36,8 +53,22 @@ async def websocket_endpoint(websocket: WebSocket):
         )
         return
 
+    if rendition not in CAMERA_RENDITIONS:
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION, reason="Invalid rendition"
+        )
+        return
+
     # Add the WebSocket connection to the manager
-    await ws_manager.connect(websocket=websocket, location_id=location_id)
+    client = await ws_manager.connect(
+        websocket=websocket,
+        location_id=location_id,
+        camera_format="binary" if binary_camera else "json",
+        camera_enabled=camera_param != "off",
+        rendition=rendition,
+        max_fps=max_fps,
+        fusion_delta=fusion_delta,
+    )
 
     try:
         # Scope DB session tightly to the initial-data call so we don't hold a
@@ -45,11 +76,14 @@ async def websocket_endpoint(websocket: WebSocket):
         # when idle poolers/networks drop the underlying TCP connection).
         async with AsyncSessionLocal() as db:
             await websocket_service.send_initial_data(
-                websocket=websocket, db=db, location_id=location_id
+                client=client, db=db, location_id=location_id
             )
+        if client.fusion_delta:
+            await websocket_service.send_fusion_snapshot(client=client, location_id=location_id)
 
         while True:
-            await websocket.receive_text()  # Keep the connection alive
+            # Keep-alives plus optional control messages from the dashboard
+            await _handle_client_message(client, location_id, await websocket.receive_text())
     except WebSocketDisconnect:
         pass
     except Exception:
@@ -60,13 +94,70 @@ async def websocket_endpoint(websocket: WebSocket):
         await ws_manager.disconnect(websocket=websocket, location_id=location_id)
 
 
+def _parse_max_fps(value) -> float | None:
+    """Positive fps cap, or None (no cap) for missing/invalid values."""
+    try:
+        fps = float(value)
+    except (TypeError, ValueError):
+        return None
+    return fps if fps > 0 else None
+
+
+async def _handle_client_message(client: ClientConnection, location_id: int, text: str) -> None:
+    """Dashboard → server control messages:
+      {"type": "camera_stream", ...}           see _apply_camera_stream
+      {"type": "fusion_stream", "delta": true} switch fusion delivery; switching
+                                               to deltas first sends a snapshot
+      {"type": "fusion_resync"}                resend the full fusion state + seq
+    Anything else (plain keep-alives, malformed JSON) is ignored."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return
+    if not isinstance(data, dict):
+        return
+
+    kind = data.get("type")
+    if kind == "camera_stream":
+        _apply_camera_stream(client, data)
+    elif kind == "fusion_stream":
+        client.fusion_delta = bool(data.get("delta"))
+        if client.fusion_delta:
+            await websocket_service.send_fusion_snapshot(client=client, location_id=location_id)
+    elif kind == "fusion_resync":
+        await websocket_service.send_fusion_snapshot(client=client, location_id=location_id)
+
+
+def _apply_camera_stream(client: ClientConnection, data: dict) -> None:
+    """{"type": "camera_stream", "enabled": false, "format": "binary",
+    "rendition": "thumbnail", "max_fps": 2}. Every field is optional."""
+    if "enabled" in data:
+        client.camera_enabled = bool(data["enabled"])
+    if data.get("format") in ("json", "binary"):
+        client.camera_format = data["format"]
+    if data.get("rendition") in CAMERA_RENDITIONS:
+        client.rendition = data["rendition"]
+    if "max_fps" in data:
+        client.max_fps = _parse_max_fps(data["max_fps"])
+
+
 @router.websocket("/ws/rpi")
 async def rpi_websocket_endpoint(websocket: WebSocket):
     camera_device_id = websocket.query_params.get("camera_device_id")
     location_id = websocket.query_params.get("location_id")
+    # "capture" frames are inferred on the server cadence; a "preview" connection
+    # carries a low-resolution stream that is only relayed to keep the live view alive.
+    stream = websocket.query_params.get("stream", "capture")
 
     await websocket.accept()
 
+    if stream not in ("capture", "preview"):
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="Invalid stream (expected capture or preview)",
+        )
+        return
+
     if not camera_device_id or not location_id:
         await websocket.close(
             code=status.WS_1008_POLICY_VIOLATION,
@@ -89,9 +180,30 @@ async def rpi_websocket_endpoint(websocket: WebSocket):
             "type": "connected",
             "camera_device_id": camera_device_id,
             "location_id": location_id,
+            "stream": stream,
         }
     )
-    print(f"📷 RPi connected — cam={camera_device_id}, loc={location_id}")
+    print(f"📷 RPi connected — cam={camera_device_id}, loc={location_id}, stream={stream}")
+
+    # Receiving, relaying and inference run independently: the receive loop
+    # only drops each frame into a latest-frame slot, so a slow inference or
+    # Cloudinary upload overwrites stale frames instead of backing up the socket.
+    relay_slot = LatestFrameSlot()
+    inference_slot = LatestFrameSlot()
+    send_lock = asyncio.Lock()
+
+    async def send_json(payload: dict) -> None:
+        async with send_lock:
+            await websocket.send_json(payload)
+
+    workers = [asyncio.create_task(_relay_frames(relay_slot, location_id))]
+    if stream == "capture":
+        workers.append(asyncio.create_task(
+            _infer_frames(inference_slot, send_json, camera_device_id, location_id)
+        ))
+        workers.append(asyncio.create_task(
+            _push_capture_schedule(send_json, camera_device_id, location_id)
+        ))
 
     try:
         while True:
@@ -108,59 +220,17 @@ async def rpi_websocket_endpoint(websocket: WebSocket):
 
                 camera_status_service.record_frame(location_id)
 
-                # Broadcast the raw frame immediately to all frontend clients
-                # so they see a live image feed (rapidly updating picture).
-                # This happens before ML inference so the UI stays responsive.
-                try:
-                    await ws_manager.broadcast_to_location(
-                        {
-                            "type": "camera_update",
-                            "data": {
-                                "image": base64.b64encode(image_bytes).decode("utf-8"),
-                                "timestamp": datetime.now(timezone.utc).isoformat(),
-                            },
-                        },
-                        location_id=location_id,
-                    )
-                except Exception as e:
-                    logger.error(
-                        "broadcast_to_location failed for location_id=%s: %s",
-                        location_id,
-                        e,
-                        exc_info=True,
-                    )
-
-                # Run ML inference and send result back to the RPi
-                try:
-                    result = await ml_service.process_frame_bytes(
-                        image_bytes=image_bytes,
-                        camera_device_id=camera_device_id,
-                        location_id=location_id,
-                    )
-                    await websocket.send_json(
-                        {"type": "frame_processed", "data": result}
-                    )
-                except WebSocketDisconnect:
-                    break
-                except Exception:
-                    logger.exception(
-                        "ML inference failed for camera_device_id=%s, location_id=%s",
-                        camera_device_id,
-                        location_id,
-                    )
-                    try:
-                        await websocket.send_json(
-                            {"type": "error", "message": "Internal server error"}
-                        )
-                    except WebSocketDisconnect:
-                        break
+                if relay_slot.put((image_bytes, datetime.now(timezone.utc))):
+                    CAMERA_FRAMES_OVERWRITTEN.labels(stage="relay").inc()
+                if stream == "capture" and inference_slot.put(image_bytes):
+                    CAMERA_FRAMES_OVERWRITTEN.labels(stage="inference").inc()
 
             # ── Text frame: control messages (ping, etc.) ────────────────────
             elif message.get("text"):
                 try:
                     data = json.loads(message["text"])
                     if data.get("type") == "ping":
-                        await websocket.send_json({"type": "pong"})
+                        await send_json({"type": "pong"})
                 except (json.JSONDecodeError, Exception):
                     pass
 
@@ -173,7 +243,95 @@ async def rpi_websocket_endpoint(websocket: WebSocket):
             location_id,
         )
         try:
-            await websocket.send_json({"type": "error", "message": "Internal server error"})
+            await send_json({"type": "error", "message": "Internal server error"})
             await websocket.close()
         except Exception:
             pass
+    finally:
+        relay_slot.close()
+        inference_slot.close()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def _relay_frames(slot: LatestFrameSlot, location_id: int) -> None:
+    """Broadcast the newest raw frame to frontend clients for the live feed.
+    Runs ahead of ML inference so the UI stays responsive."""
+    while True:
+        frame = await slot.get()
+        if frame is None:
+            return
+        image_bytes, received_at = frame
+        try:
+            await ws_manager.broadcast_camera_frame(
+                image_bytes, location_id=location_id, timestamp=received_at
+            )
+        except Exception as e:
+            logger.error(
+                "broadcast_camera_frame failed for location_id=%s: %s",
+                location_id,
+                e,
+                exc_info=True,
+            )
+
+
+async def _infer_frames(
+    slot: LatestFrameSlot,
+    send_json: Callable[[dict], Awaitable[None]],
+    camera_device_id: int,
+    location_id: int,
+) -> None:
+    """Run ML inference on the newest frame and ack the result to the RPi."""
+    while True:
+        image_bytes = await slot.get()
+        if image_bytes is None:
+            return
+        try:
+            result = await ml_service.process_frame_bytes(
+                image_bytes=image_bytes,
+                camera_device_id=camera_device_id,
+                location_id=location_id,
+            )
+            reply = {
+                "type": "frame_processed",
+                "data": result,
+                "capture": ml_service.get_capture_schedule(
+                    camera_device_id, location_id
+                ).model_dump(mode="json"),
+            }
+        except Exception:
+            logger.exception(
+                "ML inference failed for camera_device_id=%s, location_id=%s",
+                camera_device_id,
+                location_id,
+            )
+            reply = {"type": "error", "message": "Internal server error"}
+
+        try:
+            await send_json(reply)
+        except (WebSocketDisconnect, RuntimeError):
+            # Socket closed while this frame was in flight; the receive loop
+            # sees the disconnect and tears the tasks down.
+            return
+
+
+async def _push_capture_schedule(
+    send_json: Callable[[dict], Awaitable[None]],
+    camera_device_id: int,
+    location_id: int,
+) -> None:
+    """Push a capture_interval control message on connect and whenever the
+    effective interval changes, so the RPi uploads only frames that get inferred."""
+    last_interval = None
+    while True:
+        schedule = ml_service.get_capture_schedule(camera_device_id, location_id)
+        if schedule.interval_seconds != last_interval:
+            try:
+                await send_json(
+                    {"type": "capture_interval", "data": schedule.model_dump(mode="json")}
+                )
+            except (WebSocketDisconnect, RuntimeError):
+                return
+            last_interval = schedule.interval_seconds
+        await ml_service.wait_for_cadence_change(camera_device_id, location_id)
@@ -1,10 +1,11 @@
 from app.api.v1.endpoints import auth, admin_users, admin_audit_log, notification_templates, system_settings
-from app.api.v1.endpoints import sensor_reading, sensor_device, weather
+from app.api.v1.endpoints import sensor_reading, sensor_device, camera_device, weather
 from app.api.v1.endpoints import responder, responder_group, push, responder_app
-from app.api.v1.endpoints import stream, core
+from app.api.v1.endpoints import stream, core, frames
 from app.api.v1.endpoints import daily_summary, analysis
 from app.api.v1.endpoints import notification_logs
 from app.api.v1.endpoints import model_reading_logs
+from app.api.v1.endpoints import ml_models
 from app.api.v1.endpoints import health
 from app.api.v1.endpoints import iot
 from app.api.v1.endpoints import evacuation_center, evacuation
@@ -25,10 +26,13 @@ api_router.include_router(responder.router)
 api_router.include_router(responder_app.router)
 api_router.include_router(responder_group.router)
 api_router.include_router(sensor_device.router)
+api_router.include_router(camera_device.router)
 api_router.include_router(sensor_reading.router)
 api_router.include_router(stream.router)
+api_router.include_router(frames.router)
 api_router.include_router(system_settings.router)
 api_router.include_router(model_reading_logs.router)
+api_router.include_router(ml_models.router)
 api_router.include_router(weather.router)
 api_router.include_router(health.router)
 api_router.include_router(iot.router)
@@ -18,6 +18,36 @@ class Settings(BaseSettings):
     # F1 — adaptive sampling: shortened interval while fusion risk is elevated.
     FRAME_CAPTURE_INTERVAL_ELEVATED_SECONDS: int = 30
     MAX_IMAGE_UPLOAD_BYTES: int = 5 * 1024 * 1024  # 5 MB
+    # Micro-batched inference: frames from all cameras are grouped into one ONNX run
+    INFERENCE_BATCH_MAX_SIZE: int = 8          # max frames per batch
+    INFERENCE_BATCH_MAX_WAIT_MS: int = 50      # latency budget for the oldest queued frame
+    INFERENCE_WORKERS: int = 1                 # out-of-process ONNX workers; 0 = run in the API process
+    # ONNX Runtime session tuning (check /health "ml_model" for the measured latency)
+    ONNX_MODEL_VARIANT: str = "fp32"           # "fp32" | "int8" (best.int8.onnx, quantized on first use if absent)
+    ONNX_GRAPH_OPTIMIZATION: str = "all"       # "disable" | "basic" | "extended" | "all"
+    ONNX_CACHE_OPTIMIZED_MODEL: bool = True    # save the optimized graph under weights/.ort_cache
+    ONNX_INTRA_OP_THREADS: int = 0             # 0 = CPU cores / INFERENCE_WORKERS
+    ONNX_INTER_OP_THREADS: int = 1
+    ONNX_WARMUP_RUNS: int = 3                  # blank runs at startup before the first real frame
+    INFERENCE_DRAFT_DECODE: bool = True        # decode JPEGs at reduced scale; False = bit-identical full decode
+    INFERENCE_INPUT_SIZE: int = 0              # model input for dynamic-shape exports (e.g. 416 with tight ROIs); 0 = 640
+    # Model registry: <version>.onnx files activated from /api/v1/ml-models (default: app/ml/weights/registry)
+    ML_MODEL_REGISTRY_DIR: str = ""
+    ML_MODEL_DRAIN_TIMEOUT_SECONDS: int = 30   # wait for in-flight batches before stopping a swapped-out model
+    ML_SHADOW_SAMPLE_RATE: float = 0.1         # default fraction of batches re-run on a shadow model
+    # Scene-change gate: frames that barely differ from the last inferred frame reuse its detections
+    SCENE_GATE_ENABLED: bool = True
+    SCENE_CHANGE_THRESHOLD: float = 4.0        # mean block-luma diff (0-255) below which a frame is "unchanged"
+    SCENE_FORCE_REFRESH_SECONDS: int = 15 * 60 # always run inference at least this often per camera
+    # Where captured frames are stored: "cloudinary" | "local" (content-addressed,
+    # served from /api/v1/frames). FRAME_STORAGE_LOCAL_DIR defaults to app/storage/frames.
+    FRAME_STORAGE_BACKEND: str = "cloudinary"
+    FRAME_STORAGE_LOCAL_DIR: str = ""
+    # Captured frames are spooled to disk and uploaded in the background
+    FRAME_UPLOAD_CONCURRENCY: int = 2          # parallel background uploads
+    FRAME_UPLOAD_MAX_BACKOFF_SECONDS: int = 300
+    # Annotated frames are rendered on request from stored detections (LRU cache, entries)
+    ANNOTATED_FRAME_CACHE_SIZE: int = 64
 
     # F1 — surface-obstruction confidence engine (rolling window over inference readings)
     OBSTRUCTION_WINDOW_K: int = 5              # readings considered per confidence window
@@ -35,6 +65,31 @@ class Settings(BaseSettings):
     EVACUATION_RECOMMEND_MIN_SCORE: int = 70
     EVACUATION_RECOMMEND_COOLDOWN_SECONDS: int = 15 * 60
 
+    # Fusion updates for a location arriving within this window share one
+    # recompute broadcast + notify pass; escalation to Critical is never delayed. 0 = off
+    FUSION_COALESCE_WINDOW_MS: int = 500
+    # Fusion auto-notifications are queued (notification_intents) and sent by background workers
+    NOTIFICATION_DISPATCH_WORKERS: int = 2
+    NOTIFICATION_INTENT_MAX_ATTEMPTS: int = 3          # delivery attempts before an intent is marked failed
+    NOTIFICATION_INTENT_MAX_AGE_MINUTES: int = 30      # pending intents older than this are dropped on startup
+    NOTIFICATION_INTENT_CLAIM_TIMEOUT_SECONDS: int = 5 * 60  # intents stuck in 'sending' this long are retried on startup
+    # Fusion / confidence state snapshot restored on startup (default: app/storage/state_snapshot.json)
+    STATE_SNAPSHOT_PATH: str = ""
+    STATE_SNAPSHOT_INTERVAL_SECONDS: int = 60          # periodic save; 0 = only on shutdown
+    STATE_SNAPSHOT_MAX_AGE_SECONDS: int = 10 * 60      # older snapshots are ignored (cold start from the DB)
+    # Multi-worker fusion: "local" = this process owns every location; "postgres" =
+    # one owner per location (advisory lock), state replicated over LISTEN/NOTIFY
+    FUSION_CLUSTER_MODE: str = "local"
+    FUSION_CLUSTER_WORKERS: int = 0                    # expected workers for the initial split; 0 = WEB_CONCURRENCY or 1
+    FUSION_OWNERSHIP_CHECK_SECONDS: int = 10           # how often unowned locations are claimed
+    # Dashboard broadcasts across workers: "local" = this process only; "postgres" = LISTEN/NOTIFY
+    WS_BACKPLANE: str = "local"
+    WS_BACKPLANE_CAMERA_FRAMES: bool = True            # also relay live camera frames (large; chunked)
+    # Per-dashboard outbound queue; when a slow client's queue is full:
+    # "drop_oldest" = lose its oldest queued message, "disconnect" = close it (1013)
+    WS_CLIENT_QUEUE_SIZE: int = 32
+    WS_SLOW_CLIENT_POLICY: str = "drop_oldest"
+
     DATABASE_URL: str
     SECRET_KEY: str
     IOT_API_KEY: str = ""
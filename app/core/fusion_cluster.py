@@ -0,0 +1,234 @@
+"""Location ownership and fusion state replication across API workers.
+
+With FUSION_CLUSTER_MODE="postgres", every worker still keeps a
+``FusionAnalysisState`` per location, but only the worker holding the
+location's Postgres advisory lock (its owner) recomputes it, broadcasts,
+notifies and emits recommendations. Other workers keep a read replica:
+
+* an input (water level, blockage, weather) that arrives at a non-owner is
+  forwarded to the owner over NOTIFY instead of being applied locally;
+* after each changed broadcast the owner publishes ``(seq, payload)`` and the
+  replicas adopt it (and, without a cross-worker WS_BACKPLANE, pass it on to
+  their own dashboard sockets);
+* alert-threshold changes are published so every worker recomputes with the
+  same snapshot.
+
+Messages are chunked under the NOTIFY payload limit (``pg_notify.to_chunks``),
+so a large fusion payload still reaches the replicas.
+
+A new owner also loads the location's notification cooldowns and pending
+intents (notification_intent_service.adopt_locations), so a takeover doesn't
+re-send inside a cooldown.
+
+Locks live on the ``pg_notify_hub`` connection, so a worker that dies or loses
+that connection releases its locations, and the others pick them up on their
+next claim pass (every FUSION_OWNERSHIP_CHECK_SECONDS). Inputs forwarded while
+a location has no owner are dropped; the next reading repairs the state.
+With the default FUSION_CLUSTER_MODE="local" the process owns everything.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import socket
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.metrics import FUSION_CLUSTER_MESSAGES, FUSION_OWNED_LOCATIONS
+from app.core.pg_notify import ChunkAssembler, PgNotifyHub, pg_notify_hub, to_chunks
+
+
+logger = logging.getLogger(__name__)
+
+STATE_CHANNEL = "agos_fusion_state"
+INPUT_CHANNEL = "agos_fusion_input"
+THRESHOLDS_CHANNEL = "agos_fusion_thresholds"
+# First key of pg_try_advisory_lock(int, int); the second is the location id.
+LOCK_NAMESPACE = 0x41474F53  # "AGOS"
+
+
+class FusionCluster:
+
+    def __init__(self, hub: PgNotifyHub = pg_notify_hub):
+        self._hub = hub
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._ids = itertools.count()
+        self._manager = None  # StateManager, set by start()
+        self._locations: list[int] = []
+        self._owned: set[int] = set()
+        self._claim_task = None
+        self._claimed_once = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.FUSION_CLUSTER_MODE == "postgres"
+
+    def owns(self, location_id: int) -> bool:
+        return not self.enabled or location_id in self._owned
+
+    def report(self) -> dict:
+        return {
+            "mode": settings.FUSION_CLUSTER_MODE,
+            "worker_id": self.worker_id,
+            "connected": self._hub.connected if self.enabled else None,
+            "owned_locations": sorted(self._owned) if self.enabled else self._locations,
+        }
+
+    async def start(self, manager, location_ids: list[int]) -> None:
+        self._manager = manager
+        self._locations = list(location_ids)
+        if not self.enabled or self._claim_task is not None:
+            return
+
+        await self._hub.subscribe(STATE_CHANNEL, _reassembled(self._on_state))
+        await self._hub.subscribe(INPUT_CHANNEL, _reassembled(self._on_input))
+        await self._hub.subscribe(THRESHOLDS_CHANNEL, _reassembled(self._on_thresholds))
+        self._hub.add_connection_listener(self._on_connection)
+        await self._hub.start()
+        if self._hub.connected and not self._claimed_once:
+            # The hub was already up (started by the ws backplane), so the
+            # connection listener won't fire until a reconnect.
+            try:
+                await self._claim()
+            except Exception as e:
+                logger.warning("Fusion ownership claim failed: %s", e)
+        self._claim_task = asyncio.create_task(self._claim_loop())
+
+    async def stop(self) -> None:
+        if self._claim_task is not None:
+            self._claim_task.cancel()
+            await asyncio.gather(self._claim_task, return_exceptions=True)
+            self._claim_task = None
+        if self._owned and self._hub.connected:
+            # The hub may stay up for other users (ws backplane) until main stops it.
+            try:
+                await self._hub.fetchval("SELECT pg_advisory_unlock_all()")
+            except Exception as e:
+                logger.warning("Could not release fusion ownership locks: %s", e)
+        self._owned.clear()
+        FUSION_OWNED_LOCATIONS.set(0)
+
+    # ── Ownership ──────────────────────────────────────────────────────────
+    async def _on_connection(self, connected: bool) -> None:
+        if connected:
+            await self._claim()
+            return
+        if self._owned:
+            print(f"⚠️ Lost the notify connection; releasing ownership of locations {sorted(self._owned)}")
+        self._owned.clear()
+        FUSION_OWNED_LOCATIONS.set(0)
+
+    async def _claim(self) -> None:
+        """Try to lock every location nobody holds. The first pass stops at a
+        fair share so workers starting together split the locations."""
+        candidates = [loc for loc in self._locations if loc not in self._owned]
+        random.shuffle(candidates)
+        limit = len(candidates)
+        if not self._claimed_once:
+            workers = settings.FUSION_CLUSTER_WORKERS or int(os.environ.get("WEB_CONCURRENCY", "1"))
+            limit = math.ceil(len(self._locations) / max(1, workers))
+            self._claimed_once = True
+
+        claimed = []
+        for location_id in candidates:
+            if len(claimed) >= limit:
+                break
+            if await self._hub.fetchval("SELECT pg_try_advisory_lock($1, $2)", LOCK_NAMESPACE, location_id):
+                self._owned.add(location_id)
+                claimed.append(location_id)
+        FUSION_OWNED_LOCATIONS.set(len(self._owned))
+        if claimed:
+            print(f"🔑 Worker {self.worker_id} now owns fusion state for locations {sorted(claimed)}")
+            await self._adopt_notifications(claimed)
+
+    async def _adopt_notifications(self, location_ids: list[int]) -> None:
+        """The previous owner's notification cooldowns and pending intents
+        come with the locations."""
+        from app.services import notification_intent_service
+
+        try:
+            await notification_intent_service.adopt_locations(location_ids)
+        except Exception as e:
+            logger.warning("Could not adopt notification state for %s: %s", location_ids, e)
+
+    async def _claim_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.FUSION_OWNERSHIP_CHECK_SECONDS)
+            if not self._hub.connected:
+                continue
+            try:
+                await self._claim()
+            except Exception as e:
+                logger.warning("Fusion ownership claim failed: %s", e)
+
+    # ── Publishing ─────────────────────────────────────────────────────────
+    async def publish_state(self, location_id: int, seq: int, payload: dict) -> None:
+        if not self.enabled or location_id not in self._owned:
+            return
+        await self._publish(STATE_CHANNEL, "state", {"location_id": location_id, "seq": seq, "payload": payload})
+
+    async def forward_input(self, location_id: int, kind: str, status: BaseModel) -> None:
+        """Hand a fusion input to the location's owner (kind: "water_level" |
+        "visual" | "weather")."""
+        await self._publish(INPUT_CHANNEL, "input", {
+            "location_id": location_id, "kind": kind, "status": status.model_dump(mode="json"),
+        })
+
+    async def publish_thresholds(self, thresholds: BaseModel) -> None:
+        if self.enabled:
+            await self._publish(THRESHOLDS_CHANNEL, "thresholds", {"thresholds": thresholds.model_dump(mode="json")})
+
+    async def _publish(self, channel: str, kind: str, message: dict) -> None:
+        message["origin"] = self.worker_id
+        payloads = to_chunks(self.worker_id, next(self._ids), json.dumps(message, separators=(",", ":")))
+        try:
+            await self._hub.publish_many(channel, payloads)
+        except Exception as e:
+            FUSION_CLUSTER_MESSAGES.labels(kind=kind, direction="dropped").inc()
+            logger.warning("Could not publish fusion %s to other workers: %s", kind, e)
+            return
+        FUSION_CLUSTER_MESSAGES.labels(kind=kind, direction="published").inc()
+
+    # ── Receiving ──────────────────────────────────────────────────────────
+    async def _on_state(self, raw: str) -> None:
+        message = json.loads(raw)
+        if message["origin"] == self.worker_id or message["location_id"] in self._owned:
+            return
+        FUSION_CLUSTER_MESSAGES.labels(kind="state", direction="received").inc()
+        await self._manager.apply_replica(message["location_id"], message["seq"], message["payload"])
+
+    async def _on_input(self, raw: str) -> None:
+        message = json.loads(raw)
+        if message["location_id"] not in self._owned:
+            return
+        FUSION_CLUSTER_MESSAGES.labels(kind="input", direction="received").inc()
+        await self._manager.apply_forwarded_input(message["location_id"], message["kind"], message["status"])
+
+    async def _on_thresholds(self, raw: str) -> None:
+        from app.schemas import AlertThresholdsResponse
+
+        message = json.loads(raw)
+        if message["origin"] == self.worker_id:
+            return
+        FUSION_CLUSTER_MESSAGES.labels(kind="thresholds", direction="received").inc()
+        thresholds = AlertThresholdsResponse.model_validate(message["thresholds"])
+        await self._manager.update_alert_thresholds(thresholds, publish=False)
+
+
+def _reassembled(handler):
+    """Wrap a message handler so it is called once per whole message."""
+    chunks = ChunkAssembler()
+
+    async def on_chunk(payload: str) -> None:
+        raw = chunks.add(payload)
+        if raw is not None:
+            await handler(raw)
+
+    return on_chunk
+
+
+fusion_cluster = FusionCluster()
@@ -15,6 +15,10 @@ from app.utils.summary_utils import (
 )
 
 
+# Used until the alert_thresholds setting has been loaded (same as the seeded values).
+DEFAULT_ALERT_THRESHOLDS = AlertThresholdsResponse(tier_1_max=44, tier_2_min=45, tier_2_max=75, tier_3_min=76)
+
+
 def calculate_fusion_data(
     blockage_status: BlockageStatus | None,
     water_level_status: WaterLevelStatus | None,
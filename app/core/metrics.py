@@ -0,0 +1,116 @@
+"""Application-level Prometheus metrics.
+
+Registered on the default ``prometheus_client`` registry, so they are exposed on
+the same ``/metrics`` endpoint the ``Instrumentator`` in ``app/main.py`` serves.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# ── ML inference ────────────────────────────────────────────────────────────
+INFERENCE_BATCH_SIZE = Histogram(
+    "agos_inference_batch_size",
+    "Number of frames executed together in one ONNX inference batch",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+INFERENCE_BATCH_WAIT_SECONDS = Histogram(
+    "agos_inference_batch_wait_seconds",
+    "Time a frame spent in the batch queue before its batch was dispatched",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+INFERENCE_BATCH_RUN_SECONDS = Histogram(
+    "agos_inference_batch_run_seconds",
+    "Wall time of one batched inference call (decode through re-encode)",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+SCENE_GATE_FRAMES = Counter(
+    "agos_scene_gate_frames_total",
+    "Frames past the capture interval, by whether the scene-change gate ran inference",
+    ["outcome"],  # "inferred" | "skipped"
+)
+SCENE_CHANGE_SCORE = Histogram(
+    "agos_scene_change_score",
+    "Mean block-luma difference vs the last inferred frame (compare with SCENE_CHANGE_THRESHOLD)",
+    buckets=(0.5, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64),
+)
+
+
+# ── Camera ingest ───────────────────────────────────────────────────────────
+CAMERA_FRAMES_OVERWRITTEN = Counter(
+    "agos_camera_frames_overwritten_total",
+    "Camera frames replaced in a latest-frame slot before a consumer took them",
+    ["stage"],  # "relay" | "inference"
+)
+
+FRAME_SPOOL_DEPTH = Gauge(
+    "agos_frame_spool_depth",
+    "Captured frames spooled on disk and waiting for upload",
+)
+FRAME_UPLOADS = Counter(
+    "agos_frame_uploads_total",
+    "Spooled frame upload attempts",
+    ["outcome"],  # "success" | "retry"
+)
+
+
+# ── Fusion ──────────────────────────────────────────────────────────────────
+FUSION_BROADCASTS = Counter(
+    "agos_fusion_broadcasts_total",
+    "fusion_analysis_update broadcasts, by what released them",
+    ["trigger"],  # "window" | "critical" | "immediate"
+)
+FUSION_UPDATES_COALESCED = Counter(
+    "agos_fusion_updates_coalesced_total",
+    "Fusion input updates folded into an already scheduled broadcast",
+)
+FUSION_BROADCASTS_UNCHANGED = Counter(
+    "agos_fusion_broadcasts_unchanged_total",
+    "fusion_analysis_update broadcasts skipped because the payload matched the last one sent",
+)
+FUSION_OWNED_LOCATIONS = Gauge(
+    "agos_fusion_owned_locations",
+    "Locations whose fusion state this worker owns (FUSION_CLUSTER_MODE=postgres)",
+)
+FUSION_CLUSTER_MESSAGES = Counter(
+    "agos_fusion_cluster_messages_total",
+    "Fusion messages exchanged with other workers over LISTEN/NOTIFY",
+    ["kind", "direction"],  # kind: "state" | "input" | "thresholds"; direction: "published" | "received" | "dropped"
+)
+FUSION_BROADCAST_BYTES = Counter(
+    "agos_fusion_broadcast_bytes_total",
+    "Bytes of fusion state sent to dashboards, summed over recipients",
+    ["encoding"],  # "full" | "delta"
+)
+
+
+# ── Notifications ───────────────────────────────────────────────────────────
+NOTIFICATION_INTENTS = Counter(
+    "agos_notification_intents_total",
+    "Fusion auto-notification intents, by outcome",
+    ["outcome"],  # "enqueued" | "sent" | "skipped" | "failed" | "retry"
+)
+NOTIFICATION_INTENT_QUEUE_DEPTH = Gauge(
+    "agos_notification_intent_queue_depth",
+    "Notification intents waiting for a dispatch worker",
+)
+
+
+# ── WebSocket ───────────────────────────────────────────────────────────────
+WS_BACKPLANE_MESSAGES = Counter(
+    "agos_ws_backplane_messages_total",
+    "Dashboard broadcasts exchanged with other workers over the WebSocket backplane",
+    ["direction"],  # "published" | "received" | "dropped"
+)
+WS_BACKPLANE_BYTES = Counter(
+    "agos_ws_backplane_bytes_total",
+    "NOTIFY payload bytes of dashboard broadcasts exchanged with other workers",
+    ["direction"],  # "published" | "received"
+)
+WS_OUTBOUND_QUEUE_DEPTH = Gauge(
+    "agos_ws_outbound_queue_depth",
+    "Messages waiting in dashboard clients' outbound queues, summed over clients",
+)
+WS_OUTBOUND_DROPPED = Counter(
+    "agos_ws_outbound_dropped_total",
+    "Messages to slow dashboard clients dropped because their outbound queue was full",
+    ["policy"],  # "drop_oldest" | "disconnect" (everything the closed client had queued)
+)
@@ -0,0 +1,244 @@
+"""Shared Postgres LISTEN/NOTIFY connection for cross-worker messaging.
+
+One ``PgNotifyHub`` per process holds a dedicated asyncpg connection, outside
+the SQLAlchemy pool because LISTEN and session-level advisory locks are tied
+to a single connection that stays open. Handlers are registered per channel;
+payloads for a channel are handed to its handler one at a time, in the order
+Postgres delivered them. If the connection drops, the hub reconnects with
+backoff, LISTENs again and tells connection listeners. Advisory locks held on
+the old connection are gone by then.
+
+Messages that may exceed the payload limit go out as chunks
+(``to_chunks`` + ``publish_many``) and are rebuilt with a ``ChunkAssembler``.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from typing import Awaitable, Callable
+
+import asyncpg
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# pg_notify rejects payloads of 8000 bytes or more (default build).
+MAX_PAYLOAD_BYTES = 7999
+RECONNECT_MAX_BACKOFF_SECONDS = 30
+# Room for the "origin|id|index|count|" prefix of every chunk.
+CHUNK_BYTES = MAX_PAYLOAD_BYTES - 256
+# Partial messages whose remaining chunks never arrived (lost connection).
+REASSEMBLY_TIMEOUT_SECONDS = 30
+
+Handler = Callable[[str], Awaitable[None] | None]
+ConnectionListener = Callable[[bool], Awaitable[None]]
+
+
+class PgNotifyHub:
+
+    def __init__(self, dsn: str | None = None):
+        self._dsn = dsn or settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+        self._conn: asyncpg.Connection | None = None
+        self._conn_lock = asyncio.Lock()   # asyncpg runs one query per connection at a time
+        self._handlers: dict[str, Handler] = {}
+        self._queues: dict[str, asyncio.Queue[str]] = {}
+        self._consumers: list[asyncio.Task] = []
+        self._connection_listeners: list[ConnectionListener] = []
+        self._reconnect_task: asyncio.Task | None = None
+        self._running = False
+        self._stopping = False
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        """Call `handler(payload)` for every NOTIFY on `channel`; one handler
+        per channel. Works before or after start(), so several components can
+        share the hub."""
+        if channel in self._handlers:
+            raise ValueError(f"{channel} already has a handler")
+        self._handlers[channel] = handler
+        if not self._running:
+            return
+        self._start_consumer(channel, handler)
+        if self.connected:
+            async with self._conn_lock:
+                await self._conn.add_listener(channel, self._on_notify)
+
+    def add_connection_listener(self, listener: ConnectionListener) -> None:
+        """`await listener(True)` after every (re)connect, `listener(False)` on loss."""
+        self._connection_listeners.append(listener)
+
+    async def start(self) -> None:
+        """Connect and start delivering. Idempotent: each user of the hub
+        subscribes and then calls start()."""
+        if self._running:
+            return
+        self._running = True
+        self._stopping = False
+        for channel, handler in self._handlers.items():
+            self._start_consumer(channel, handler)
+        await self._connect()
+
+    async def stop(self) -> None:
+        self._running = False
+        self._stopping = True
+        tasks = self._consumers + ([self._reconnect_task] if self._reconnect_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._consumers = []
+        self._reconnect_task = None
+        self._queues = {}
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def publish(self, channel: str, payload: str) -> None:
+        self._check_size(channel, payload)
+        await self.fetchval("SELECT pg_notify($1, $2)", channel, payload)
+
+    async def publish_many(self, channel: str, payloads: list[str]) -> None:
+        """NOTIFY several payloads in one statement. They commit together, so
+        listeners get all of them, in order, with nothing in between from this
+        connection. Postgres folds identical payloads sent in one transaction,
+        so each must be distinct."""
+        for payload in payloads:
+            self._check_size(channel, payload)
+        await self.fetchval(
+            "SELECT count(pg_notify($1, p)) FROM unnest($2::text[]) AS t(p)",
+            channel, payloads,
+        )
+
+    @staticmethod
+    def _check_size(channel: str, payload: str) -> None:
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            raise ValueError(f"NOTIFY payload for {channel} is over {MAX_PAYLOAD_BYTES} bytes")
+
+    async def fetchval(self, query: str, *args):
+        """Run a query on the hub's connection (e.g. advisory lock calls, which
+        must use the same session as the locks they manage)."""
+        if not self.connected:
+            raise ConnectionError("Postgres notify connection is down")
+        async with self._conn_lock:
+            return await self._conn.fetchval(query, *args)
+
+    async def _connect(self) -> None:
+        conn = await asyncpg.connect(self._dsn, statement_cache_size=0)
+        for channel in self._handlers:
+            await conn.add_listener(channel, self._on_notify)
+        conn.add_termination_listener(self._on_terminated)
+        self._conn = conn
+        await self._notify_connection_listeners(True)
+
+    def _on_notify(self, connection, pid, channel: str, payload: str) -> None:
+        queue = self._queues.get(channel)
+        if queue is not None:
+            queue.put_nowait(payload)
+
+    def _on_terminated(self, connection) -> None:
+        if self._stopping or connection is not self._conn:
+            return
+        self._conn = None
+        logger.warning("Postgres notify connection lost; reconnecting")
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        await self._notify_connection_listeners(False)
+        delay = 1
+        while not self._stopping:
+            try:
+                await self._connect()
+                logger.info("Postgres notify connection restored")
+                return
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("Postgres notify reconnect failed (%s); retrying in %ss", e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_BACKOFF_SECONDS)
+
+    async def _notify_connection_listeners(self, connected: bool) -> None:
+        for listener in self._connection_listeners:
+            try:
+                await listener(connected)
+            except Exception:
+                logger.exception("Notify connection listener failed")
+
+    def _start_consumer(self, channel: str, handler: Handler) -> None:
+        self._queues[channel] = asyncio.Queue()
+        self._consumers.append(asyncio.create_task(self._consume(channel, handler)))
+
+    async def _consume(self, channel: str, handler: Handler) -> None:
+        queue = self._queues[channel]
+        while True:
+            payload = await queue.get()
+            try:
+                result = handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("NOTIFY handler for %s failed", channel)
+
+
+def to_chunks(origin: str, message_id: int, text: str, size: int | None = None) -> list[str]:
+    """NOTIFY payloads "origin|id|index|count|piece" for `text`, each under
+    the payload limit. Send them with one publish_many so they stay in order."""
+    pieces = split_utf8(text.encode(), size or CHUNK_BYTES)
+    return [f"{origin}|{message_id}|{index}|{len(pieces)}|{piece}" for index, piece in enumerate(pieces)]
+
+
+def chunk_origin(payload: str) -> str:
+    return payload.partition("|")[0]
+
+
+class ChunkAssembler:
+    """Rebuilds messages sent with to_chunks, one per (origin, id)."""
+
+    def __init__(self):
+        # (origin, message id) -> (first chunk seen at, chunks by index)
+        self._partial: dict[tuple[str, str], tuple[float, dict[int, str]]] = {}
+
+    def add(self, payload: str) -> str | None:
+        """The whole message once its last chunk arrives; None until then."""
+        origin, message_id, index, count, piece = payload.split("|", 4)
+        if count == "1":
+            return piece
+        key = (origin, message_id)
+        if key not in self._partial:
+            self._expire()
+            self._partial[key] = (time.monotonic(), {})
+        chunks = self._partial[key][1]
+        chunks[int(index)] = piece
+        if len(chunks) < int(count):
+            return None
+        del self._partial[key]
+        return "".join(chunks[i] for i in range(len(chunks)))
+
+    def clear(self) -> None:
+        self._partial.clear()
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - REASSEMBLY_TIMEOUT_SECONDS
+        for key in [k for k, (started, _) in self._partial.items() if started < cutoff]:
+            del self._partial[key]
+
+
+def split_utf8(data: bytes, size: int) -> list[str]:
+    """Cut UTF-8 bytes into pieces of at most `size` bytes without splitting a
+    character."""
+    pieces = []
+    start = 0
+    while start < len(data):
+        end = min(start + size, len(data))
+        while end < len(data) and data[end] & 0xC0 == 0x80:  # continuation byte
+            end -= 1
+        pieces.append(data[start:end].decode())
+        start = end
+    return pieces or [""]
+
+
+pg_notify_hub = PgNotifyHub()
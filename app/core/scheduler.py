@@ -36,6 +36,8 @@ async def data_cleanup_job():
     from app.crud.responder_otp_verification import responder_otp_verification_crud
     from app.crud.password_reset_otp import password_reset_otp_crud
     from app.crud.evacuation_event import evacuation_event_crud
+    from app.crud.notification_intent import notification_intent_crud
+    from app.services.frame_storage import frame_store
 
     print("🗑️ Running data cleanup job...")
 
@@ -50,6 +52,8 @@ async def data_cleanup_job():
             sensor_count = await sensor_reading_crud.delete_older_than(db, cutoff)
             model_count = await model_readings_crud.delete_older_than(db, cutoff)
             weather_count = await weather_crud.delete_older_than(db, cutoff)
+            frame_count = await frame_store.prune_before(cutoff.date())
+            intent_count = await notification_intent_crud.delete_processed_before(db, cutoff)
 
             # Evacuation-event (public alert audit) retention: delete rows older
             # than the cutoff OR beyond the newest N per location. Falls back to
@@ -81,6 +85,7 @@ async def data_cleanup_job():
                 f"✅ Data cleanup complete (retention={retention_days}d, "
                 f"alerts={alert_retention_days}d/{alert_retention_max}max): "
                 f"sensor_readings={sensor_count}, model_readings={model_count}, weather={weather_count}, "
+                f"frames={frame_count}, notification_intents={intent_count}, "
                 f"evacuation_events={evac_event_count}, "
                 f"expired_otps={responder_otp_count + password_otp_count}"
             )
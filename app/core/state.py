@@ -1,29 +1,38 @@
 import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Mapping
+from pydantic import BaseModel
 
-from sqlalchemy.ext.asyncio import AsyncSession
-
+from app.core.config import settings
 from app.core.database import AsyncSessionLocal
-from app.core.fusion_scoring import calculate_fusion_data
+from app.core.fusion_cluster import fusion_cluster
+from app.core.metrics import FUSION_BROADCASTS, FUSION_BROADCASTS_UNCHANGED, FUSION_UPDATES_COALESCED
+from app.utils.json_patch import merge_patch
+from app.core.fusion_scoring import DEFAULT_ALERT_THRESHOLDS, calculate_fusion_data
 from app.schemas import (
+    AlertThresholdsResponse,
     FusionData,
     BlockageStatus,
     WaterLevelStatus,
     WeatherStatus,
     FusionAnalysisData,
+    SensorReadingSummary,
 )
 from app.schemas.reading_summary_response import FusionWebSocketResponse
 from app.services.cache_service import cache_service
 from app.schemas import DevicePerLocation
 
 
-WARNING_NOTIFY_COOLDOWN_SECONDS = 30 * 60   # 30 minutes
-CRITICAL_NOTIFY_COOLDOWN_SECONDS = 30 * 60  # 30 minutes
-BLOCKAGE_NOTIFY_COOLDOWN_SECONDS = 4 * 60 * 60  # 4 hours — blockages persist
-
-
 class FusionAnalysisState:
 
-    def __init__(self, location_id: int = None, camera_device_id: int = None, sensor_device_id: int = None):
+    def __init__(
+        self,
+        location_id: int = None,
+        camera_device_id: int = None,
+        sensor_device_id: int = None,
+        on_alert_change: Callable[[int, str], None] | None = None,
+    ):
         self.fusion_analysis: FusionAnalysisData | None = None
         self.location_id = location_id
         self.camera_device_id = camera_device_id
@@ -37,139 +46,233 @@ class FusionAnalysisState:
         self.blockage_status: BlockageStatus | None = None
         self.water_level_status: WaterLevelStatus | None = None
         self.weather_status: WeatherStatus | None = None
-        self._last_warning_notify_time: float = 0
-        self._last_critical_notify_time: float = 0
-        self._last_blockage_notify_time: float = 0
         # F4 — admin-facing evacuation recommendation (cooldown + auto-clear on relax)
         self._last_recommendation_time: float = 0
         self._recommendation_active: bool = False
         self._lock = asyncio.Lock()
+        # Coalescing: one delayed broadcast per burst of updates (FUSION_COALESCE_WINDOW_MS).
+        self._flush_task: asyncio.Task | None = None
+        self._flush_pending = False
+        self._broadcast_alert_name: str | None = None  # alert level of the last broadcast
+        # Last broadcast payload and its sequence number; unchanged payloads are
+        # not re-sent and delta clients get a patch against the previous one.
+        self._last_payload: dict | None = None
+        self._seq = 0
+        # Called synchronously with (location_id, alert_name) whenever the alert level changes.
+        self._on_alert_change = on_alert_change
+
+
+    def fusion_payload(self) -> dict:
+        return FusionWebSocketResponse(
+            status="success",
+            message="Retrieved successfully",
+            fusion_analysis=self.fusion_analysis
+        ).model_dump(mode='json')
+
+
+    def snapshot(self) -> tuple[int, dict]:
+        """(seq, payload) of the last broadcast — what a delta client starts from."""
+        if self._last_payload is None:
+            return self._seq, self.fusion_payload()
+        return self._seq, self._last_payload
 
 
     async def broadcast_fusion_analysis(self):
         from app.services import websocket_service
 
-        fusion_websocket_response = FusionWebSocketResponse(
-            status="success",
-            message="Retrieved successfully",
-            fusion_analysis=self.fusion_analysis
+        payload = self.fusion_payload()
+        if payload == self._last_payload:
+            FUSION_BROADCASTS_UNCHANGED.inc()
+            return
+
+        patch = merge_patch(self._last_payload, payload) if self._last_payload is not None else None
+        self._last_payload = payload
+        self._seq += 1
+
+        # Queue for local clients before anything yields, so a snapshot read
+        # after the seq bump can't overtake this delta.
+        await websocket_service.broadcast_fusion_update(
+            location_id=self.location_id, data=payload, patch=patch, seq=self._seq
         )
+        await fusion_cluster.publish_state(self.location_id, self._seq, payload)
 
-        await websocket_service.broadcast_update(
-            "fusion_analysis_update", 
-            fusion_websocket_response.model_dump(mode='json'),
-            location_id=self.location_id
+    async def apply_replica(self, seq: int, payload: dict) -> None:
+        """Adopt state published by the worker that owns this location (see
+        fusion_cluster) and pass it on to this worker's dashboards, unless the
+        owner's broadcast already reached them over the WebSocket backplane."""
+        from app.services import websocket_service
+        from app.core.ws_manager import ws_manager
+
+        if not payload.get("fusion_analysis"):
+            return
+        analysis = FusionAnalysisData.model_validate(payload["fusion_analysis"])
+        previous_alert_name = self.fusion_data.alert_name
+        async with self._lock:
+            self.fusion_analysis = analysis
+            self.fusion_data = analysis.fusion_data
+            self.blockage_status = analysis.blockage_status
+            self.water_level_status = analysis.water_level_status
+            self.weather_status = analysis.weather_status
+        if self._on_alert_change and self.fusion_data.alert_name != previous_alert_name:
+            self._on_alert_change(self.location_id, self.fusion_data.alert_name)
+
+        # A patch only makes sense against the owner's previous seq.
+        contiguous = self._last_payload is not None and self._seq == seq - 1
+        patch = merge_patch(self._last_payload, payload) if contiguous else None
+        self._last_payload = payload
+        self._seq = seq
+        self._broadcast_alert_name = self.fusion_data.alert_name
+
+        if ws_manager.backplane.cross_worker:
+            return
+        await websocket_service.broadcast_fusion_update(
+            location_id=self.location_id, data=payload, patch=patch, seq=seq
         )
 
 
-    async def load_initial_state(self, db: AsyncSession):
+    def load_initial_state(
+        self,
+        sensor_summary: SensorReadingSummary | None,
+        latest_model: Mapping | None,
+        latest_weather: Mapping | None,
+    ) -> None:
         """
-        Loads the latest data from the database upon server startup.
-        Verifies if the data is recent enough to be considered valid for fusion analysis.
+        Hydrates the state from the latest stored readings upon server startup
+        (loaded in bulk by StateManager.start_all_states). Readings older than
+        their warning period are not considered valid for fusion analysis.
         """
-        from app.crud import sensor_reading_crud
-        from app.crud import model_readings_crud
-        from app.crud import weather_crud
-        from app.services import sensor_reading_service
         from app.services import weather_service
-        from app.core.config import settings
-        from datetime import datetime, timezone, timedelta
-
-        # --- 1. Load Sensor Reading (Water Level) ---
-        latest_sensor = await sensor_reading_crud.get_latest_reading(db=db, sensor_device_id=self.sensor_device_id)
-        if latest_sensor:
-            # Check if data is within the acceptable warning period (not too stale)
-            is_valid = latest_sensor.timestamp >= datetime.now(timezone.utc) - timedelta(minutes=settings.SENSOR_WARNING_PERIOD_MINUTES)
-            
-            if is_valid:
-                # Calculate summary to get trend and critical percentage
-                summary = await sensor_reading_service.calculate_record_summary(db=db, reading=latest_sensor)
-                
-                self.water_level_status = WaterLevelStatus(
-                    timestamp=latest_sensor.timestamp,
-                    water_level_cm=summary.water_level.current_cm,
-                    change_rate=summary.water_level.change_rate,
-                    critical_percentage=summary.alert.percentage_of_critical,
-                    trend=summary.water_level.trend
-                )
 
-        # --- 2. Load Model Reading (Blockage) ---
-        latest_model = await model_readings_crud.get_latest_reading(db=db, camera_device_id=self.camera_device_id)
-        if latest_model:
-            # Check if data is within the acceptable warning period
-            model_timestamp = latest_model["timestamp"]
-            is_valid = model_timestamp >= datetime.now(timezone.utc) - timedelta(minutes=settings.SENSOR_WARNING_PERIOD_MINUTES)
-            
-            if is_valid:
-                self.blockage_status = BlockageStatus(
-                    timestamp=model_timestamp,
-                    status=latest_model["blockage_status"]
-                )
+        sensor_cutoff, weather_cutoff = _freshness_cutoffs()
+
+        # --- 1. Sensor Reading (Water Level) ---
+        if sensor_summary and sensor_summary.timestamp >= sensor_cutoff:
+            self.water_level_status = WaterLevelStatus(
+                timestamp=sensor_summary.timestamp,
+                water_level_cm=sensor_summary.water_level.current_cm,
+                change_rate=sensor_summary.water_level.change_rate,
+                critical_percentage=sensor_summary.alert.percentage_of_critical,
+                trend=sensor_summary.water_level.trend
+            )
+
+        # --- 2. Model Reading (Blockage) ---
+        if latest_model and latest_model["timestamp"] >= sensor_cutoff:
+            self.blockage_status = BlockageStatus(
+                timestamp=latest_model["timestamp"],
+                status=latest_model["blockage_status"]
+            )
+
+        # --- 3. Weather Condition ---
+        if latest_weather and latest_weather["created_at"] >= weather_cutoff:
+            weather_summary = weather_service.get_weather_summary(
+                created_at=latest_weather["created_at"],
+                weather_code=latest_weather["weather_code"],
+                precipitation_mm=latest_weather["precipitation_mm"]
+            )
+            self.weather_status = WeatherStatus(
+                timestamp=latest_weather["created_at"],
+                precipitation_mm=latest_weather["precipitation_mm"],
+                weather_condition=weather_summary.condition
+            )
 
-        # --- 3. Load Weather Condition ---
-        latest_weather = await weather_crud.get_latest_weather(db, location_id=self.location_id)
-        if latest_weather:
-            # Check if data is within the acceptable warning period
-            weather_timestamp = latest_weather["created_at"]
-            is_valid = weather_timestamp >= datetime.now(timezone.utc) - timedelta(minutes=settings.WEATHER_CONDITION_WARNING_PERIOD_MINUTES)
-            
-            if is_valid:
-                # Get weather description
-                weather_summary = weather_service.get_weather_summary(
-                    created_at=weather_timestamp,
-                    weather_code=latest_weather["weather_code"],
-                    precipitation_mm=latest_weather["precipitation_mm"]
-                )
-                
-                self.weather_status = WeatherStatus(
-                    timestamp=weather_timestamp,
-                    precipitation_mm=latest_weather["precipitation_mm"],
-                    weather_condition=weather_summary.condition
-                )
-        
         # --- 4. Recalculate Fusion Data with loaded values ---
-        await self._recalculate_fusion_data()
-        await self._broadcast_and_notify()
+        self._recalculate_fusion_data()
+
+    def snapshot_state(self) -> dict:
+        """Inputs and recommendation cooldown for the state snapshot file; fusion
+        data itself is recomputed on restore (thresholds may have changed)."""
+        offset = time.time() - time.monotonic()
+
+        def dump(status: BaseModel | None) -> dict | None:
+            return status.model_dump(mode="json") if status is not None else None
+
+        return {
+            "blockage_status": dump(self.blockage_status),
+            "water_level_status": dump(self.water_level_status),
+            "weather_status": dump(self.weather_status),
+            "recommendation_active": self._recommendation_active,
+            "last_recommendation_at": (
+                self._last_recommendation_time + offset if self._last_recommendation_time else None
+            ),
+        }
+
+    def restore_state(self, data: dict) -> None:
+        """Hydrate from snapshot_state(). Inputs past their warning period are
+        dropped, exactly as in load_initial_state."""
+        sensor_cutoff, weather_cutoff = _freshness_cutoffs()
+
+        for attr, schema, cutoff in (
+            ("water_level_status", WaterLevelStatus, sensor_cutoff),
+            ("blockage_status", BlockageStatus, sensor_cutoff),
+            ("weather_status", WeatherStatus, weather_cutoff),
+        ):
+            if data.get(attr):
+                status = schema.model_validate(data[attr])
+                if status.timestamp >= cutoff:
+                    setattr(self, attr, status)
+
+        if data.get("last_recommendation_at"):
+            self._last_recommendation_time = data["last_recommendation_at"] - (time.time() - time.monotonic())
+            self._recommendation_active = bool(data.get("recommendation_active"))
+
+        self._recalculate_fusion_data()
+
+    async def broadcast_initial_state(self) -> None:
+        """Broadcast the warm-started state without auto-notifying: responders
+        are alerted by live changes, not by re-reading history on a restart."""
+        self._broadcast_alert_name = self.fusion_data.alert_name
+        await self.broadcast_fusion_analysis()
 
 
     async def calculate_visual_status_score(self, blockage_status: BlockageStatus = None):
         async with self._lock:
             if blockage_status:
                 self.blockage_status = blockage_status
-            await self._recalculate_fusion_data()
-        # Broadcast and notify OUTSIDE the lock — push delivery is slow network
+            self._recalculate_fusion_data()
+        # Broadcast and notify OUTSIDE the lock — websocket fan-out is network
         # I/O and must not block other sensor/camera/weather updates for this
         # location while it runs.
-        await self._broadcast_and_notify()
+        await self._schedule_broadcast()
 
 
     async def calculate_water_level_score(self, water_level_status: WaterLevelStatus = None):
         async with self._lock:
             if water_level_status:
                 self.water_level_status = water_level_status
-            await self._recalculate_fusion_data()
-        await self._broadcast_and_notify()
+            self._recalculate_fusion_data()
+        await self._schedule_broadcast()
 
 
     async def calculate_weather_score(self, weather_status: WeatherStatus = None):
         async with self._lock:
             if weather_status:
                 self.weather_status = weather_status
-            await self._recalculate_fusion_data()
+            self._recalculate_fusion_data()
+        await self._schedule_broadcast()
+
+
+    async def recalculate(self):
+        """Recompute with the current inputs (e.g. after the alert thresholds changed)."""
+        async with self._lock:
+            self._recalculate_fusion_data()
         await self._broadcast_and_notify()
 
 
-    async def _recalculate_fusion_data(self) -> None:
-        """Compute fusion state from the current inputs. Runs under self._lock."""
-        async with AsyncSessionLocal() as db:
-            alert_thresholds = await cache_service.get_alert_thresholds(db)
+    def _recalculate_fusion_data(self) -> None:
+        """Compute fusion state from the current inputs. Runs under self._lock.
+        Pure in-memory: thresholds come from the snapshot pushed into
+        cache_service, so this never waits on the DB pool."""
+        alert_thresholds = cache_service.alert_thresholds or DEFAULT_ALERT_THRESHOLDS
 
+        previous_alert_name = self.fusion_data.alert_name
         self.fusion_data = calculate_fusion_data(
             blockage_status=self.blockage_status,
             water_level_status=self.water_level_status,
             weather_status=self.weather_status,
             alert_thresholds=alert_thresholds,
         )
+        if self._on_alert_change and self.fusion_data.alert_name != previous_alert_name:
+            self._on_alert_change(self.location_id, self.fusion_data.alert_name)
 
         self.fusion_analysis = FusionAnalysisData(
             fusion_data=self.fusion_data,
@@ -178,22 +281,58 @@ class FusionAnalysisState:
             weather_status=self.weather_status,
         )
 
+    async def _schedule_broadcast(self) -> None:
+        """Coalesce broadcast + notify for bursts of input changes: the first
+        change in a quiet period arms a FUSION_COALESCE_WINDOW_MS timer and later
+        changes ride along, so one broadcast carries the state as of the timer
+        firing. The recompute itself is not deferred (it is cheap and pure), which
+        is what lets an escalation to Critical bypass the window immediately."""
+        window = settings.FUSION_COALESCE_WINDOW_MS / 1000.0
+        escalated = self.fusion_data.alert_name == "Critical" and self._broadcast_alert_name != "Critical"
+
+        if window <= 0 or escalated:
+            if self._flush_pending:
+                # Still sleeping (the flag drops before it broadcasts), so cancelling is safe.
+                self._flush_task.cancel()
+                self._flush_pending = False
+            FUSION_BROADCASTS.labels(trigger="critical" if escalated else "immediate").inc()
+            await self._broadcast_and_notify()
+            return
+
+        if self._flush_pending:
+            FUSION_UPDATES_COALESCED.inc()
+            return
+        self._flush_pending = True
+        self._flush_task = asyncio.create_task(self._flush_after(window))
+
+    async def _flush_after(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flush_pending = False
+        FUSION_BROADCASTS.labels(trigger="window").inc()
+        try:
+            await self._broadcast_and_notify()
+        except Exception as e:
+            print(f"⚠️ Coalesced fusion broadcast failed for location {self.location_id}: {e}")
+
     async def _broadcast_and_notify(self) -> None:
-        """Broadcast the latest fusion state and dispatch auto-notifications.
-        Intentionally NOT holding self._lock — this does slow network I/O."""
+        """Broadcast the latest fusion state and queue auto-notifications.
+        Intentionally NOT holding self._lock — this does network I/O."""
+        from app.models.notification_template import NotificationType
+
+        self._broadcast_alert_name = self.fusion_data.alert_name
         await self.broadcast_fusion_analysis()
 
-        # Auto-notify responders on fusion alert level (cooldown-gated)
+        # Auto-notify responders on fusion alert level (cooldown-gated by the dispatcher)
         if self.fusion_data.alert_name == "Critical":
-            await self._auto_notify_critical()
+            await self._auto_notify(NotificationType.CRITICAL)
         elif self.fusion_data.alert_name == "Warning":
-            await self._auto_notify_warning()
+            await self._auto_notify(NotificationType.WARNING)
 
         # F1 — auto-notify only on sustained obstruction evidence (tier likely/confirmed),
         # and suppress entirely when the BLIND_CAMERA anomaly casts doubt on the camera.
         self._apply_blind_camera_downgrade()
         if self._should_notify_obstruction():
-            await self._auto_notify_blockage()
+            await self._auto_notify(NotificationType.BLOCKAGE)
 
         # F4 — emit an admin-facing evacuation RECOMMENDATION (never a public blast).
         await self._maybe_emit_evacuation_recommendation()
@@ -251,77 +390,15 @@ class FusionAnalysisState:
         # Fallback for states hydrated without a confidence object (e.g. initial load).
         return bool(self.blockage_status and self.blockage_status.status == "blocked")
 
-    async def _send_system_template(self, notification_type, log_label: str) -> bool:
-        """Look up the system template for this notification type and dispatch it
-        to all responders with push subscriptions. Returns True on successful send,
-        False if no template is configured or no subscribers exist."""
-        from app.services import notification_service
-        from app.crud import responder_crud
-        from app.crud import notification_template_crud
-        from app.schemas.subscription import SendNotificationSchema
+    async def _auto_notify(self, notification_type) -> None:
+        """Queue an auto-notification; cooldowns, audience and delivery are
+        handled by notification_intent_service in the background."""
+        from app.services import notification_intent_service
 
-        async with AsyncSessionLocal() as db:
-            template = await notification_template_crud.get_by_type(
-                db=db, notification_type=notification_type
-            )
-            if not template:
-                print(f"⚠️ No system template configured for {notification_type.value} — skipping auto-notify")
-                return False
-
-            responder_ids = await responder_crud.get_responder_ids_with_push_subscription(db=db)
-            if not responder_ids:
-                return False
-
-            payload = SendNotificationSchema(
-                responder_ids=responder_ids,
-                template_id=template.id,
-                custom_notification=None,
-                system_initiated=True,
-            )
-            await notification_service.send_notification_to_subscribers(payload=payload, db=db)
-            print(f"{log_label} Auto-notified {len(responder_ids)} responders (location {self.location_id})")
-            return True
-
-
-    async def _auto_notify_critical(self) -> None:
-        import time
-        from app.models.notification_template import NotificationType
-        now = time.monotonic()
-        if now - self._last_critical_notify_time < CRITICAL_NOTIFY_COOLDOWN_SECONDS:
-            return
-        try:
-            # Arm cooldown only on successful send so a missing template doesn't
-            # silence Critical alerts for the cooldown window.
-            if await self._send_system_template(NotificationType.CRITICAL, "🚨 [CRITICAL]"):
-                self._last_critical_notify_time = now
-        except Exception as e:
-            print(f"⚠️ Auto-notify critical failed: {e}")
-
-
-    async def _auto_notify_warning(self) -> None:
-        import time
-        from app.models.notification_template import NotificationType
-        now = time.monotonic()
-        if now - self._last_warning_notify_time < WARNING_NOTIFY_COOLDOWN_SECONDS:
-            return
         try:
-            if await self._send_system_template(NotificationType.WARNING, "⚠️ [WARNING]"):
-                self._last_warning_notify_time = now
+            await notification_intent_service.submit(self.location_id, notification_type)
         except Exception as e:
-            print(f"⚠️ Auto-notify warning failed: {e}")
-
-
-    async def _auto_notify_blockage(self) -> None:
-        import time
-        from app.models.notification_template import NotificationType
-        now = time.monotonic()
-        if now - self._last_blockage_notify_time < BLOCKAGE_NOTIFY_COOLDOWN_SECONDS:
-            return
-        try:
-            if await self._send_system_template(NotificationType.BLOCKAGE, "🪵 [SURFACE OBSTRUCTION]"):
-                self._last_blockage_notify_time = now
-        except Exception as e:
-            print(f"⚠️ Auto-notify surface obstruction failed: {e}")
+            print(f"⚠️ Auto-notify {notification_type.value} could not be queued: {e}")
 
 
 class StateManager:
@@ -329,6 +406,20 @@ class StateManager:
     def __init__(self):
         self._fusion_analysis_states: dict[int, FusionAnalysisState] = {}
         # int is location id
+        self._alert_listeners: list[Callable[[int, str], None]] = []
+
+
+    def add_alert_listener(self, listener: Callable[[int, str], None]) -> None:
+        """Register a cheap, synchronous callback fired with (location_id, alert_name)
+        whenever a location's fusion alert level changes."""
+        self._alert_listeners.append(listener)
+
+    def _notify_alert_change(self, location_id: int, alert_name: str) -> None:
+        for listener in self._alert_listeners:
+            try:
+                listener(location_id, alert_name)
+            except Exception as e:
+                print(f"⚠️ Alert listener failed for location {location_id}: {e}")
 
 
     # Retrieve existing Fusion Analysis Data for a location
@@ -337,6 +428,11 @@ class StateManager:
             raise ValueError(f"No FusionAnalysisState found for location_id {location_id}")
         return self._fusion_analysis_states[location_id].fusion_analysis
 
+    def get_fusion_snapshot(self, location_id: int) -> tuple[int, dict] | None:
+        """(seq, full fusion payload) for a location's delta clients."""
+        state = self._fusion_analysis_states.get(location_id)
+        return state.snapshot() if state else None
+
     def get_alert_name(self, location_id: int) -> str | None:
         """Current fusion alert level for a location (F1 adaptive sampling)."""
         state = self._fusion_analysis_states.get(location_id)
@@ -344,50 +440,171 @@ class StateManager:
 
 
     async def recalculate_water_level_score(self, water_level_status: WaterLevelStatus, location_id: int) -> None:
+        if not fusion_cluster.owns(location_id):
+            await fusion_cluster.forward_input(location_id, "water_level", water_level_status)
+            return
         fusion_state = self._fusion_analysis_states.get(location_id)
         if fusion_state:
             await fusion_state.calculate_water_level_score(water_level_status=water_level_status)
 
 
     async def recalculate_visual_status_score(self, blockage_status: BlockageStatus, location_id: int) -> None:
+        if not fusion_cluster.owns(location_id):
+            await fusion_cluster.forward_input(location_id, "visual", blockage_status)
+            return
         fusion_state = self._fusion_analysis_states.get(location_id)
         if fusion_state:
             await fusion_state.calculate_visual_status_score(blockage_status=blockage_status)
 
 
     async def recalculate_weather_score(self, weather_status: WeatherStatus, location_id: int) -> None:
+        if not fusion_cluster.owns(location_id):
+            await fusion_cluster.forward_input(location_id, "weather", weather_status)
+            return
         fusion_state = self._fusion_analysis_states.get(location_id)
         if fusion_state:
             await fusion_state.calculate_weather_score(weather_status=weather_status)
 
 
+    async def apply_forwarded_input(self, location_id: int, kind: str, status: dict) -> None:
+        """An input another worker received for a location this worker owns."""
+        if kind == "water_level":
+            await self.recalculate_water_level_score(WaterLevelStatus.model_validate(status), location_id)
+        elif kind == "visual":
+            await self.recalculate_visual_status_score(BlockageStatus.model_validate(status), location_id)
+        elif kind == "weather":
+            await self.recalculate_weather_score(WeatherStatus.model_validate(status), location_id)
+
+    async def apply_replica(self, location_id: int, seq: int, payload: dict) -> None:
+        fusion_state = self._fusion_analysis_states.get(location_id)
+        if fusion_state:
+            await fusion_state.apply_replica(seq, payload)
+
+
     def start_fusion_analysis_state(self, location_id: int, sensor_device_id: int, camera_device_id: int) -> FusionAnalysisState:
         if location_id not in self._fusion_analysis_states:
-            fusion_state = FusionAnalysisState(location_id=location_id, camera_device_id=camera_device_id, sensor_device_id=sensor_device_id)
+            fusion_state = FusionAnalysisState(location_id=location_id, camera_device_id=camera_device_id, sensor_device_id=sensor_device_id,
+                                               on_alert_change=self._notify_alert_change)
             self._fusion_analysis_states[location_id] = fusion_state
             return fusion_state
 
 
-    async def start_all_states(self) -> None:
+    async def update_alert_thresholds(self, thresholds: AlertThresholdsResponse, publish: bool = True) -> None:
+        """Swap in a new thresholds snapshot and recompute every owned location
+        with it; other workers are told to do the same unless `publish` is False."""
+        cache_service.set_alert_thresholds(thresholds)
+        if publish:
+            await fusion_cluster.publish_thresholds(thresholds)
+        for fusion_state in list(self._fusion_analysis_states.values()):
+            if fusion_cluster.owns(fusion_state.location_id):
+                await fusion_state.recalculate()
+
+
+    def snapshot_states(self) -> dict[int, dict]:
+        return {
+            location_id: fusion_state.snapshot_state()
+            for location_id, fusion_state in self._fusion_analysis_states.items()
+        }
+
+    async def start_all_states(self, snapshot: dict[int, dict] | None = None) -> None:
+        """Warm start: hydrate each location from `snapshot` (see
+        state_snapshot_service) when it has an entry, otherwise from the latest
+        sensor, model and weather readings — one set-based query each, run
+        concurrently, for all remaining locations. States are then broadcast
+        without notifying."""
+        from app.crud import sensor_reading_crud, model_readings_crud, weather_crud
+        from app.services import sensor_reading_service
+
+        started = time.perf_counter()
         async with AsyncSessionLocal() as db:
+            # Load the thresholds snapshot once up front; recomputes only read it.
+            try:
+                await cache_service.get_alert_thresholds(db=db)
+            except Exception as e:
+                print(f"⚠️ Could not load alert thresholds ({e}); using defaults until they are updated.")
+
             location_ids = await cache_service.get_all_location_ids(db=db)
 
             if not location_ids:
                 print("⚠️ No location IDs found to start fusion analysis states.")
                 return
-            
+
+            states: list[FusionAnalysisState] = []
             for loc_id in location_ids:
-                    
-                device_ids: DevicePerLocation = await cache_service.get_device_ids_per_location(db=db, location_id=loc_id)
+                try:
+                    device_ids: DevicePerLocation = await cache_service.get_device_ids_per_location(db=db, location_id=loc_id)
+                except ValueError:
+                    device_ids = None
 
                 if not device_ids:
                     print(f"⚠️ No device IDs found for location ID {loc_id}. Skipping fusion state initialization.")
                     continue
 
-                fusion_state = self.start_fusion_analysis_state(location_id=loc_id, 
-                                                                sensor_device_id=device_ids.sensor_device_id, 
+                fusion_state = self.start_fusion_analysis_state(location_id=loc_id,
+                                                                sensor_device_id=device_ids.sensor_device_id,
                                                                 camera_device_id=device_ids.camera_device_id)
-                await fusion_state.load_initial_state(db=db)
+                if fusion_state:
+                    states.append(fusion_state)
+
+            snapshot = snapshot or {}
+            restored = 0
+            from_db: list[FusionAnalysisState] = []
+            for fusion_state in states:
+                entry = snapshot.get(fusion_state.location_id)
+                if entry is None:
+                    from_db.append(fusion_state)
+                    continue
+                try:
+                    fusion_state.restore_state(entry)
+                    restored += 1
+                except Exception as e:
+                    print(f"⚠️ Could not restore location {fusion_state.location_id} from snapshot ({e}); loading from DB")
+                    from_db.append(fusion_state)
+
+            if from_db:
+                sensor_readings, model_readings, weather_readings = await asyncio.gather(
+                    _bulk_query(sensor_reading_crud.get_latest_two_per_device, [s.sensor_device_id for s in from_db]),
+                    _bulk_query(model_readings_crud.get_latest_per_camera, [s.camera_device_id for s in from_db]),
+                    _bulk_query(weather_crud.get_latest_per_location, [s.location_id for s in from_db]),
+                )
+
+            for fusion_state in from_db:
+                latest_two = sensor_readings.get(fusion_state.sensor_device_id) or []
+                sensor_summary = None
+                if latest_two:
+                    # Sensor config comes from cache_service: no query after the first.
+                    sensor_summary = await sensor_reading_service.summarize_reading(
+                        db=db,
+                        reading=latest_two[0],
+                        prev_reading=latest_two[1] if len(latest_two) > 1 else None,
+                    )
+                fusion_state.load_initial_state(
+                    sensor_summary=sensor_summary,
+                    latest_model=model_readings.get(fusion_state.camera_device_id),
+                    latest_weather=weather_readings.get(fusion_state.location_id),
+                )
+
+        await asyncio.gather(*(fusion_state.broadcast_initial_state() for fusion_state in states))
+        await fusion_cluster.start(self, [fusion_state.location_id for fusion_state in states])
+        print(
+            f"📊 Warm-started {len(states)} location(s) ({restored} from snapshot) "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+
+
+def _freshness_cutoffs() -> tuple[datetime, datetime]:
+    """Oldest sensor/model and weather timestamps still valid for fusion."""
+    now = datetime.now(timezone.utc)
+    return (
+        now - timedelta(minutes=settings.SENSOR_WARNING_PERIOD_MINUTES),
+        now - timedelta(minutes=settings.WEATHER_CONDITION_WARNING_PERIOD_MINUTES),
+    )
+
+
+async def _bulk_query(query, ids: list[int]) -> dict:
+    """Run one warm-start bulk query on its own session so the three can overlap."""
+    async with AsyncSessionLocal() as db:
+        return await query(db, ids)
 
 
 fusion_state_manager = StateManager()
@@ -0,0 +1,199 @@
+"""Dashboard broadcast backplane across API workers.
+
+``ConnectionManager`` only holds the sockets connected to its own process. Each
+broadcast is therefore built once, at the worker where it originates, as a
+``Broadcast`` carrying the client messages already serialized, and handed to
+the backplane, which brings it to the ``ConnectionManager`` of every other
+worker. The origin delivers to its own sockets directly.
+
+* ``InProcessBackplane`` (WS_BACKPLANE="local") — one worker; nothing leaves
+  the process.
+* ``PostgresBackplane`` (WS_BACKPLANE="postgres") — NOTIFY on ``agos_ws``
+  over the shared ``pg_notify_hub`` connection. A broadcast is split into
+  chunks under the 8000-byte payload limit, sent in one statement (so the
+  chunks of one broadcast are never interleaved with another from the same
+  worker) and reassembled by every other worker; the origin skips its echo.
+
+Broadcasts published while the notify connection is down are dropped for other
+workers (counted in ``agos_ws_backplane_messages_total{direction="dropped"}``).
+"""
+
+from __future__ import annotations
+
+import base64
+import itertools
+import json
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Protocol, runtime_checkable
+
+from app.core.config import settings
+from app.core.metrics import WS_BACKPLANE_BYTES, WS_BACKPLANE_MESSAGES
+from app.core.pg_notify import ChunkAssembler, PgNotifyHub, chunk_origin, pg_notify_hub, to_chunks
+
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "agos_ws"
+
+
+@dataclass(frozen=True, slots=True)
+class Broadcast:
+    """One dashboard broadcast, ready to send.
+
+    kind "text":   texts = (message,) for every client of the location.
+    kind "fusion": texts = (full fusion_analysis_update, fusion_analysis_delta
+                   or "" when there is no patch).
+    kind "camera": image = the JPEG, timestamp = capture time; renditions and
+                   per-client encodings are made by each worker for its clients.
+    """
+
+    kind: str
+    location_id: int
+    texts: tuple[str, ...] = ()
+    image: bytes = b""
+    timestamp: datetime | None = None
+
+
+Deliver = Callable[[Broadcast], Awaitable[None]]
+
+
+@runtime_checkable
+class Backplane(Protocol):
+    name: str
+    # True when other workers' sockets are reached through this backplane.
+    cross_worker: bool
+
+    async def start(self, deliver: Deliver) -> None:
+        """Begin passing broadcasts from other workers to `deliver`."""
+        ...
+
+    async def stop(self) -> None:
+        ...
+
+    async def publish(self, broadcast: Broadcast) -> None:
+        """Send a broadcast to the other workers. Never raises."""
+        ...
+
+    def report(self) -> dict:
+        ...
+
+
+class InProcessBackplane:
+    name = "local"
+    cross_worker = False
+
+    async def start(self, deliver: Deliver) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, broadcast: Broadcast) -> None:
+        pass
+
+    def report(self) -> dict:
+        return {"mode": self.name}
+
+
+class PostgresBackplane:
+    name = "postgres"
+    cross_worker = True
+
+    def __init__(self, hub: PgNotifyHub = pg_notify_hub):
+        self._hub = hub
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._ids = itertools.count()
+        self._deliver: Deliver | None = None
+        self._chunks = ChunkAssembler()
+
+    async def start(self, deliver: Deliver) -> None:
+        if self._deliver is not None:
+            return
+        self._deliver = deliver
+        await self._hub.subscribe(CHANNEL, self._on_chunk)
+        await self._hub.start()
+
+    async def stop(self) -> None:
+        # The hub is shared; main stops it after every user is done.
+        self._chunks.clear()
+
+    def report(self) -> dict:
+        return {"mode": self.name, "worker_id": self.worker_id, "connected": self._hub.connected}
+
+    async def publish(self, broadcast: Broadcast) -> None:
+        if not self._hub.connected:
+            WS_BACKPLANE_MESSAGES.labels(direction="dropped").inc()
+            return
+        payloads = to_chunks(self.worker_id, next(self._ids), _encode(broadcast))
+        try:
+            await self._hub.publish_many(CHANNEL, payloads)
+        except Exception as e:
+            WS_BACKPLANE_MESSAGES.labels(direction="dropped").inc()
+            logger.warning("WebSocket backplane publish failed: %s", e)
+            return
+        WS_BACKPLANE_MESSAGES.labels(direction="published").inc()
+        WS_BACKPLANE_BYTES.labels(direction="published").inc(sum(len(p) for p in payloads))
+
+    async def _on_chunk(self, payload: str) -> None:
+        if chunk_origin(payload) == self.worker_id:
+            return
+        WS_BACKPLANE_BYTES.labels(direction="received").inc(len(payload))
+        wire = self._chunks.add(payload)
+        if wire is None:
+            return
+        WS_BACKPLANE_MESSAGES.labels(direction="received").inc()
+        await self._deliver(_decode(wire))
+
+
+def _encode(broadcast: Broadcast) -> str:
+    """A JSON header line, then the texts and the base64 image back to back, so
+    the already serialized client messages are not escaped a second time."""
+    header = {
+        "k": broadcast.kind,
+        "l": broadcast.location_id,
+        "n": [len(text) for text in broadcast.texts],
+        "t": broadcast.timestamp.isoformat() if broadcast.timestamp else None,
+    }
+    image = base64.b64encode(broadcast.image).decode() if broadcast.image else ""
+    return json.dumps(header, separators=(",", ":")) + "\n" + "".join(broadcast.texts) + image
+
+
+def _decode(wire: str) -> Broadcast:
+    header_line, _, body = wire.partition("\n")
+    header = json.loads(header_line)
+    texts = []
+    offset = 0
+    for length in header["n"]:
+        texts.append(body[offset:offset + length])
+        offset += length
+    image = body[offset:]
+    return Broadcast(
+        kind=header["k"],
+        location_id=header["l"],
+        texts=tuple(texts),
+        image=base64.b64decode(image) if image else b"",
+        timestamp=datetime.fromisoformat(header["t"]) if header["t"] else None,
+    )
+
+
+_BACKENDS: dict[str, type] = {
+    "local": InProcessBackplane,
+    "postgres": PostgresBackplane,
+}
+
+
+def get_backplane(name: str) -> Backplane:
+    """Return the backplane for the configured WS_BACKPLANE."""
+    backend_cls = _BACKENDS.get((name or "").lower())
+    if backend_cls is None:
+        raise ValueError(
+            f"Unknown WS_BACKPLANE '{name}'. Choose one of: {', '.join(_BACKENDS)}"
+        )
+    return backend_cls()
+
+
+backplane: Backplane = get_backplane(settings.WS_BACKPLANE)
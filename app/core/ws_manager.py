@@ -1,24 +1,162 @@
-from fastapi import WebSocket
+import json
+import time
+import asyncio
+import base64
+import struct
+from datetime import datetime
+from fastapi import WebSocket, status
+from app.utils.camera_renditions import build_renditions, DEFAULT_RENDITION
+from app.core.config import settings
+from app.core.metrics import FUSION_BROADCAST_BYTES, WS_OUTBOUND_DROPPED, WS_OUTBOUND_QUEUE_DEPTH
+from app.core.ws_backplane import Backplane, Broadcast, InProcessBackplane, backplane
+
+# Dashboards that offer this WebSocket subprotocol get camera frames as raw
+# binary messages (header + JPEG) instead of base64 inside a JSON envelope.
+CAMERA_SUBPROTOCOL = "agos.camera.v1"
+
+# Binary camera frame header, network byte order:
+#   version (u8) | message kind (u8) | location_id (u32) | timestamp ms since epoch (u64)
+# followed by the raw JPEG bytes.
+CAMERA_FRAME_HEADER = struct.Struct("!BBIQ")
+CAMERA_FRAME_VERSION = 1
+CAMERA_FRAME_KIND_JPEG = 1
+
+
+def encode_camera_frame(image_bytes: bytes, location_id: int, timestamp: datetime) -> bytes:
+    header = CAMERA_FRAME_HEADER.pack(
+        CAMERA_FRAME_VERSION,
+        CAMERA_FRAME_KIND_JPEG,
+        location_id,
+        int(timestamp.timestamp() * 1000),
+    )
+    return header + image_bytes
+
+
+class ClientConnection:
+    """A dashboard socket plus its per-client stream preferences and its
+    bounded outbound queue, drained by a writer task (see ConnectionManager)."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        camera_format: str = "json",
+        camera_enabled: bool = True,
+        rendition: str = DEFAULT_RENDITION,
+        max_fps: float | None = None,
+        fusion_delta: bool = False,
+    ):
+        self.websocket = websocket
+        self.camera_format = camera_format  # "json" (base64 camera_update) | "binary"
+        self.camera_enabled = camera_enabled
+        self.rendition = rendition          # key of CAMERA_RENDITIONS
+        self.max_fps = max_fps              # None = every relayed frame
+        self._last_frame_at = 0.0           # monotonic time of the last frame sent
+        self.fusion_delta = fusion_delta    # fusion_analysis_delta patches instead of full updates
+        self.queue: asyncio.Queue[str | bytes] = asyncio.Queue(maxsize=max(1, settings.WS_CLIENT_QUEUE_SIZE))
+        self.writer: asyncio.Task | None = None
+        self.closed = False
+
+    def enqueue(self, message: str | bytes) -> bool:
+        """Queue a message for the writer without waiting. On a full queue the
+        oldest message is dropped, or with WS_SLOW_CLIENT_POLICY="disconnect"
+        nothing is queued and False tells the caller to drop the client."""
+        if self.closed:
+            return True
+        if self.queue.full():
+            if settings.WS_SLOW_CLIENT_POLICY == "disconnect":
+                return False
+            self.queue.get_nowait()
+            WS_OUTBOUND_QUEUE_DEPTH.dec()
+            WS_OUTBOUND_DROPPED.labels(policy="drop_oldest").inc()
+        self.queue.put_nowait(message)
+        WS_OUTBOUND_QUEUE_DEPTH.inc()
+        return True
+
+    def close(self) -> None:
+        """Stop the writer and discard whatever is still queued."""
+        self.closed = True
+        if self.writer is not None and self.writer is not asyncio.current_task():
+            self.writer.cancel()
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            WS_OUTBOUND_QUEUE_DEPTH.dec()
+
+    def wants_frame(self, now: float) -> bool:
+        if not self.camera_enabled:
+            return False
+        if not self.max_fps:
+            return True
+        return now - self._last_frame_at >= 1.0 / self.max_fps
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.connections: dict[int, list[WebSocket]] = {}
+    """Dashboard sockets of this worker. Broadcasts are serialized here, sent
+    to the other workers through the backplane (see ws_backplane) and
+    delivered to the local sockets; deliver() is also what the backplane
+    calls with broadcasts from other workers.
+
+    Delivering only puts the message on each client's outbound queue
+    (WS_CLIENT_QUEUE_SIZE); a writer task per client does the actual sends.
+    A dashboard on a slow link therefore never holds up the other clients or
+    the sensor / fusion path that broadcast. When its queue is full it loses
+    its oldest message or, with WS_SLOW_CLIENT_POLICY="disconnect", is closed
+    with 1013 (try again later) so it reconnects and reloads the initial state."""
+
+    def __init__(self, backplane: Backplane | None = None):
+        self.connections: dict[int, list[ClientConnection]] = {}
         # int is the location_id
+        self.backplane = backplane or InProcessBackplane()
+        self._closing: set[asyncio.Task] = set()
+
+    async def start(self):
+        await self.backplane.start(self.deliver)
+
+    async def stop(self):
+        await self.backplane.stop()
+        for location_id, clients in list(self.connections.items()):
+            for client in clients[:]:
+                self._remove(client, location_id)
 
-    async def connect(self, websocket: WebSocket, location_id: int):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        location_id: int,
+        camera_format: str = "json",
+        camera_enabled: bool = True,
+        rendition: str = DEFAULT_RENDITION,
+        max_fps: float | None = None,
+        fusion_delta: bool = False,
+    ) -> ClientConnection:
         if location_id not in self.connections:
             self.connections[location_id] = []
 
-        self.connections[location_id].append(websocket)
+        client = ClientConnection(
+            websocket,
+            camera_format=camera_format,
+            camera_enabled=camera_enabled,
+            rendition=rendition,
+            max_fps=max_fps,
+            fusion_delta=fusion_delta,
+        )
+        client.writer = asyncio.create_task(self._write_loop(client, location_id))
+        self.connections[location_id].append(client)
         print(f"Client connected. Total connections: {len(self.connections[location_id])}")
-    
+        return client
+
     async def disconnect(self, websocket: WebSocket, location_id: int):
-        if location_id in self.connections and websocket in self.connections[location_id]:
-            self.connections[location_id].remove(websocket)
-            print(f"Client disconnected. Total connections: {len(self.connections[location_id])}")
+        clients = self.connections.get(location_id)
+        client = next((c for c in clients or [] if c.websocket is websocket), None)
+        if client is not None:
+            self._remove(client, location_id)
+            print(f"Client disconnected. Total connections: {len(clients)}")
 
+    def _remove(self, client: ClientConnection, location_id: int):
+        client.close()
+        clients = self.connections.get(location_id)
+        if clients and client in clients:
+            clients.remove(client)
             # Cleanup if no connections left for this location
-            if not self.connections[location_id]:
+            if not clients:
                 del self.connections[location_id]
 
     """
@@ -40,28 +178,170 @@ class ConnectionManager:
     """
     async def broadcast_to_location(self, message: dict, location_id: int):
 
-        if location_id not in self.connections:
+        if location_id not in self.connections and not self.backplane.cross_worker:
             return  # No connections for this location
 
-        disconnected = []
-        for ws in self.connections[location_id][:]: # iterate over a copy of the list
-            try:
+        # Serialize once for every client (same encoding as WebSocket.send_json).
+        text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+        await self._fan_out(Broadcast("text", location_id, texts=(text,)))
+
+    async def broadcast_fusion(self, location_id: int, data: dict, patch: dict | None, seq: int):
+        """Send a changed fusion state: the full fusion_analysis_update to legacy
+        clients, and to delta clients a fusion_analysis_delta carrying only the
+        merge patch from the previous state (seq - 1). Each form is serialized
+        once; with a cross-worker backplane both are, for the other workers' clients."""
+
+        clients = self.connections.get(location_id, [])
+        cross_worker = self.backplane.cross_worker
+        if not clients and not cross_worker:
+            return
+
+        full = delta = ""
+        if cross_worker or any(not c.fusion_delta or patch is None for c in clients):
+            full = json.dumps(
+                {"type": "fusion_analysis_update", "seq": seq, "data": data},
+                separators=(",", ":"), ensure_ascii=False,
+            )
+        if patch is not None and (cross_worker or any(c.fusion_delta for c in clients)):
+            delta = json.dumps(
+                {"type": "fusion_analysis_delta", "data": {"seq": seq, "base_seq": seq - 1, "patch": patch}},
+                separators=(",", ":"), ensure_ascii=False,
+            )
+        await self._fan_out(Broadcast("fusion", location_id, texts=(full, delta)))
+
+    async def broadcast_camera_frame(self, image_bytes: bytes, location_id: int, timestamp: datetime):
+        """Relay a camera JPEG to every client that is due a frame under its fps
+        cap, on every worker unless WS_BACKPLANE_CAMERA_FRAMES is off."""
+
+        broadcast = Broadcast("camera", location_id, image=image_bytes, timestamp=timestamp)
+        await self.deliver(broadcast)
+        if settings.WS_BACKPLANE_CAMERA_FRAMES:
+            await self.backplane.publish(broadcast)
+
+    async def _fan_out(self, broadcast: Broadcast):
+        # Local clients first: their queues are filled before anything can
+        # yield, so queue order follows broadcast order.
+        await self.deliver(broadcast)
+        await self.backplane.publish(broadcast)
+
+    def send_to_client(self, client: ClientConnection, location_id: int, message: dict):
+        """Queue a message for one client, behind the broadcasts it already has queued."""
+        text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+        self._enqueue([client], location_id, text=text)
+
+    async def deliver(self, broadcast: Broadcast):
+        """Send a broadcast, from this worker or another, to this worker's sockets."""
+
+        if broadcast.kind == "camera":
+            await self._deliver_camera_frame(broadcast.image, broadcast.location_id, broadcast.timestamp)
+        elif broadcast.kind == "fusion":
+            await self._deliver_fusion(broadcast.location_id, *broadcast.texts)
+        else:
+            clients = self.connections.get(broadcast.location_id)
+            if clients:
+                self._enqueue(clients[:], broadcast.location_id, text=broadcast.texts[0])
+
+    async def _deliver_fusion(self, location_id: int, full: str, delta: str):
+        clients = self.connections.get(location_id)
+        if not clients:
+            return
+
+        full_clients = [c for c in clients if not c.fusion_delta or not delta]
+        delta_clients = [c for c in clients if c.fusion_delta and delta]
+
+        if full_clients:
+            FUSION_BROADCAST_BYTES.labels(encoding="full").inc(len(full) * len(full_clients))
+            self._enqueue(full_clients, location_id, text=full)
+        if delta_clients:
+            FUSION_BROADCAST_BYTES.labels(encoding="delta").inc(len(delta) * len(delta_clients))
+            self._enqueue(delta_clients, location_id, text=delta)
+
+    async def _deliver_camera_frame(self, image_bytes: bytes, location_id: int, timestamp: datetime):
+        """Each rendition that has a subscriber is rendered once, and each
+        (rendition, format) payload is encoded once: binary-subprotocol clients
+        get header + raw JPEG, legacy clients the base64 camera_update."""
+
+        now = time.monotonic()
+        clients = [c for c in self.connections.get(location_id, []) if c.wants_frame(now)]
+        if not clients:
+            return
+
+        names = {c.rendition for c in clients}
+        if names == {DEFAULT_RENDITION}:
+            renditions = {DEFAULT_RENDITION: image_bytes}
+        else:
+            loop = asyncio.get_running_loop()
+            renditions = await loop.run_in_executor(None, build_renditions, image_bytes, names)
+
+        groups: dict[tuple[str, str], list[ClientConnection]] = {}
+        for client in clients:
+            client._last_frame_at = now
+            groups.setdefault((client.rendition, client.camera_format), []).append(client)
+
+        for (name, camera_format), group in groups.items():
+            jpeg = renditions[name]
+            if camera_format == "binary":
+                frame = encode_camera_frame(jpeg, location_id, timestamp)
+                self._enqueue(group, location_id, data=frame)
+            else:
+                text = json.dumps(
+                    {
+                        "type": "camera_update",
+                        "data": {
+                            "image": base64.b64encode(jpeg).decode("utf-8"),
+                            "timestamp": timestamp.isoformat(),
+                        },
+                    },
+                    separators=(",", ":"),
+                )
+                self._enqueue(group, location_id, text=text)
+
+    def _enqueue(
+        self,
+        clients: list[ClientConnection],
+        location_id: int,
+        text: str | None = None,
+        data: bytes | None = None,
+    ):
+        message = data if data is not None else text
+        for client in clients:
+            if not client.enqueue(message):
+                self._disconnect_slow(client, location_id)
+
+    def _disconnect_slow(self, client: ClientConnection, location_id: int):
+        WS_OUTBOUND_DROPPED.labels(policy="disconnect").inc(client.queue.qsize() + 1)
+        self._remove(client, location_id)
+        print(f"Disconnecting slow WebSocket client (location {location_id})")
+        task = asyncio.create_task(self._close_socket(client.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_socket(ws: WebSocket):
+        try:
+            await asyncio.wait_for(ws.close(code=status.WS_1013_TRY_AGAIN_LATER), timeout=5)
+        except Exception:
+            pass  # Already gone; the endpoint's receive loop ends either way
+
+    async def _write_loop(self, client: ClientConnection, location_id: int):
+        ws = client.websocket
+        try:
+            while True:
+                message = await client.queue.get()
+                WS_OUTBOUND_QUEUE_DEPTH.dec()
                 # Check application state if possible (FastAPI/Starlette specific)
                 if ws.client_state.name != "CONNECTED":
-                    disconnected.append(ws)
-                    continue
-                
-                await ws.send_json(message)
-            except RuntimeError:
-                # This catches 'Unexpected ASGI message' (Client already closed)
-                disconnected.append(ws)
-            except Exception as e:
-                print(f"Error broadcasting to client: {e}")
-                disconnected.append(ws)
-
-        for ws in disconnected:
-            if location_id in self.connections and ws in self.connections[location_id]:
-                self.connections[location_id].remove(ws)
-
-
-ws_manager = ConnectionManager()
\ No newline at end of file
+                    break
+                if isinstance(message, bytes):
+                    await ws.send_bytes(message)
+                else:
+                    await ws.send_text(message)
+        except RuntimeError:
+            # This catches 'Unexpected ASGI message' (Client already closed)
+            pass
+        except Exception as e:
+            print(f"Error broadcasting to client: {e}")
+        self._remove(client, location_id)
+
+
+ws_manager = ConnectionManager(backplane)
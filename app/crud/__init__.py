@@ -15,6 +15,7 @@ from .refresh_token import refresh_token_crud
 from .push_subscription import push_subscription_crud
 from .notification_delivery import notification_delivery_crud
 from .notification_dispatch import notification_dispatch_crud
+from .notification_intent import notification_intent_crud
 from .notification_template import notification_template_crud
 from .acknowledgement import acknowledgement_crud
 from .password_reset_otp import password_reset_otp_crud
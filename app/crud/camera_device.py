@@ -1,5 +1,5 @@
 from app.crud.base import CRUDBase
-from app.models import CameraDevice
+from app.models import CameraDevice, CameraROI
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -25,6 +25,38 @@ class CRUDCameraDevice(CRUDBase[CameraDevice, None, None]):
         )
         camera_device = result.scalars().first()
         return camera_device
-    
+
+
+    async def get_ids_by_location(self, db: AsyncSession) -> dict[int, int]:
+        """location_id -> device id (lowest id when a location has several), in one query."""
+        result = await db.execute(
+            select(self.model.location_id, self.model.id)
+            .distinct(self.model.location_id)
+            .order_by(self.model.location_id, self.model.id)
+        )
+        return dict(result.all())
+
+
+    async def get_all_rois(self, db: AsyncSession) -> dict[int, CameraROI | None]:
+
+        result = await db.execute(select(self.model.id, self.model.roi))
+        return {row.id: row.roi for row in result.all()}
+
+
+    async def update_roi(self, db: AsyncSession, camera_device_id: int, roi: CameraROI | None) -> CameraDevice | None:
+
+        result = await db.execute(
+            select(self.model).filter(self.model.id == camera_device_id)
+        )
+        device = result.scalars().first()
+
+        if device is None:
+            return None
+
+        device.roi = roi
+        await db.commit()
+        await db.refresh(device)
+        return device
+
 
 camera_device_crud = CRUDCameraDevice(CameraDevice)
\ No newline at end of file
@@ -3,7 +3,7 @@ from app.models.data_sources.model_readings import ModelReadings
 from app.schemas import ModelReadingCreate
 from app.crud.base import CRUDBase
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
+from sqlalchemy import delete, select, update
 
 
 class CRUDModelReadings(CRUDBase[ModelReadings, ModelReadingCreate, None]):
@@ -18,6 +18,16 @@ class CRUDModelReadings(CRUDBase[ModelReadings, ModelReadingCreate, None]):
         )
         return result.mappings().first()
 
+    async def get_latest_per_camera(self, db: AsyncSession, camera_device_ids: list[int]) -> dict[int, dict]:
+        """Latest blockage_status/timestamp for every camera in one DISTINCT ON query."""
+        result = await db.execute(
+            select(self.model.camera_device_id, self.model.blockage_status, self.model.timestamp)
+            .filter(self.model.camera_device_id.in_(camera_device_ids))
+            .distinct(self.model.camera_device_id)
+            .order_by(self.model.camera_device_id, self.model.timestamp.desc())
+        )
+        return {row["camera_device_id"]: row for row in result.mappings().all()}
+
     async def get_items_paginated(
         self,
         db: AsyncSession,
@@ -55,6 +65,14 @@ class CRUDModelReadings(CRUDBase[ModelReadings, ModelReadingCreate, None]):
         )
         return result.scalars().first()
 
+    async def update_image_path(self, db: AsyncSession, reading_id: int, image_path: str) -> None:
+        await db.execute(
+            update(self.model)
+            .where(self.model.id == reading_id)
+            .values(image_path=image_path)
+        )
+        await db.commit()
+
 
     async def delete_older_than(self, db: AsyncSession, cutoff: datetime) -> int:
         result = await db.execute(
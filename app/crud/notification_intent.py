@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models import NotificationIntent, NotificationIntentStatus, NotificationType
+
+
+class CRUDNotificationIntent(CRUDBase[NotificationIntent, None, None]):
+
+    async def create_pending(
+        self, db: AsyncSession, *, location_id: int, notification_type: NotificationType
+    ) -> int:
+        intent = NotificationIntent(location_id=location_id, type=notification_type)
+        db.add(intent)
+        await db.commit()
+        return intent.id
+
+    async def get_pending(
+        self, db: AsyncSession, location_ids: list[int] | None = None
+    ) -> list[NotificationIntent]:
+        query = select(self.model).where(self.model.status == NotificationIntentStatus.PENDING)
+        if location_ids is not None:
+            query = query.where(self.model.location_id.in_(location_ids))
+        result = await db.execute(query.order_by(self.model.created_at))
+        return result.scalars().all()
+
+    async def claim(self, db: AsyncSession, intent_id: int) -> NotificationIntent | None:
+        """Atomically move a pending intent to sending. None when it is not
+        pending any more (another worker claimed it, or it was processed)."""
+        result = await db.execute(
+            update(self.model)
+            .where(
+                self.model.id == intent_id,
+                self.model.status == NotificationIntentStatus.PENDING,
+            )
+            .values(status=NotificationIntentStatus.SENDING, claimed_at=datetime.now(timezone.utc))
+            .returning(self.model)
+        )
+        intent = result.scalar_one_or_none()
+        await db.commit()
+        return intent
+
+    async def mark(
+        self,
+        db: AsyncSession,
+        intent: NotificationIntent,
+        status: NotificationIntentStatus,
+        error_message: str | None = None,
+    ) -> None:
+        intent.status = status
+        intent.error_message = error_message
+        if status not in (NotificationIntentStatus.PENDING, NotificationIntentStatus.SENDING):
+            intent.processed_at = datetime.now(timezone.utc)
+        await db.commit()
+
+    async def release_stale_claims(self, db: AsyncSession, claimed_before: datetime) -> int:
+        """Put intents left in sending by a worker that died mid-send back to
+        pending, counting the interrupted attempt."""
+        result = await db.execute(
+            update(self.model)
+            .where(
+                self.model.status == NotificationIntentStatus.SENDING,
+                or_(self.model.claimed_at < claimed_before, self.model.claimed_at.is_(None)),
+            )
+            .values(
+                status=NotificationIntentStatus.PENDING,
+                attempts=self.model.attempts + 1,
+                error_message="Interrupted during delivery",
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def expire_pending(self, db: AsyncSession, older_than: datetime) -> int:
+        """Skip pending intents too old to be worth sending (e.g. after a long outage)."""
+        result = await db.execute(
+            update(self.model)
+            .where(
+                self.model.status == NotificationIntentStatus.PENDING,
+                self.model.created_at < older_than,
+            )
+            .values(
+                status=NotificationIntentStatus.SKIPPED,
+                error_message="Expired before delivery",
+                processed_at=datetime.now(timezone.utc),
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+    async def get_last_sent(
+        self, db: AsyncSession, since: datetime, location_ids: list[int] | None = None
+    ) -> dict[tuple[int, NotificationType], datetime]:
+        """Latest successful send per (location, type) since `since` — used to
+        restore notification cooldowns across restarts and ownership moves."""
+        query = select(self.model.location_id, self.model.type, func.max(self.model.processed_at)).where(
+            self.model.status == NotificationIntentStatus.SENT,
+            self.model.processed_at >= since,
+        )
+        if location_ids is not None:
+            query = query.where(self.model.location_id.in_(location_ids))
+        result = await db.execute(query.group_by(self.model.location_id, self.model.type))
+        return {(location_id, type_): sent_at for location_id, type_, sent_at in result.all()}
+
+    async def delete_processed_before(self, db: AsyncSession, cutoff: datetime) -> int:
+        result = await db.execute(
+            delete(self.model).where(
+                self.model.status.not_in((NotificationIntentStatus.PENDING, NotificationIntentStatus.SENDING)),
+                self.model.created_at < cutoff,
+            )
+        )
+        await db.commit()
+        return result.rowcount
+
+
+notification_intent_crud = CRUDNotificationIntent(NotificationIntent)
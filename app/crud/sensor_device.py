@@ -76,6 +76,16 @@ class CRUDSensorDevice(CRUDBase[SensorDevice, None, None]):
         return result.scalars().first()
 
 
+    async def get_ids_by_location(self, db: AsyncSession) -> dict[int, int]:
+        """location_id -> device id (lowest id when a location has several), in one query."""
+        result = await db.execute(
+            select(self.model.location_id, self.model.id)
+            .distinct(self.model.location_id)
+            .order_by(self.model.location_id, self.model.id)
+        )
+        return dict(result.all())
+
+
     async def update_config(self, db: AsyncSession, sensor_device_id: int, config: SensorConfig) -> SensorConfig:
 
         result = await db.execute(
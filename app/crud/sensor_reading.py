@@ -23,6 +23,33 @@ class CRUDSensorReading(CRUDBase[SensorReading, SensorReadingCreate, None]):
         return result.scalars().first()
 
 
+    async def get_latest_two_per_device(
+        self, db: AsyncSession, sensor_device_ids: list[int]
+    ) -> dict[int, list[SensorReading]]:
+        """Newest reading and the one before it for every device, in one query
+        (warm start). Values are newest first."""
+        ranked = (
+            select(
+                self.model.id,
+                func.row_number()
+                .over(partition_by=self.model.sensor_device_id, order_by=self.model.timestamp.desc())
+                .label("rn"),
+            )
+            .where(self.model.sensor_device_id.in_(sensor_device_ids))
+            .subquery()
+        )
+        result = await db.execute(
+            select(self.model)
+            .join(ranked, ranked.c.id == self.model.id)
+            .where(ranked.c.rn <= 2)
+            .order_by(self.model.sensor_device_id, self.model.timestamp.desc())
+        )
+        readings: dict[int, list[SensorReading]] = {}
+        for reading in result.scalars().all():
+            readings.setdefault(reading.sensor_device_id, []).append(reading)
+        return readings
+
+
     # For getting the previous reading before a specific timestamp
     async def get_previous_reading(self, db: AsyncSession, before_timestamp: datetime) -> SensorReading | None:
 
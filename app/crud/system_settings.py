@@ -35,4 +35,20 @@ class CRUDSystemSettings(CRUDBase[SystemSettings, SystemSettingsCreate, SystemSe
         return setting.json_value
 
 
+    async def set_value(self, db: AsyncSession, key: str, value: Any) -> SystemSettings:
+
+        result = await db.execute(select(self.model).filter(self.model.key == key))
+        setting = result.scalars().first()
+
+        if setting is None:
+            setting = self.model(key=key, json_value=value)
+        else:
+            setting.json_value = value
+
+        db.add(setting)
+        await db.commit()
+        await db.refresh(setting)
+        return setting
+
+
 system_settings_crud = CRUDSystemSettings(SystemSettings)
\ No newline at end of file
@@ -19,6 +19,17 @@ class CRUDWeather(CRUDBase[Weather, WeatherCreate, None]):
         return result.mappings().first()
 
 
+    async def get_latest_per_location(self, db: AsyncSession, location_ids: list[int]) -> dict[int, dict]:
+        """Latest weather row for every location in one DISTINCT ON query."""
+        result = await db.execute(
+            select(self.model.location_id, self.model.precipitation_mm, self.model.weather_code, self.model.created_at)
+            .filter(self.model.location_id.in_(location_ids))
+            .distinct(self.model.location_id)
+            .order_by(self.model.location_id, self.model.created_at.desc())
+        )
+        return {row["location_id"]: row for row in result.mappings().all()}
+
+
     async def get_latest_weather_full(self, db: AsyncSession, location_id: int) -> Weather | None:
 
         result = await db.execute(
@@ -23,8 +23,15 @@ from app.api.v1.router import api_router
 from app.api.v1.endpoints.websocket import router as ws_router
 
 from app.services import weather_service
+from app.services import ml_service
+from app.services import frame_spool_service
+from app.services import notification_intent_service
+from app.services import state_snapshot_service
 # from app.services import database_cleanup_service
 from app.core.state import fusion_state_manager
+from app.core.fusion_cluster import fusion_cluster
+from app.core.pg_notify import pg_notify_hub
+from app.core.ws_manager import ws_manager
 from app.core.scheduler import start_scheduler, shutdown_scheduler
 
 
@@ -58,11 +65,16 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting application...")
     init_cloudinary()
+    await frame_spool_service.start()
+    await notification_intent_service.start()
+    await ml_service.start()
     await weather_service.start()
     # await database_cleanup_service.start()
+    await ws_manager.start()
     # Initialize Fusion Analysis State with latest data
     print("📊 Loading initial fusion analysis state...")
-    await fusion_state_manager.start_all_states()
+    await fusion_state_manager.start_all_states(snapshot=state_snapshot_service.restore())
+    await state_snapshot_service.start()
     print("✅ Fusion analysis state loaded.")
 
     # Start scheduler for daily summary jobs
@@ -73,7 +85,14 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("🛑 Shutting down application...")
     shutdown_scheduler()
+    await state_snapshot_service.stop()
+    await fusion_cluster.stop()
+    await ws_manager.stop()
+    await pg_notify_hub.stop()
     await weather_service.stop()
+    await ml_service.stop()
+    await notification_intent_service.stop()
+    await frame_spool_service.stop()
     # await database_cleanup_service.stop()
     await engine.dispose()
     print("✅ Database engine disposed.")
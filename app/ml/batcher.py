@@ -0,0 +1,161 @@
+"""Micro-batching scheduler for ONNX inference.
+
+Frames submitted from any camera are collected into one batch until either
+``max_batch_size`` frames are waiting or the oldest frame has waited
+``max_wait_ms``. The batch is handed to ``run_batch`` in a single call and each
+result is resolved back to the caller that submitted the frame.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from app.core.metrics import (
+    INFERENCE_BATCH_SIZE,
+    INFERENCE_BATCH_WAIT_SECONDS,
+    INFERENCE_BATCH_RUN_SECONDS,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingFrame:
+    camera_device_id: int
+    payload: Any
+    future: asyncio.Future
+    enqueued_at: float
+
+
+class InferenceBatcher:
+    """
+    Shared queue in front of the inference runner.
+    `run_batch` receives the payloads in submission order and must return one
+    result per payload, in the same order.
+    At most `max_concurrent_batches` batches run at once; while they are busy
+    new frames keep accumulating, so batches grow naturally under load.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[Any]], Awaitable[list[Any]]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        max_concurrent_batches: int = 1,
+    ):
+        self._run_batch = run_batch
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._max_concurrent_batches = max(1, max_concurrent_batches)
+        # Created lazily so they bind to the running event loop, not the import-time one.
+        self._queue: asyncio.Queue | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._collector: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    def configure(self, max_batch_size: int | None = None, max_concurrent_batches: int | None = None) -> None:
+        """Adjust limits once the runner's capabilities are known. Takes effect
+        for the next batch; the concurrency limit only before the first submit."""
+        if max_batch_size is not None:
+            self._max_batch_size = max(1, max_batch_size)
+        if max_concurrent_batches is not None and self._slots is None:
+            self._max_concurrent_batches = max(1, max_concurrent_batches)
+
+    async def submit(self, camera_device_id: int, payload: Any) -> Any:
+        """Queue one frame and wait for its result."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(
+            _PendingFrame(
+                camera_device_id=camera_device_id,
+                payload=payload,
+                future=future,
+                enqueued_at=time.monotonic(),
+            )
+        )
+        return await future
+
+    async def stop(self) -> None:
+        """Stop collecting and fail any frames still waiting in the queue."""
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        if self._queue is not None:
+            _fail([self._queue.get_nowait() for _ in range(self._queue.qsize())])
+        self._queue = None
+        self._slots = None
+
+    def _ensure_started(self) -> None:
+        if self._collector is not None and not self._collector.done():
+            return
+        self._queue = self._queue or asyncio.Queue()
+        self._slots = self._slots or asyncio.Semaphore(self._max_concurrent_batches)
+        self._collector = asyncio.create_task(self._collect_loop())
+
+    async def _collect_loop(self) -> None:
+        while True:
+            first: _PendingFrame = await self._queue.get()
+            batch = [first]
+            try:
+                await self._fill_batch(batch, deadline=first.enqueued_at + self._max_wait)
+                await self._slots.acquire()
+            except asyncio.CancelledError:
+                # stop() mid-collection: these frames are off the queue already.
+                _fail(batch)
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _fill_batch(self, batch: list[_PendingFrame], deadline: float) -> None:
+        while len(batch) < self._max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                return
+
+    async def _dispatch(self, batch: list[_PendingFrame]) -> None:
+        started = time.monotonic()
+        INFERENCE_BATCH_SIZE.observe(len(batch))
+        for pending in batch:
+            INFERENCE_BATCH_WAIT_SECONDS.observe(started - pending.enqueued_at)
+
+        try:
+            results = await self._run_batch([pending.payload for pending in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"run_batch returned {len(results)} results for {len(batch)} frames"
+                )
+            for pending, result in zip(batch, results):
+                if not pending.future.done():
+                    pending.future.set_result(result)
+        except Exception as e:
+            logger.warning("Inference batch of %d failed (%s)", len(batch), type(e).__name__)
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+        finally:
+            INFERENCE_BATCH_RUN_SECONDS.observe(time.monotonic() - started)
+            self._slots.release()
+
+
+def _fail(frames: list[_PendingFrame]) -> None:
+    for pending in frames:
+        if not pending.future.done():
+            pending.future.set_exception(RuntimeError("Inference batcher stopped"))
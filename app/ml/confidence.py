@@ -0,0 +1,117 @@
+"""Rolling per-camera windows for the obstruction confidence engine.
+
+Every camera's last ``k`` raw statuses live in one shared (cameras, k) uint8
+ring array. Per-camera counts of each status are adjusted as a reading enters
+and the oldest one leaves, so a push is O(1) whatever the window size, and the
+counts are all the confidence tiers need. The write position and counts are
+plain Python ints: they are touched on every push, and NumPy scalar access
+would cost more than the recount it replaces at the default K.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+
+CLEAR, PARTIAL, BLOCKED = 0, 1, 2
+STATUS_CODES = {"clear": CLEAR, "partial": PARTIAL, "blocked": BLOCKED}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+
+class WindowCounts(NamedTuple):
+    filled: int   # readings in the window (== k once warmed up)
+    blocked: int
+    partial: int
+
+
+class ConfidenceWindows:
+    """Fixed-size ring buffers of raw statuses, one row per camera."""
+
+    def __init__(self, k: int, capacity: int = 8):
+        self._k = max(1, k)
+        self._rows: dict[int, int] = {}
+        self._ring = np.zeros((max(1, capacity), self._k), dtype=np.uint8)
+        self._head: list[int] = []            # next write position per row
+        self._filled: list[int] = []
+        self._counts: list[list[int]] = []    # per row, indexed by status code
+
+    @property
+    def k(self) -> int:
+        return self._k
+
+    def push(self, camera_device_id: int, status: str) -> WindowCounts:
+        """Append `status` to the camera's window (evicting the oldest reading
+        once full) and return the updated counts."""
+        row = self._row(camera_device_id)
+        code = STATUS_CODES.get(status, CLEAR)
+        head = self._head[row]
+        counts = self._counts[row]
+        ring = self._ring[row]
+
+        if self._filled[row] == self._k:
+            counts[ring[head]] -= 1
+        else:
+            self._filled[row] += 1
+        ring[head] = code
+        counts[code] += 1
+        self._head[row] = head + 1 if head + 1 < self._k else 0
+
+        return WindowCounts(self._filled[row], counts[BLOCKED], counts[PARTIAL])
+
+    def counts(self, camera_device_id: int) -> WindowCounts:
+        row = self._rows.get(camera_device_id)
+        if row is None:
+            return WindowCounts(0, 0, 0)
+        return WindowCounts(self._filled[row], self._counts[row][BLOCKED], self._counts[row][PARTIAL])
+
+    def resize(self, k: int) -> None:
+        """Change the window size, keeping each camera's newest readings."""
+        k = max(1, k)
+        if k == self._k:
+            return
+        ring = np.zeros((len(self._ring), k), dtype=np.uint8)
+
+        for row in self._rows.values():
+            filled = self._filled[row]
+            # Oldest -> newest: rolling by -head puts the oldest slot first.
+            ordered = np.roll(self._ring[row], -self._head[row])[self._k - filled:]
+            kept = ordered[len(ordered) - min(filled, k):]
+            ring[row, :len(kept)] = kept
+            self._filled[row] = len(kept)
+            self._head[row] = len(kept) % k
+            self._counts[row] = np.bincount(kept, minlength=len(STATUS_CODES)).tolist()
+
+        self._k = k
+        self._ring = ring
+
+    def snapshot(self) -> dict[int, str]:
+        """Each camera's window, oldest -> newest, as a string of status codes
+        (e.g. "0012") for the state snapshot file."""
+        out = {}
+        for camera_device_id, row in self._rows.items():
+            filled = self._filled[row]
+            ordered = np.roll(self._ring[row], -self._head[row])[self._k - filled:]
+            out[camera_device_id] = "".join(str(code) for code in ordered.tolist())
+        return out
+
+    def restore(self, windows: dict[int, str]) -> None:
+        """Refill windows from snapshot(). Cameras already holding readings are
+        left alone; a window longer than k keeps its newest readings."""
+        for camera_device_id, codes in windows.items():
+            if camera_device_id in self._rows:
+                continue
+            for code in codes[-self._k:]:
+                self.push(camera_device_id, STATUS_NAMES.get(int(code), "clear"))
+
+    def _row(self, camera_device_id: int) -> int:
+        row = self._rows.get(camera_device_id)
+        if row is not None:
+            return row
+
+        row = len(self._rows)
+        if row == len(self._ring):
+            self._ring = np.concatenate([self._ring, np.zeros_like(self._ring)])
+        self._rows[camera_device_id] = row
+        self._head.append(0)
+        self._filled.append(0)
+        self._counts.append([0] * len(STATUS_CODES))
+        return row
@@ -0,0 +1,484 @@
+"""YOLOv8 ONNX frame detector.
+
+Pure compute only — JPEG decode, letterbox, ONNX run, postprocess/NMS, coverage,
+and (lazily, off the inference path) box drawing — with no imports outside
+``app.ml``, so the same code runs inside the API process and inside the
+out-of-process inference workers (``app.ml.worker_pool``).
+"""
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+
+from app.ml.runtime import SessionConfig, session_options
+
+logger = logging.getLogger(__name__)
+
+WEIGHTS_PATH = Path(__file__).parent / "weights" / "best.onnx"
+
+# Coverage % -> per-frame status
+CLEAR_MAX = 20.0      # < 20%      -> clear
+PARTIAL_MAX = 60.0    # 20% - 60%  -> partial
+                      # >= 60%     -> blocked
+
+# YOLO thresholds
+CONF_THRESHOLD = 0.35
+IOU_THRESHOLD = 0.5
+
+# Coverage spans are merged with NumPy from this many detections up; below it
+# the array setup costs more than the Python merge (scripts/benchmark_confidence.py).
+VECTOR_MERGE_MIN_SPANS = 32
+
+# Fallback input size if ONNX model declares dynamic spatial dims
+DEFAULT_INPUT_SIZE = 640
+
+# (x1, y1, x2, y2, confidence) in original frame pixels
+Detection = tuple[float, float, float, float, float]
+# (raw_percentage, raw_status, detections)
+FrameResult = tuple[float, str, list[Detection]]
+
+# Region of interest: polygon of normalized (x, y) points, 0-1 (see CameraROI).
+Roi = tuple[tuple[float, float], ...]
+# Pixel box (x0, y0, x1, y1) in original frame coordinates.
+Region = tuple[int, int, int, int]
+
+
+def status_from_pct(pct: float) -> str:
+    if pct < CLEAR_MAX:
+        return "clear"
+    if pct < PARTIAL_MAX:
+        return "partial"
+    return "blocked"
+
+
+@dataclass(frozen=True)
+class DetectorInfo:
+    """What a loaded detector reports back to the API process (picklable)."""
+    weights: str
+    input_size: tuple[int, int]
+    dynamic_batch: bool
+    session: dict
+    warmup_ms: list[float] = field(default_factory=list)
+
+    def report(self) -> dict:
+        """Configuration plus steady-state latency (first warm-up run excluded)."""
+        steady = sorted(self.warmup_ms[1:] or self.warmup_ms)
+        return {
+            "weights": self.weights,
+            "input_size": list(self.input_size),
+            "dynamic_batch": self.dynamic_batch,
+            "session": self.session,
+            "first_run_ms": round(self.warmup_ms[0], 1) if self.warmup_ms else None,
+            "median_run_ms": round(steady[len(steady) // 2], 1) if steady else None,
+        }
+
+
+def roi_region(roi: Roi | None, w: int, h: int) -> Region:
+    """Pixel bounding box of `roi` in a w x h frame; the whole frame for None
+    or for an ROI that collapses to a sliver at this resolution."""
+    if not roi:
+        return 0, 0, w, h
+    xs = [x for x, _ in roi]
+    ys = [y for _, y in roi]
+    x0, y0 = max(0, int(min(xs) * w)), max(0, int(min(ys) * h))
+    x1, y1 = min(w, math.ceil(max(xs) * w)), min(h, math.ceil(max(ys) * h))
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return 0, 0, w, h
+    return x0, y0, x1, y1
+
+
+def pack_detections(detections: list[Detection], roi: Roi | None) -> dict:
+    """Compact JSON form stored on model_readings.detections."""
+    return {
+        "boxes": [
+            [round(x1, 1), round(y1, 1), round(x2, 1), round(y2, 1), round(conf, 3)]
+            for x1, y1, x2, y2, conf in detections
+        ],
+        "roi": [list(point) for point in roi] if roi else None,
+    }
+
+
+def render_annotated(image_bytes: bytes, packed: dict) -> bytes:
+    """Draw stored detections (and the ROI outline) on the original frame and
+    encode it as JPEG. Runs on demand, not per inferred frame."""
+    from PIL import Image, ImageDraw
+
+    img = Image.open(BytesIO(image_bytes)).convert("RGB")
+    boxes = [tuple(box) for box in packed.get("boxes") or []]
+    annotated = FrameDetector._draw_boxes(img, boxes)
+    roi = packed.get("roi")
+    if roi:
+        w, h = img.size
+        ImageDraw.Draw(annotated).polygon([(x * w, y * h) for x, y in roi], outline="yellow", width=2)
+    buf = BytesIO()
+    annotated.save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _is_box(roi: Roi) -> bool:
+    return len(roi) == 4 and len({x for x, _ in roi}) == 2 and len({y for _, y in roi}) == 2
+
+
+def load_session(
+    weights_path: Path = WEIGHTS_PATH,
+    config: SessionConfig | None = None,
+    preoptimized: bool = False,
+):
+    """Create a CPU InferenceSession, or return None when the weights are absent
+    or fail to load (callers fall back to placeholder predictions)."""
+    if not weights_path.exists():
+        logger.warning(
+            "ONNX weights not found at %s; using placeholder predictions",
+            weights_path,
+        )
+        return None
+    try:
+        import onnxruntime as ort
+        session = ort.InferenceSession(
+            str(weights_path),
+            sess_options=session_options(config or SessionConfig(), preoptimized),
+            providers=["CPUExecutionProvider"],
+        )
+        logger.info("ONNX model loaded from %s", weights_path)
+        return session
+    except Exception as e:
+        logger.warning(
+            "Failed to load ONNX model (%s); using placeholder",
+            type(e).__name__,
+        )
+        return None
+
+
+class FrameDetector:
+    """One InferenceSession plus the pre/postprocessing around it."""
+
+    def __init__(self, session, weights_path: Path = WEIGHTS_PATH, config: SessionConfig | None = None):
+        self._session = session
+        self._weights_path = weights_path
+        self._config = config or SessionConfig()
+        self._input_name, self.input_size, self.dynamic_batch = self._inspect_input()
+        self._warmup_ms: list[float] = []
+        # Preprocessing buffers, one set per thread (see _buffers).
+        self._local = threading.local()
+        # Letterboxed ROI polygon masks, keyed on (roi, frame size).
+        self._roi_masks: dict = {}
+
+    @classmethod
+    def load(
+        cls,
+        weights_path: Path = WEIGHTS_PATH,
+        config: SessionConfig | None = None,
+        preoptimized: bool = False,
+    ) -> "FrameDetector | None":
+        session = load_session(weights_path, config, preoptimized)
+        return cls(session, weights_path, config) if session is not None else None
+
+    def warm_up(self, runs: int | None = None) -> list[float]:
+        """Run blank frames through the session so the first real frame doesn't
+        pay for allocator and kernel setup. Returns per-run latency in ms."""
+        import numpy as np
+
+        runs = self._config.warmup_runs if runs is None else runs
+        w, h = self.input_size
+        x = np.zeros((1, 3, h, w), dtype=np.float32)
+        timings = []
+        for _ in range(max(0, runs)):
+            start = time.perf_counter()
+            self._session.run(None, {self._input_name: x})
+            timings.append((time.perf_counter() - start) * 1000.0)
+        self._warmup_ms = timings
+        return timings
+
+    def describe(self) -> DetectorInfo:
+        return DetectorInfo(
+            weights=self._weights_path.name,
+            input_size=self.input_size,
+            dynamic_batch=self.dynamic_batch,
+            session=self._config.as_dict(),
+            warmup_ms=list(self._warmup_ms),
+        )
+
+    def _inspect_input(self):
+        inp = self._session.get_inputs()[0]
+        shape = inp.shape  # [batch, 3, H, W]
+        # Models exported with dynamic spatial dims take config.input_size, so
+        # an ROI-cropped camera can run at a smaller input than the full frame.
+        requested = self._config.input_size or DEFAULT_INPUT_SIZE
+        h = shape[2] if isinstance(shape[2], int) else requested
+        w = shape[3] if isinstance(shape[3], int) else requested
+        if self._config.input_size and (w, h) != (requested, requested):
+            logger.warning(
+                "ONNX model has a fixed %dx%d input; ignoring input_size=%d", w, h, requested
+            )
+        # A fixed batch dim (exported with batch=1) can't take stacked frames;
+        # such batches still share one call but run frame by frame.
+        dynamic_batch = not isinstance(shape[0], int)
+        return inp.name, (w, h), dynamic_batch
+
+    def run_batch(
+        self, frames: list[bytes], rois: list[Roi | None] | None = None
+    ) -> list[FrameResult | None]:
+        """Decode + letterbox every frame into the batch buffer, run them through
+        ONNX together, then split detections back per frame. A frame that fails
+        (decode, session run or postprocess) comes back as None, so callers can
+        tell it from a real "clear"; the rest of the batch is unaffected. Nothing
+        is drawn here: callers store the detections and render annotated frames
+        on demand (render_annotated).
+
+        With an ROI only its bounding box is letterboxed (pixels outside the
+        polygon are painted as padding) and coverage is measured across the ROI."""
+        rois = rois or [None] * len(frames)
+        results: list[FrameResult | None] = [None] * len(frames)
+        canvas, batch = self._buffers(len(frames))
+        prepared = []  # (index, scale, pad, region)
+        for i, image_bytes in enumerate(frames):
+            try:
+                img, orig_shape, region = self._decode(image_bytes, rois[i])
+                scale, pad = self._preprocess(
+                    img, orig_shape, region, rois[i], canvas, batch[len(prepared)]
+                )
+                prepared.append((i, scale, pad, region))
+            except Exception as e:
+                logger.warning("Frame decode failed (%s)", type(e).__name__)
+
+        if prepared:
+            try:
+                outputs = self._run_session(batch[:len(prepared)])
+            except Exception as e:
+                logger.warning("Inference failed (%s) for a batch of %d", type(e).__name__, len(prepared))
+                return results
+
+            for j, (i, scale, pad, region) in enumerate(prepared):
+                try:
+                    detections = self._postprocess(outputs[j:j + 1], scale, pad, region)
+                    pct = self._compute_coverage_pct(detections, region)
+                    results[i] = (pct, status_from_pct(pct), detections)
+                except Exception as e:
+                    logger.warning("Postprocess failed (%s)", type(e).__name__)
+
+        return results
+
+    def _buffers(self, n: int):
+        """Per-thread letterbox canvas (H, W, 3) uint8 and CHW float32 batch
+        buffer (>= n, 3, H, W), reused across calls."""
+        import numpy as np
+
+        local = self._local
+        batch = getattr(local, "batch", None)
+        if batch is None or batch.shape[0] < n:
+            w_in, h_in = self.input_size
+            local.canvas = np.empty((h_in, w_in, 3), dtype=np.uint8)
+            local.batch = np.empty((n, 3, h_in, w_in), dtype=np.float32)
+        return local.canvas, local.batch
+
+    def _run_session(self, batch):
+        """Run a preprocessed (N, 3, H, W) batch and return the raw output (N, 5, K).
+        Uses a single session.run when the model has a dynamic batch dim."""
+        import numpy as np
+
+        if self.dynamic_batch or len(batch) == 1:
+            return self._session.run(None, {self._input_name: batch})[0]
+        return np.concatenate(
+            [self._session.run(None, {self._input_name: batch[j:j + 1]})[0] for j in range(len(batch))],
+            axis=0,
+        )
+
+    def _decode(self, image_bytes: bytes, roi: Roi | None = None):
+        """Decode a JPEG at the smallest DCT scale (1/2, 1/4, 1/8) that still
+        keeps the ROI at least its letterboxed size, so a 1080p frame is never
+        fully decoded just to be shrunk to 640.
+        Returns (image, original (h, w), ROI region in original pixels).
+
+        The scaled IDCT differs from a full decode + resize by about JPEG noise
+        (mean ~2/255 per pixel); draft_decode=False keeps inputs bit-identical."""
+        from PIL import Image
+
+        img = Image.open(BytesIO(image_bytes))
+        w, h = img.size
+        region = roi_region(roi, w, h)
+        if self._config.draft_decode:
+            x0, y0, x1, y1 = region
+            new_w, new_h = self._letterbox_size(x1 - x0, y1 - y0)
+            img.draft("RGB", (math.ceil(new_w * w / (x1 - x0)), math.ceil(new_h * h / (y1 - y0))))
+        return img.convert("RGB"), (h, w), region
+
+    def _letterbox_size(self, w: int, h: int) -> tuple[int, int]:
+        w_in, h_in = self.input_size
+        scale = min(w_in / w, h_in / h)
+        return int(w * scale), int(h * scale)
+
+    def _preprocess(self, img, orig_shape, region, roi, canvas, out):
+        """Letterbox the ROI region to model input into `canvas`, then normalize
+        to [0,1] as CHW straight into `out` (one (3, H, W) slot of the batch buffer)."""
+        import numpy as np
+        from PIL import Image
+
+        w_in, h_in = self.input_size
+        h, w = orig_shape
+        x0, y0, x1, y1 = region
+        scale = min(w_in / (x1 - x0), h_in / (y1 - y0))
+        new_w, new_h = self._letterbox_size(x1 - x0, y1 - y0)
+
+        if region == (0, 0, w, h):
+            resized = img if img.size == (new_w, new_h) else img.resize((new_w, new_h), Image.BILINEAR)
+        else:
+            # Crop and resize in one pass; img may be draft-decoded at a smaller scale.
+            fx, fy = img.width / w, img.height / h
+            resized = img.resize((new_w, new_h), Image.BILINEAR, box=(x0 * fx, y0 * fy, x1 * fx, y1 * fy))
+
+        left, top = (w_in - new_w) // 2, (h_in - new_h) // 2
+        canvas.fill(114)
+        view = canvas[top:top + new_h, left:left + new_w]
+        view[...] = np.asarray(resized)
+        if roi and not _is_box(roi):
+            view[~self._roi_mask(roi, orig_shape, region, (new_w, new_h))] = 114
+
+        np.divide(canvas.transpose(2, 0, 1), np.float32(255.0), out=out)
+        return scale, (left, top)
+
+    def _roi_mask(self, roi: Roi, orig_shape, region: Region, size: tuple[int, int]):
+        """Boolean (h, w) mask of the ROI polygon inside the letterboxed region."""
+        import numpy as np
+        from PIL import Image, ImageDraw
+
+        key = (roi, orig_shape, size)
+        mask = self._roi_masks.get(key)
+        if mask is None:
+            h, w = orig_shape
+            x0, y0, x1, y1 = region
+            new_w, new_h = size
+            polygon = [
+                ((x * w - x0) * new_w / (x1 - x0), (y * h - y0) * new_h / (y1 - y0))
+                for x, y in roi
+            ]
+            canvas = Image.new("L", size, 0)
+            ImageDraw.Draw(canvas).polygon(polygon, fill=1)
+            mask = np.asarray(canvas, dtype=bool)
+            if len(self._roi_masks) >= 32:  # ROIs were edited; drop stale masks
+                self._roi_masks.clear()
+            self._roi_masks[key] = mask
+        return mask
+
+    def _postprocess(self, output, scale, pad, region):
+        """YOLOv8 single-class output (1, 5, N) -> list of (x1,y1,x2,y2,conf) in
+        original frame coordinates, clipped to the ROI region."""
+        import numpy as np
+
+        pred = output[0].T  # (N, 5): cx, cy, w, h, conf
+        mask = pred[:, 4] >= CONF_THRESHOLD
+        pred = pred[mask]
+        if len(pred) == 0:
+            return []
+
+        boxes = np.empty((len(pred), 4), dtype=np.float32)
+        boxes[:, 0] = pred[:, 0] - pred[:, 2] / 2
+        boxes[:, 1] = pred[:, 1] - pred[:, 3] / 2
+        boxes[:, 2] = pred[:, 0] + pred[:, 2] / 2
+        boxes[:, 3] = pred[:, 1] + pred[:, 3] / 2
+        scores = pred[:, 4].copy()
+
+        pad_x, pad_y = pad
+        x0, y0, x1, y1 = region
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / scale + x0
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / scale + y0
+
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], x0, x1)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], y0, y1)
+
+        keep = self._nms(boxes, scores, IOU_THRESHOLD)
+        return [
+            (float(boxes[i, 0]), float(boxes[i, 1]),
+             float(boxes[i, 2]), float(boxes[i, 3]),
+             float(scores[i]))
+            for i in keep
+        ]
+
+    @staticmethod
+    def _nms(boxes, scores, iou_thresh):
+        import numpy as np
+
+        x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+        areas = (x2 - x1) * (y2 - y1)
+        order = scores.argsort()[::-1]
+
+        keep = []
+        while len(order) > 0:
+            i = int(order[0])
+            keep.append(i)
+            if len(order) == 1:
+                break
+            xx1 = np.maximum(x1[i], x1[order[1:]])
+            yy1 = np.maximum(y1[i], y1[order[1:]])
+            xx2 = np.minimum(x2[i], x2[order[1:]])
+            yy2 = np.minimum(y2[i], y2[order[1:]])
+            w = np.maximum(0.0, xx2 - xx1)
+            h = np.maximum(0.0, yy2 - yy1)
+            inter = w * h
+            iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+            order = order[1:][iou <= iou_thresh]
+        return keep
+
+    @staticmethod
+    def _compute_coverage_pct(detections, region) -> float:
+        """Union of detection-box widths over the ROI region's width (the full
+        frame width without an ROI), as a percentage. `detections` is a list of
+        (x1, y1, x2, y2, conf) or the equivalent (N, 5) array."""
+        left, _, right, _ = region
+        w = right - left
+        if len(detections) == 0:
+            return 0.0
+        if len(detections) >= VECTOR_MERGE_MIN_SPANS:
+            blocked_width = FrameDetector._merged_width_vectorized(detections, left, right)
+        else:
+            blocked_width = FrameDetector._merged_width(detections, left, right)
+        return round(100.0 * float(blocked_width) / float(w), 2)
+
+    @staticmethod
+    def _merged_width(detections, left: int, right: int) -> int:
+        spans: list[tuple[int, int]] = []
+        for x1, y1, x2, y2, _ in detections:
+            x1i, x2i = max(left, int(x1)), min(right, int(x2))
+            if x2i > x1i and y2 > y1:
+                spans.append((x1i, x2i))
+
+        spans.sort()
+        merged: list[list[int]] = []
+        for start, end in spans:
+            if not merged or start > merged[-1][1]:
+                merged.append([start, end])
+            else:
+                merged[-1][1] = max(merged[-1][1], end)
+        return sum(end - start for start, end in merged)
+
+    @staticmethod
+    def _merged_width_vectorized(detections, left: int, right: int) -> int:
+        import numpy as np
+
+        boxes = np.asarray(detections, dtype=np.float64).reshape(-1, 5)
+        starts = np.maximum(left, boxes[:, 0].astype(np.int64))
+        ends = np.minimum(right, boxes[:, 2].astype(np.int64))
+        valid = (ends > starts) & (boxes[:, 3] > boxes[:, 1])
+        if not valid.any():
+            return 0
+
+        order = np.argsort(starts[valid], kind="stable")
+        starts, ends = starts[valid][order], ends[valid][order]
+        # Sorted by start, each span only adds the part past the furthest end of
+        # the spans before it.
+        reach = np.maximum.accumulate(ends)
+        covered_from = np.maximum(starts, np.concatenate(([starts[0]], reach[:-1])))
+        return int(np.maximum(0, ends - covered_from).sum())
+
+    @staticmethod
+    def _draw_boxes(img, detections):
+        from PIL import ImageDraw
+
+        out = img.copy()
+        draw = ImageDraw.Draw(out)
+        for x1, y1, x2, y2, conf in detections:
+            draw.rectangle([x1, y1, x2, y2], outline="red", width=3)
+            draw.text((x1 + 2, y1 + 2), f"{conf:.2f}", fill="red")
+        return out
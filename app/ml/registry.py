@@ -0,0 +1,218 @@
+"""Versioned ONNX weights and the loaded-model handles the API process swaps.
+
+``ModelRegistry`` maps version names to weight files: ``default`` is the
+shipped ``weights/best.onnx`` and every other version is ``<name>.onnx`` in the
+registry directory. ``LoadedModel`` is one ready-to-run backend (worker pool or
+in-process detector) for a version; ``MLService`` keeps one active and swaps in
+a new one between batches. ``ShadowComparison`` accumulates how a candidate
+model's results and latency compare with the active one on sampled batches.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.ml.detector import WEIGHTS_PATH, DetectorInfo, FrameDetector, FrameResult, Roi
+from app.ml.runtime import SessionConfig, prepare_model
+from app.ml.worker_pool import InferenceWorkerPool
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VERSION = "default"
+REGISTRY_PATH = WEIGHTS_PATH.parent / "registry"
+
+_VERSION_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+# Derived files prepare_model writes next to the weights; not versions of their own.
+_DERIVED_SUFFIXES = (".int8", ".tmp")
+
+
+@dataclass(frozen=True)
+class ModelVersion:
+    name: str
+    path: Path
+    size_bytes: int
+    sha256: str  # first 12 hex chars
+    modified_at: datetime
+
+
+class ModelRegistry:
+    """Weight files available for activation. Read from disk on every call, so
+    dropping a new ``<name>.onnx`` into the directory is enough to register it."""
+
+    def __init__(self, root: Path = REGISTRY_PATH, default_path: Path = WEIGHTS_PATH):
+        self._root = root
+        self._default_path = default_path
+
+    def path_for(self, version: str) -> Path | None:
+        """Weights file for `version`, or None when it isn't registered."""
+        if version == DEFAULT_VERSION:
+            return self._default_path if self._default_path.exists() else None
+        if not _VERSION_RE.match(version) or version.endswith(_DERIVED_SUFFIXES):
+            return None
+        path = self._root / f"{version}.onnx"
+        return path if path.is_file() else None
+
+    def list_versions(self) -> list[ModelVersion]:
+        candidates = [(DEFAULT_VERSION, self._default_path)]
+        if self._root.is_dir():
+            candidates += [
+                (p.stem, p) for p in sorted(self._root.glob("*.onnx"))
+                if _VERSION_RE.match(p.stem) and not p.stem.endswith(_DERIVED_SUFFIXES)
+            ]
+
+        versions = []
+        for name, path in candidates:
+            if not path.is_file():
+                continue
+            stat = path.stat()
+            versions.append(ModelVersion(
+                name=name,
+                path=path,
+                size_bytes=stat.st_size,
+                sha256=hashlib.sha256(path.read_bytes()).hexdigest()[:12],
+                modified_at=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            ))
+        return versions
+
+
+@dataclass
+class LoadedModel:
+    """A warmed-up backend for one model version. Tracks batches in flight so a
+    swapped-out model is only shut down once its last batch has returned."""
+    version: str
+    info: DetectorInfo
+    pool: InferenceWorkerPool | None = None
+    detector: FrameDetector | None = None
+    inflight: int = 0
+    _idle: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def __post_init__(self):
+        self._idle.set()
+
+    @property
+    def concurrency(self) -> int:
+        return self.pool.workers if self.pool is not None else 1
+
+    def report(self) -> dict:
+        return {"version": self.version, **self.info.report()}
+
+    async def run_batch(self, frames: list[bytes], rois: list[Roi | None]) -> list[FrameResult | None]:
+        self.inflight += 1
+        self._idle.clear()
+        try:
+            if self.pool is not None:
+                return await self.pool.run_batch(frames, rois)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.detector.run_batch, frames, rois)
+        finally:
+            self.inflight -= 1
+            if self.inflight == 0:
+                self._idle.set()
+
+    async def close(self, drain_timeout: float = 0.0) -> None:
+        """Wait up to `drain_timeout` seconds for batches in flight, then stop."""
+        if drain_timeout > 0 and self.inflight:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Model %s still had %d batch(es) in flight after %.0fs; stopping anyway",
+                    self.version, self.inflight, drain_timeout,
+                )
+        if self.pool is not None:
+            await self.pool.stop()
+        self.detector = None
+
+
+async def load_model(version: str, weights_path: Path, config: SessionConfig, workers: int) -> LoadedModel | None:
+    """Prepare, load and warm up `weights_path` — in `workers` spawned processes,
+    or in-process when workers=0. None when the weights can't be loaded."""
+    loop = asyncio.get_running_loop()
+    model = await loop.run_in_executor(None, prepare_model, weights_path, config)
+
+    if workers > 0:
+        pool = InferenceWorkerPool(model, config, workers)
+        info = await pool.start()
+        if info is None:
+            return None
+        return LoadedModel(version=version, info=info, pool=pool)
+
+    detector = await loop.run_in_executor(None, FrameDetector.load, model.path, config, model.preoptimized)
+    if detector is None:
+        return None
+    await loop.run_in_executor(None, detector.warm_up)
+    return LoadedModel(version=version, info=detector.describe(), detector=detector)
+
+
+class ShadowComparison:
+    """Rolling comparison of a shadow model against the active one, over the
+    last `window` sampled frames."""
+
+    def __init__(self, version: str, sample_rate: float, window: int = 500):
+        self.version = version
+        self.sample_rate = sample_rate
+        self.started_at = datetime.now(timezone.utc)
+        self.batches = 0
+        self.failures = 0
+        self._status_match: deque[bool] = deque(maxlen=window)
+        self._pct_diff: deque[float] = deque(maxlen=window)
+        self._box_diff: deque[int] = deque(maxlen=window)
+        self._primary_ms: deque[float] = deque(maxlen=window)
+        self._shadow_ms: deque[float] = deque(maxlen=window)
+
+    def record(
+        self,
+        primary: list[FrameResult | None],
+        shadow: list[FrameResult | None],
+        primary_seconds: float,
+        shadow_seconds: float,
+    ) -> None:
+        self.batches += 1
+        n = max(1, len(primary))
+        for p, s in zip(primary, shadow):
+            if p is None or s is None:
+                # A frame either model failed on says nothing about agreement.
+                continue
+            (p_pct, p_status, p_dets), (s_pct, s_status, s_dets) = p, s
+            self._status_match.append(p_status == s_status)
+            self._pct_diff.append(abs(p_pct - s_pct))
+            self._box_diff.append(len(s_dets) - len(p_dets))
+        # Per-frame latency, so batches of different sizes are comparable.
+        self._primary_ms.append(primary_seconds * 1000.0 / n)
+        self._shadow_ms.append(shadow_seconds * 1000.0 / n)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+    def report(self) -> dict:
+        frames = len(self._status_match)
+        return {
+            "version": self.version,
+            "sample_rate": self.sample_rate,
+            "started_at": self.started_at.isoformat(),
+            "batches": self.batches,
+            "failures": self.failures,
+            "frames": frames,
+            "status_agreement": round(sum(self._status_match) / frames, 4) if frames else None,
+            "mean_abs_pct_diff": round(sum(self._pct_diff) / frames, 2) if frames else None,
+            "max_abs_pct_diff": round(max(self._pct_diff), 2) if frames else None,
+            "mean_box_count_diff": round(sum(self._box_diff) / frames, 2) if frames else None,
+            "primary_ms_per_frame": _percentiles(self._primary_ms),
+            "shadow_ms_per_frame": _percentiles(self._shadow_ms),
+        }
+
+
+def _percentiles(values: deque[float]) -> dict | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 2)
+
+    return {"p50": pick(0.50), "p95": pick(0.95)}
@@ -0,0 +1,139 @@
+"""ONNX Runtime session configuration.
+
+``SessionConfig`` is built from settings in the API process and handed to the
+inference workers as-is (it is picklable), so every process builds identical
+sessions. ``prepare_model`` runs once in the API process before any worker
+starts: it resolves the requested weights variant (quantizing ``best.onnx`` to
+INT8 on first use) and writes the graph-optimized model to a cache next to the
+weights, so workers load a ready-made graph instead of each optimizing it again.
+"""
+import hashlib
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ("fp32", "int8")
+GRAPH_OPTIMIZATION_LEVELS = ("disable", "basic", "extended", "all")
+
+
+@dataclass(frozen=True)
+class SessionConfig:
+    variant: str = "fp32"                 # "fp32" | "int8"
+    graph_optimization: str = "all"       # "disable" | "basic" | "extended" | "all"
+    intra_op_threads: int = 0             # 0 = let ONNX Runtime decide
+    inter_op_threads: int = 1
+    cache_optimized_model: bool = True
+    warmup_runs: int = 3
+    # Not an ORT option, but shipped to the workers with the rest: decode JPEGs
+    # at a reduced DCT scale before letterboxing (see FrameDetector._decode).
+    draft_decode: bool = True
+    # Square input for models exported with dynamic H/W; 0 = DEFAULT_INPUT_SIZE.
+    input_size: int = 0
+
+    def __post_init__(self):
+        if self.variant not in VARIANTS:
+            raise ValueError(f"Unknown ONNX model variant '{self.variant}'. Choose one of: {', '.join(VARIANTS)}")
+        if self.graph_optimization not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(
+                f"Unknown ONNX graph optimization level '{self.graph_optimization}'. "
+                f"Choose one of: {', '.join(GRAPH_OPTIMIZATION_LEVELS)}"
+            )
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class PreparedModel:
+    """Weights file to load and whether its graph is already optimized."""
+    path: Path
+    preoptimized: bool
+
+
+def default_intra_op_threads(workers: int) -> int:
+    """Split the cores between worker processes so they don't oversubscribe."""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def session_options(config: SessionConfig, preoptimized: bool = False):
+    import onnxruntime as ort
+
+    levels = {
+        "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+    opts = ort.SessionOptions()
+    # A cached graph already carries the optimizations; don't pay for them twice.
+    opts.graph_optimization_level = levels["disable" if preoptimized else config.graph_optimization]
+    if config.intra_op_threads > 0:
+        opts.intra_op_num_threads = config.intra_op_threads
+    if config.inter_op_threads > 0:
+        opts.inter_op_num_threads = config.inter_op_threads
+    opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    return opts
+
+
+def prepare_model(weights_path: Path, config: SessionConfig) -> PreparedModel:
+    """Resolve the weights variant and, when enabled, the cached optimized graph.
+    Falls back to the plain fp32 weights whenever a step fails."""
+    path = weights_path
+    if config.variant == "int8":
+        path = _int8_weights(weights_path) or weights_path
+
+    if not config.cache_optimized_model or config.graph_optimization == "disable":
+        return PreparedModel(path, preoptimized=False)
+
+    cached = _optimized_cache_path(path, config)
+    if cached.exists():
+        return PreparedModel(cached, preoptimized=True)
+    try:
+        import onnxruntime as ort
+
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        opts = session_options(config)
+        opts.optimized_model_filepath = str(cached)
+        ort.InferenceSession(str(path), sess_options=opts, providers=["CPUExecutionProvider"])
+        logger.info("Cached optimized ONNX graph at %s", cached)
+        return PreparedModel(cached, preoptimized=True)
+    except Exception as e:
+        logger.warning("Could not cache optimized ONNX graph (%s); optimizing at load", type(e).__name__)
+        cached.unlink(missing_ok=True)
+        return PreparedModel(path, preoptimized=False)
+
+
+def _int8_weights(weights_path: Path) -> Path | None:
+    """`best.int8.onnx` next to the fp32 weights — used as shipped, otherwise
+    produced once with dynamic (weight-only) quantization."""
+    int8_path = weights_path.with_name(f"{weights_path.stem}.int8.onnx")
+    if int8_path.exists():
+        return int8_path
+    try:
+        import onnx  # noqa: F401 — quantize_dynamic needs it
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        logger.warning(
+            "ONNX_MODEL_VARIANT=int8 needs %s or the onnx package to build it (%s); using fp32 weights",
+            int8_path.name, e,
+        )
+        return None
+    try:
+        tmp = int8_path.with_suffix(".tmp")
+        quantize_dynamic(str(weights_path), str(tmp), weight_type=QuantType.QUInt8)
+        os.replace(tmp, int8_path)
+        logger.info("Quantized %s to %s", weights_path.name, int8_path.name)
+        return int8_path
+    except Exception as e:
+        logger.warning("INT8 quantization failed (%s); using fp32 weights", type(e).__name__)
+        return None
+
+
+def _optimized_cache_path(weights_path: Path, config: SessionConfig) -> Path:
+    # Keyed on the weights' content so replacing best.onnx invalidates the cache.
+    digest = hashlib.sha256(weights_path.read_bytes()).hexdigest()[:12]
+    return weights_path.parent / ".ort_cache" / f"{weights_path.stem}.{config.graph_optimization}.{digest}.onnx"
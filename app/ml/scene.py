@@ -0,0 +1,34 @@
+"""Scene-change gate for camera frames.
+
+A frame's signature is a tiny grid of grayscale block means, taken from a JPEG
+draft decode at 1/8 scale, so it costs a fraction of a full decode. Comparing
+it with the signature of the last frame that was actually inferred tells
+whether the scene moved enough to be worth another ONNX run. Only the camera's
+ROI counts, so changes outside the inferred region don't trigger a run.
+"""
+from io import BytesIO
+
+from app.ml.detector import Roi, roi_region
+
+
+SIGNATURE_SIZE = 16  # signature grid is SIGNATURE_SIZE x SIGNATURE_SIZE
+
+
+def scene_signature(image_bytes: bytes, roi: Roi | None = None):
+    """(SIGNATURE_SIZE, SIGNATURE_SIZE) float32 grid of block-mean luma (0-255)
+    over the ROI's bounding box (the whole frame for None)."""
+    import numpy as np
+    from PIL import Image
+
+    img = Image.open(BytesIO(image_bytes))
+    img.draft("L", (SIGNATURE_SIZE * 8, SIGNATURE_SIZE * 8))
+    region = roi_region(roi, *img.size)
+    small = img.convert("L").resize((SIGNATURE_SIZE, SIGNATURE_SIZE), Image.BOX, box=region)
+    return np.asarray(small, dtype=np.float32)
+
+
+def scene_change(previous, current) -> float:
+    """Mean absolute difference between two signatures, in luma levels (0-255)."""
+    import numpy as np
+
+    return float(np.abs(current - previous).mean())
@@ -0,0 +1,141 @@
+"""Out-of-process inference workers.
+
+Each worker process loads the prepared model once (pool initializer), warms it
+up, and keeps its ``FrameDetector`` for its whole life, so JPEG decode,
+letterboxing, the ONNX run and postprocessing never contend for the API
+process's GIL. Annotated frames are not drawn here; ``annotated_frame_service``
+renders them on request from the stored detections.
+
+Frames cross the process boundary through ``multiprocessing.shared_memory``:
+the API process packs a batch into one block and sends only its name plus
+(offset, length) spans, and unlinks it once the worker is done. Results are
+just coverage, status and boxes, so they come back through the normal pickle
+channel.
+"""
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context, shared_memory
+from pathlib import Path
+
+from app.ml.detector import DetectorInfo, FrameDetector, FrameResult, Roi
+from app.ml.runtime import PreparedModel, SessionConfig
+
+
+logger = logging.getLogger(__name__)
+
+# Per worker process; set by _init_worker.
+_detector: FrameDetector | None = None
+
+
+def _init_worker(weights_path: str, config: SessionConfig, preoptimized: bool) -> None:
+    global _detector
+    _detector = FrameDetector.load(Path(weights_path), config, preoptimized)
+    if _detector is not None:
+        _detector.warm_up()
+
+
+def _describe_worker() -> DetectorInfo | None:
+    if _detector is None:
+        return None
+    return _detector.describe()
+
+
+def _run_batch_in_worker(
+    shm_name: str, spans: list[tuple[int, int]], rois: list[Roi | None]
+) -> list[FrameResult | None]:
+    """Read frames from `shm_name` and run them."""
+    if _detector is None:
+        raise RuntimeError("Inference worker has no model loaded")
+
+    shm_in = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frames = [bytes(shm_in.buf[offset:offset + length]) for offset, length in spans]
+    finally:
+        shm_in.close()
+
+    return _detector.run_batch(frames, rois)
+
+
+def _pack(frames: list[bytes]) -> tuple[shared_memory.SharedMemory, list[tuple[int, int]]]:
+    shm = shared_memory.SharedMemory(create=True, size=max(1, sum(len(f) for f in frames)))
+    spans = []
+    offset = 0
+    for frame in frames:
+        shm.buf[offset:offset + len(frame)] = frame
+        spans.append((offset, len(frame)))
+        offset += len(frame)
+    return shm, spans
+
+
+class InferenceWorkerPool:
+    """
+    Fixed-size pool of spawned inference processes.
+    `start()` spawns every worker and waits until each has loaded and warmed up
+    the model; it returns the first worker's DetectorInfo or None when no worker
+    could load it.
+    A crashed worker breaks the whole ProcessPoolExecutor, so the pool is
+    rebuilt on BrokenProcessPool and the failing batch is reported to the caller.
+    """
+
+    def __init__(self, model: PreparedModel, config: SessionConfig, workers: int):
+        self._model = model
+        self._config = config
+        self._workers = max(1, workers)
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    async def start(self) -> DetectorInfo | None:
+        self._executor = self._new_executor()
+        loop = asyncio.get_running_loop()
+        # One describe call per worker forces every process to spawn and load
+        # the model now rather than on the first real frame.
+        described = await asyncio.gather(
+            *[loop.run_in_executor(self._executor, _describe_worker) for _ in range(self._workers)]
+        )
+        info = next((d for d in described if d is not None), None)
+        if info is None:
+            await self.stop()
+        else:
+            logger.info("Started %d inference worker(s) for %s", self._workers, self._model.path)
+        return info
+
+    async def stop(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run_batch(
+        self, frames: list[bytes], rois: list[Roi | None] | None = None
+    ) -> list[FrameResult | None]:
+        if self._executor is None:
+            raise RuntimeError("Inference worker pool is not running")
+
+        loop = asyncio.get_running_loop()
+        shm_in, spans = _pack(frames)
+        try:
+            return await loop.run_in_executor(
+                self._executor, _run_batch_in_worker, shm_in.name, spans,
+                rois or [None] * len(frames),
+            )
+        except BrokenProcessPool:
+            logger.error("Inference worker died; restarting the pool")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            raise
+        finally:
+            shm_in.close()
+            shm_in.unlink()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the API process has a running event loop and threads.
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(str(self._model.path), self._config, self._model.preoptimized),
+        )
@@ -1,4 +1,4 @@
-from .camera_device import CameraDevice
+from .camera_device import CameraDevice, CameraROI
 from .daily_summary import DailySummary
 from .evacuation_center import EvacuationCenter, EvacuationCenterStatus
 from .location import Location
@@ -10,6 +10,7 @@ from .weather import Weather
 
 __all__ = [
     "CameraDevice",
+    "CameraROI",
     "DailySummary",
     "EvacuationCenter",
     "EvacuationCenterStatus",
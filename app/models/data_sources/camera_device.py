@@ -1,14 +1,54 @@
-from sqlalchemy import Column, ForeignKey, String, Integer
+from sqlalchemy import Column, ForeignKey, String, Integer, JSON
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
+from pydantic import BaseModel, field_validator
 from ..base import Base
 
 
+class CameraROI(BaseModel):
+    """Region of interest (the channel) as a polygon in normalized frame
+    coordinates: (0, 0) is the top-left corner, (1, 1) the bottom-right."""
+    points: list[tuple[float, float]]
+
+    @field_validator("points")
+    @classmethod
+    def validate_points(cls, points: list[tuple[float, float]]) -> list[tuple[float, float]]:
+        if len(points) < 3:
+            raise ValueError("ROI needs at least 3 points")
+        if any(not (0.0 <= x <= 1.0 and 0.0 <= y <= 1.0) for x, y in points):
+            raise ValueError("ROI points must be normalized to 0-1")
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        if max(xs) - min(xs) < 0.01 or max(ys) - min(ys) < 0.01:
+            raise ValueError("ROI is too small")
+        return points
+
+    def as_tuple(self) -> tuple[tuple[float, float], ...]:
+        return tuple((float(x), float(y)) for x, y in self.points)
+
+
+class CameraROIType(TypeDecorator):
+    impl = JSON
+    cache_ok = True
+
+    def process_bind_param(self, value, _):
+        if isinstance(value, CameraROI):
+            return value.model_dump()
+        return value
+
+    def process_result_value(self, value, _):
+        if value is not None:
+            return CameraROI(**value)
+        return value
+
+
 class CameraDevice(Base):
     __tablename__ = "camera_devices"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     location_id = Column(Integer, ForeignKey("locations.id"), nullable=False, unique=True)
     device_name = Column(String(100), nullable=False)
+    roi = Column(CameraROIType, nullable=True)  # None = whole frame
 
     location = relationship("Location", back_populates="camera_device")
-    model_readings = relationship("ModelReadings", back_populates="camera_device", cascade="all, delete-orphan")
\ No newline at end of file
+    model_readings = relationship("ModelReadings", back_populates="camera_device", cascade="all, delete-orphan")
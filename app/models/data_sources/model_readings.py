@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, String, DateTime, Integer, Float
+from sqlalchemy import Column, ForeignKey, String, DateTime, Integer, Float, JSON
 from ..base import Base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -18,5 +18,8 @@ class ModelReadings(Base):
     # Blockage measurement
     blockage_percentage = Column(Float, nullable=False)  # 0-100
     blockage_status = Column(String, nullable=False)  # 'clear', 'partial', 'blocked'
+    # {"boxes": [[x1, y1, x2, y2, conf], ...], "roi": [[x, y], ...] | null}; NULL for
+    # rows from before detections were stored (their image_path is already annotated).
+    detections = Column(JSON, nullable=True)
 
     camera_device = relationship("CameraDevice", back_populates="model_readings")
\ No newline at end of file
@@ -0,0 +1,54 @@
+import enum
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String
+from sqlalchemy.sql import func
+
+from .base import Base
+from .notification_template import NotificationType
+
+
+class NotificationIntentStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"   # claimed by one worker's dispatcher
+    SENT = "sent"
+    SKIPPED = "skipped"   # cooldown, no system template or no subscribers
+    FAILED = "failed"     # gave up after NOTIFICATION_INTENT_MAX_ATTEMPTS
+
+
+class NotificationIntent(Base):
+    """One fusion-triggered auto-notification waiting for (or done with) delivery.
+
+    Fusion only records the intent; the notification dispatcher claims it
+    (pending -> sending), resolves the template and audience and sends it.
+    Pending rows are picked up again after a restart, and so are rows a dead
+    worker left in sending once NOTIFICATION_INTENT_CLAIM_TIMEOUT_SECONDS pass."""
+
+    __tablename__ = "notification_intents"
+
+    id = Column(Integer, primary_key=True)
+    location_id = Column(
+        Integer, ForeignKey("locations.id", ondelete="CASCADE"), nullable=False
+    )
+    type = Column(Enum(NotificationType), nullable=False)
+    status = Column(
+        Enum(
+            NotificationIntentStatus,
+            name="notificationintentstatus",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=False,
+        default=NotificationIntentStatus.PENDING,
+        server_default=NotificationIntentStatus.PENDING.value,
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error_message = Column(String, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.timezone("UTC", func.now()), nullable=False
+    )
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_notification_intents_status_created_at", "status", "created_at"),
+        Index("ix_notification_intents_location_type_processed_at", "location_id", "type", "processed_at"),
+    )
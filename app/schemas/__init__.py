@@ -7,7 +7,7 @@ from .sensor_reading import SensorReadingCreate, SensorReadingResponse, SensorRe
 from .model_readings import ModelReadingCreate
 from .admin_audit_log import AdminAuditLogPaginatedResponse
 from .auth import LoginRequest, ChangePasswordRequest
-from .stream import CameraStatus
+from .stream import CameraStatus, CaptureSchedule
 from .weather import WeatherCreate, WeatherConditionResponse, WeatherComprehensiveResponse
 
 from .responder import ResponderCreate, ResponderForApproval, ResponderOTPVerifyRequest, ResponderOTPVerifyResponse, ResponderDetails, NotifPreferenceUpdateRequest, AlertListItem, AlertPaginatedResponse
@@ -51,3 +51,4 @@ from .subscription import SubscriptionKeys, SubscriptionSchema, SendNotification
 from .notification_template import NotificationTemplateResponse, CreateNotificationTemplateRequest
 from .notification_log import ResponderNotificationSummary, DeliveryLogItem, DeliveryLogPaginatedResponse
 from .model_reading_log import ModelReadingListItem, ModelReadingPaginatedResponse, ModelReadingDetailResponse
+from .ml_model import ModelVersionItem, ModelRegistryResponse, ShadowStartRequest
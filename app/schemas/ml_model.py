@@ -0,0 +1,22 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ModelVersionItem(BaseModel):
+    name: str
+    size_bytes: int
+    sha256: str
+    modified_at: datetime
+    active: bool
+    shadow: bool
+
+
+class ModelRegistryResponse(BaseModel):
+    active_version: str | None          # None = placeholder predictions (no usable weights)
+    active_model: dict | None
+    shadow: dict | None
+    versions: list[ModelVersionItem]
+
+
+class ShadowStartRequest(BaseModel):
+    sample_rate: float | None = Field(default=None, gt=0, le=1)  # None = ML_SHADOW_SAMPLE_RATE
@@ -25,6 +25,8 @@ class ModelReadingDetailResponse(BaseModel):
     blockage_percentage: float
     timestamp: datetime
     created_at: datetime
+    detections: dict | None = None
+    annotated_image_url: str
 
     class Config:
         from_attributes = True
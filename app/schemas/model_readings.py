@@ -9,4 +9,4 @@ class ModelReadingBase(BaseModel):
     blockage_status: str
 
 class ModelReadingCreate(ModelReadingBase):
-    pass
\ No newline at end of file
+    detections: dict | None = None
\ No newline at end of file
@@ -1,7 +1,18 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import Literal
 
 
 class CameraStatus(BaseModel):
     is_online: bool
     last_seen: datetime | None
+
+
+class CaptureSchedule(BaseModel):
+    """Effective capture cadence for a camera, returned with every frame ack and
+    pushed over /ws/rpi whenever it changes, so the device only uploads frames
+    that will actually be inferred."""
+    interval_seconds: int
+    mode: Literal["normal", "elevated"]
+    next_capture_at: datetime | None    # earliest time the next frame will be inferred; None = now
+    elevated_until: datetime | None     # when the elevated cadence relaxes if risk stays low
@@ -22,4 +22,5 @@ class AlertThresholdsResponse(BaseModel):
     tier_3_min: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+        frozen = True  # shared snapshot read by every fusion recompute; replace, never mutate
\ No newline at end of file
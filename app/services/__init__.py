@@ -1,5 +1,6 @@
 from .sensor_reading import sensor_reading_service
 from .sensor_device_service import sensor_device_service
+from .camera_device_service import camera_device_service
 from .auth_service import auth_service
 from .admin_user_service import admin_user_service
 from .weather import weather_service
@@ -9,7 +10,9 @@ from .admin_audit_log_service import admin_audit_log_service
 from .daily_summary import daily_summary_service
 from .responder import responder_service
 from .responder import responder_app_service
+from .frame_spool_service import frame_spool_service
 from .ml_service import ml_service
+from .state_snapshot_service import state_snapshot_service
 from .system_settings_service import system_settings_service
 from .upload_service import upload_service
 from .core_service import core_service
@@ -20,7 +23,10 @@ from .analysis_service import analysis_service
 from .notification_template_service import notification_template_service
 from .push_subscription_service import push_subscription_service
 from .notification_service import notification_service
+from .notification_intent_service import notification_intent_service
 from .notification_log_service import notification_log_service
 from .model_reading_log_service import model_reading_log_service
+from .annotated_frame_service import annotated_frame_service
+from .model_registry_service import model_registry_service
 from .evacuation_center_service import evacuation_center_service
 from .evacuation_service import evacuation_service
\ No newline at end of file
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.model_readings import model_readings_crud
+from app.ml.detector import render_annotated
+from app.services.frame_spool_service import frame_spool_service
+from app.services.frame_storage import frame_store
+
+
+logger = logging.getLogger(__name__)
+
+# Placeholder image_path written before the spool has stored the frame.
+PROVISIONAL_IMAGE_PREFIX = "rpi_frame_"
+
+
+class AnnotatedFrameService:
+    """
+    Renders annotated frames on demand from the stored original frame and the
+    reading's detections, instead of drawing and re-encoding every inferred
+    frame. Rendered JPEGs are kept in an LRU cache of
+    ANNOTATED_FRAME_CACHE_SIZE entries keyed by reading id.
+    """
+
+    def __init__(self):
+        self._cache: OrderedDict[int, bytes] = OrderedDict()
+
+    async def get_annotated(self, db: AsyncSession, reading_id: int) -> bytes | None:
+        cached = self._cache.get(reading_id)
+        if cached is not None:
+            self._cache.move_to_end(reading_id)
+            return cached
+
+        reading = await model_readings_crud.get_by_id(db=db, reading_id=reading_id)
+        if reading is None:
+            return None
+
+        image_bytes = await self._load_frame(db, reading)
+        if image_bytes is None:
+            return None
+
+        if reading.detections is None:
+            # Older rows stored an already annotated frame.
+            annotated = image_bytes
+        else:
+            loop = asyncio.get_running_loop()
+            annotated = await loop.run_in_executor(None, render_annotated, image_bytes, reading.detections)
+
+        self._remember(reading_id, annotated)
+        return annotated
+
+    async def _load_frame(self, db: AsyncSession, reading) -> bytes | None:
+        if reading.image_path.startswith(PROVISIONAL_IMAGE_PREFIX):
+            image_bytes = await frame_spool_service.read_pending(reading.id)
+            if image_bytes is not None:
+                return image_bytes
+            # Stored between the row read and the spool read; pick up the new path.
+            await db.refresh(reading)
+        try:
+            return await frame_store.load(reading.image_path)
+        except OSError as e:
+            logger.warning("Could not load frame for reading %s (%s)", reading.id, type(e).__name__)
+            return None
+
+    def _remember(self, reading_id: int, annotated: bytes) -> None:
+        self._cache[reading_id] = annotated
+        self._cache.move_to_end(reading_id)
+        while len(self._cache) > max(0, settings.ANNOTATED_FRAME_CACHE_SIZE):
+            self._cache.popitem(last=False)
+
+
+annotated_frame_service = AnnotatedFrameService()
@@ -1,7 +1,7 @@
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas import AlertThresholdsResponse, LocationCoordinate, DevicePerLocation
-from app.models import SensorConfig
+from app.models import SensorConfig, CameraROI
 from app.crud import system_settings_crud
 from app.crud import location_crud
 from app.crud import sensor_device_crud
@@ -20,11 +20,29 @@ class CacheService:
         
         self._alert_thresholds_cache: Optional[AlertThresholdsResponse] = None  # cached alert thresholds
 
+        self._camera_roi_cache: Optional[dict[int, Optional[CameraROI]]] = None  # cached ROI per camera device id
+
 
     # mutable cache
     async def update_alert_thresholds_cache(self, db: AsyncSession) -> None:
         alert_thresholds_data = await system_settings_crud.get_value(db=db, key="alert_thresholds")
-        self._alert_thresholds_cache = AlertThresholdsResponse.model_validate(alert_thresholds_data)
+        self.set_alert_thresholds(AlertThresholdsResponse.model_validate(alert_thresholds_data))
+
+
+    # Thresholds are read on every fusion recompute without I/O, so they are held
+    # as one frozen snapshot that is swapped whole when the setting changes.
+    def set_alert_thresholds(self, thresholds: AlertThresholdsResponse) -> None:
+        self._alert_thresholds_cache = thresholds
+
+
+    @property
+    def alert_thresholds(self) -> Optional[AlertThresholdsResponse]:
+        return self._alert_thresholds_cache
+
+
+    # mutable cache
+    async def update_camera_roi_cache(self, db: AsyncSession) -> None:
+        self._camera_roi_cache = await camera_device_crud.get_all_rois(db=db)
 
 
     # mutable cache
@@ -45,15 +63,15 @@ class CacheService:
     # unmutable cache
     async def update_device_ids_cache(self, db: AsyncSession) -> None:
         location_ids = await location_crud.get_all_ids(db=db)
-        device_ids_cache = {}
-        for loc_id in location_ids:
-            camera_device_id = await camera_device_crud.get_id_by_location(db=db, location_id=loc_id)
-            sensor_device_id = await sensor_device_crud.get_id_by_location(db=db, location_id=loc_id)
-            device_ids_cache[loc_id] = DevicePerLocation(
-                camera_device_id=camera_device_id,
-                sensor_device_id=sensor_device_id
+        camera_ids = await camera_device_crud.get_ids_by_location(db=db)
+        sensor_ids = await sensor_device_crud.get_ids_by_location(db=db)
+        self._device_ids_cache = {
+            loc_id: DevicePerLocation(
+                camera_device_id=camera_ids.get(loc_id),
+                sensor_device_id=sensor_ids.get(loc_id),
             )
-        self._device_ids_cache = device_ids_cache
+            for loc_id in location_ids
+        }
 
 
     # unmutable cache
@@ -65,12 +83,10 @@ class CacheService:
     """
     async def update_location_id_per_sensor_device_cache(self, db: AsyncSession) -> None:
         location_ids = await location_crud.get_all_ids(db=db)
-
-        location_id_per_sensor_device_cache = {}
-        for loc_id in location_ids:
-            sensor_device_id = await sensor_device_crud.get_id_by_location(db=db, location_id=loc_id)
-            location_id_per_sensor_device_cache[sensor_device_id] = loc_id
-        self._location_id_per_sensor_device_cache = location_id_per_sensor_device_cache
+        sensor_ids = await sensor_device_crud.get_ids_by_location(db=db)
+        self._location_id_per_sensor_device_cache = {
+            sensor_ids.get(loc_id): loc_id for loc_id in location_ids
+        }
 
 
     async def get_sensor_config(self, db: AsyncSession) -> SensorConfig:
@@ -148,6 +164,14 @@ class CacheService:
         return [loc.id for loc in self._location_coordinates_cache]
 
 
+    async def get_camera_roi(self, db: AsyncSession, camera_device_id: int) -> Optional[CameraROI]:
+
+        if self._camera_roi_cache is None:
+            await self.update_camera_roi_cache(db=db)
+
+        return self._camera_roi_cache.get(camera_device_id)
+
+
     async def get_alert_thresholds(self, db: AsyncSession) -> AlertThresholdsResponse:
         
         if self._alert_thresholds_cache is None:
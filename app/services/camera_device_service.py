@@ -0,0 +1,29 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app.models import CameraROI
+from app.crud import camera_device_crud
+from app.services.cache_service import cache_service
+
+
+class CameraDeviceService:
+
+    async def get_roi(self, db: AsyncSession, camera_device_id: int) -> CameraROI | None:
+
+        camera_device = await camera_device_crud.get(db=db, id=camera_device_id)
+        if not camera_device:
+            raise HTTPException(status_code=404, detail="Camera device not found")
+        return camera_device.roi
+
+
+    async def update_roi(self, db: AsyncSession, camera_device_id: int, roi: CameraROI | None) -> CameraROI | None:
+
+        camera_device = await camera_device_crud.update_roi(db=db, camera_device_id=camera_device_id, roi=roi)
+        if not camera_device:
+            raise HTTPException(status_code=404, detail="Camera device not found")
+
+        # Inference reads ROIs from the cache; refresh so the next frame uses it.
+        await cache_service.update_camera_roi_cache(db=db)
+        return camera_device.roi
+
+
+camera_device_service = CameraDeviceService()
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import FRAME_SPOOL_DEPTH, FRAME_UPLOADS
+from app.crud import model_readings_crud
+from app.services.frame_storage import frame_store, FrameStoreError
+
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = Path(__file__).parent.parent / "storage" / "frame_spool"
+FIRST_RETRY_DELAY_SECONDS = 2
+
+
+class FrameSpoolService:
+    """
+    Durable, asynchronous upload path for captured camera frames.
+    A frame is written to the local spool directory and the model reading is
+    persisted straight away with a provisional image_path; background workers
+    (FRAME_UPLOAD_CONCURRENCY of them) hand spooled frames to the configured
+    frame store (Cloudinary or local) with exponential backoff and then patch
+    the reading's image_path. Any failure is retried; a frame only leaves the
+    spool once its reading points at the stored copy. Files left in the spool
+    by a restart are picked up again on start().
+
+    Spool file name: "{reading_id}__{captured_at epoch}__{public_id}.jpg".
+    """
+
+    def __init__(self, spool_dir: Path = SPOOL_DIR):
+        self._spool_dir = spool_dir
+        self._queue: asyncio.Queue[Path] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def enabled(self) -> bool:
+        return frame_store.available
+
+    async def start(self) -> None:
+        if self._workers or not self.enabled:
+            return
+        self._spool_dir.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue()
+
+        leftovers = sorted(self._spool_dir.glob("*.jpg"))
+        for path in leftovers:
+            self._queue.put_nowait(path)
+        FRAME_SPOOL_DEPTH.set(len(leftovers))
+        if leftovers:
+            print(f"📤 Resuming {len(leftovers)} spooled frame upload(s)")
+
+        self._workers = [
+            asyncio.create_task(self._upload_worker())
+            for _ in range(max(1, settings.FRAME_UPLOAD_CONCURRENCY))
+        ]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def read_pending(self, reading_id: int) -> bytes | None:
+        """Bytes of a frame still waiting in the spool for `reading_id`."""
+        path = next(self._spool_dir.glob(f"{reading_id}__*.jpg"), None)
+        if path is None:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, path.read_bytes)
+        except FileNotFoundError:
+            return None  # uploaded in the meantime
+
+    async def enqueue(
+        self, reading_id: int, public_id: str, image_bytes: bytes, captured_at: datetime
+    ) -> None:
+        """Durably spool a frame for upload. Returns once the file is on disk."""
+        path = self._spool_dir / f"{reading_id}__{int(captured_at.timestamp())}__{public_id}.jpg"
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_atomic, path, image_bytes)
+
+        if self._queue is None:
+            # Not started (e.g. scripts/tests): the next start() picks it up.
+            return
+        self._queue.put_nowait(path)
+        FRAME_SPOOL_DEPTH.inc()
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    async def _upload_worker(self) -> None:
+        while True:
+            path = await self._queue.get()
+            try:
+                await self._upload_with_retry(path)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # e.g. the spool file can't be read; keep it and try again later.
+                logger.exception(
+                    "Spooled frame upload failed for %s; requeueing in %ss",
+                    path.name, settings.FRAME_UPLOAD_MAX_BACKOFF_SECONDS,
+                )
+                asyncio.get_running_loop().call_later(
+                    settings.FRAME_UPLOAD_MAX_BACKOFF_SECONDS, self._requeue, path
+                )
+            finally:
+                FRAME_SPOOL_DEPTH.dec()
+
+    def _requeue(self, path: Path) -> None:
+        if self._queue is not None:
+            self._queue.put_nowait(path)
+            FRAME_SPOOL_DEPTH.inc()
+
+    async def _upload_with_retry(self, path: Path) -> None:
+        try:
+            reading_id_str, captured_str, public_id = path.stem.split("__", 2)
+            reading_id = int(reading_id_str)
+            captured_at = datetime.fromtimestamp(int(captured_str), tz=timezone.utc)
+        except ValueError:
+            logger.warning("Discarding unrecognised spool file %s", path.name)
+            path.unlink(missing_ok=True)
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            image_bytes = await loop.run_in_executor(None, path.read_bytes)
+        except FileNotFoundError:
+            return  # already uploaded and removed
+
+        delay = FIRST_RETRY_DELAY_SECONDS
+        image_path = None
+        while True:
+            try:
+                if image_path is None:
+                    image_path = await frame_store.save(image_bytes, public_id, captured_at)
+                    FRAME_UPLOADS.labels(outcome="success").inc()
+                # Only the patch is retried once the upload went through.
+                async with AsyncSessionLocal() as db:
+                    await model_readings_crud.update_image_path(
+                        db=db, reading_id=reading_id, image_path=image_path
+                    )
+                break
+            except FrameStoreError as e:
+                logger.warning("%s; retrying in %ss", e, delay)
+            except Exception as e:
+                logger.warning(
+                    "Spooled frame %s failed (%s: %s); retrying in %ss", path.name, type(e).__name__, e, delay
+                )
+            FRAME_UPLOADS.labels(outcome="retry").inc()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.FRAME_UPLOAD_MAX_BACKOFF_SECONDS)
+
+        path.unlink(missing_ok=True)
+
+
+frame_spool_service = FrameSpoolService()
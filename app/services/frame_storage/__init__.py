@@ -0,0 +1,41 @@
+"""Frame storage backend factory."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from app.core.config import settings
+
+from .base import FrameStore, FrameStoreError
+from .cloudinary import CloudinaryFrameStore
+from .local import LocalFrameStore
+
+_BACKENDS: dict[str, type] = {
+    "cloudinary": CloudinaryFrameStore,
+    "local": LocalFrameStore,
+}
+
+
+def get_frame_store(name: str) -> FrameStore:
+    """Return a store for the configured FRAME_STORAGE_BACKEND."""
+    backend_cls = _BACKENDS.get((name or "").lower())
+    if backend_cls is None:
+        raise FrameStoreError(
+            f"Unknown FRAME_STORAGE_BACKEND '{name}'. "
+            f"Choose one of: {', '.join(_BACKENDS)}"
+        )
+    if backend_cls is LocalFrameStore and settings.FRAME_STORAGE_LOCAL_DIR:
+        return LocalFrameStore(Path(settings.FRAME_STORAGE_LOCAL_DIR))
+    return backend_cls()
+
+
+frame_store: FrameStore = get_frame_store(settings.FRAME_STORAGE_BACKEND)
+
+
+__all__ = [
+    "frame_store",
+    "get_frame_store",
+    "FrameStore",
+    "FrameStoreError",
+    "LocalFrameStore",
+]
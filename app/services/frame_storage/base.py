@@ -0,0 +1,38 @@
+"""Frame storage abstraction.
+
+A ``FrameStore`` persists a captured camera frame and returns the
+``image_path`` written to ``model_readings`` — an absolute URL for Cloudinary, a
+route-relative URL (``/api/v1/frames/...``) for the local store.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Protocol, runtime_checkable
+
+
+class FrameStoreError(RuntimeError):
+    """Raised when a frame could not be stored (callers retry)."""
+
+
+@runtime_checkable
+class FrameStore(Protocol):
+    name: str
+
+    @property
+    def available(self) -> bool:
+        """False when the backend is not configured (e.g. Cloudinary disabled)."""
+        ...
+
+    async def save(self, image_bytes: bytes, public_id: str, captured_at: datetime) -> str:
+        """Store a JPEG and return its image_path. Raises FrameStoreError."""
+        ...
+
+    async def load(self, image_path: str) -> bytes | None:
+        """Bytes of a frame previously returned by save(), or None if gone."""
+        ...
+
+    async def prune_before(self, cutoff: date) -> int:
+        """Drop frames captured before `cutoff` where the backend owns retention.
+        Returns the number of frames removed."""
+        ...
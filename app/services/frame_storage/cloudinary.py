@@ -0,0 +1,41 @@
+"""Cloudinary frame store — the original upload path behind ``FrameStore``."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from io import BytesIO
+
+import httpx
+
+from app.core import cloudinary as cloudinary_core
+from app.core.cloudinary import upload_image
+
+from .base import FrameStoreError
+
+
+class CloudinaryFrameStore:
+    name = "cloudinary"
+
+    @property
+    def available(self) -> bool:
+        return cloudinary_core.cloudinary_enabled
+
+    async def save(self, image_bytes: bytes, public_id: str, captured_at: datetime) -> str:
+        upload_result = await upload_image(BytesIO(image_bytes), filename=public_id)
+        if not upload_result or not upload_result.get("secure_url"):
+            raise FrameStoreError(f"Cloudinary upload failed for '{public_id}'")
+        return upload_result["secure_url"]
+
+    async def load(self, image_path: str) -> bytes | None:
+        if not image_path.startswith("https://"):
+            return None
+        try:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(image_path)
+        except httpx.HTTPError:
+            return None
+        return response.content if response.status_code == 200 else None
+
+    async def prune_before(self, cutoff: date) -> int:
+        # Retention of uploaded assets is managed on the Cloudinary side.
+        return 0
@@ -0,0 +1,97 @@
+"""Local content-addressed frame store.
+
+Frames live under ``<root>/YYYY/MM/DD/<sha256>.jpg``: identical frames are stored
+once, paths never change (so they can be cached forever and served with a
+strong ETag), and retention is enforced by deleting whole day directories.
+Files are served by ``GET /api/v1/frames/{year}/{month}/{day}/{name}``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+from datetime import date, datetime
+from pathlib import Path
+
+from .base import FrameStoreError
+
+DEFAULT_ROOT = Path(__file__).parent.parent.parent / "storage" / "frames"
+URL_PREFIX = "/api/v1/frames"
+FRAME_NAME_RE = re.compile(r"^[0-9a-f]{64}\.jpg$")
+
+
+class LocalFrameStore:
+    name = "local"
+
+    def __init__(self, root: Path = DEFAULT_ROOT):
+        self.root = root
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    async def save(self, image_bytes: bytes, public_id: str, captured_at: datetime) -> str:
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        relative = f"{captured_at:%Y/%m/%d}/{digest}.jpg"
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write_once, self.root / relative, image_bytes)
+        except OSError as e:
+            raise FrameStoreError(f"Local frame write failed for '{public_id}': {e}") from e
+        return f"{URL_PREFIX}/{relative}"
+
+    def resolve(self, year: str, month: str, day: str, name: str) -> Path | None:
+        """Map a route path back to a file, rejecting anything that isn't a
+        date-sharded content hash (no traversal). Returns None if absent."""
+        if not (year.isdigit() and month.isdigit() and day.isdigit()):
+            return None
+        if not FRAME_NAME_RE.match(name):
+            return None
+        path = self.root / year / month / day / name
+        return path if path.is_file() else None
+
+    async def load(self, image_path: str) -> bytes | None:
+        if not image_path.startswith(f"{URL_PREFIX}/"):
+            return None
+        parts = image_path[len(URL_PREFIX) + 1:].split("/")
+        if len(parts) != 4:
+            return None
+        path = self.resolve(*parts)
+        if path is None:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, path.read_bytes)
+
+    async def prune_before(self, cutoff: date) -> int:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._prune_day_dirs, cutoff)
+
+    @staticmethod
+    def _write_once(path: Path, data: bytes) -> None:
+        if path.exists():
+            return  # content-addressed: same bytes already stored
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _prune_day_dirs(self, cutoff: date) -> int:
+        removed = 0
+        if not self.root.exists():
+            return 0
+        for day_dir in self.root.glob("[0-9]*/[0-9]*/[0-9]*"):
+            try:
+                year, month, day = (int(p) for p in day_dir.relative_to(self.root).parts)
+                day_date = date(year, month, day)
+            except ValueError:
+                continue
+            if day_date < cutoff:
+                removed += sum(1 for _ in day_dir.glob("*.jpg"))
+                shutil.rmtree(day_dir, ignore_errors=True)
+        return removed
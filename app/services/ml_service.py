@@ -1,108 +1,327 @@
 import asyncio
 import logging
 import random
-from collections import deque
-from io import BytesIO
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from datetime import datetime, timezone
 
-from app.core.cloudinary import upload_image
-from app.crud import model_readings_crud
-from app.schemas import ModelReadingCreate, ModelWebSocketResponse, BlockageStatus, ObstructionConfidence
+from app.crud import model_readings_crud, system_settings_crud
+from app.schemas import ModelReadingCreate, ModelWebSocketResponse, BlockageStatus, ObstructionConfidence, CaptureSchedule
 from app.core.database import AsyncSessionLocal
 from app.services.websocket_service import websocket_service
+from app.services.frame_spool_service import frame_spool_service
+from app.services.cache_service import cache_service
 from app.models.data_sources.model_readings import ModelReadings
 from app.core.state import fusion_state_manager
 from app.core.config import settings
+from app.ml.batcher import InferenceBatcher
+from app.ml.confidence import ConfidenceWindows
+from app.ml.detector import CLEAR_MAX, PARTIAL_MAX, FrameResult, Roi, pack_detections
+from app.ml.registry import DEFAULT_VERSION, REGISTRY_PATH, LoadedModel, ModelRegistry, ShadowComparison, load_model
+from app.ml.runtime import SessionConfig, default_intra_op_threads
+from app.ml.scene import scene_change, scene_signature
+from app.core.metrics import SCENE_CHANGE_SCORE, SCENE_GATE_FRAMES
 
 
 logger = logging.getLogger(__name__)
 
-WEIGHTS_PATH = Path(__file__).parent.parent / "ml" / "weights" / "best.onnx"
-
-# Coverage % -> per-frame status
-CLEAR_MAX = 20.0      # < 20%      -> clear
-PARTIAL_MAX = 60.0    # 20% - 60%  -> partial
-                      # >= 60%     -> blocked
-
 # F1 — adaptive-sampling hysteresis: stay on the elevated (fast) capture interval
 # for this long after fusion risk relaxes, so the cadence doesn't oscillate.
 ELEVATED_RELAX_HYSTERESIS_SECONDS = 5 * 60
 ELEVATED_ALERT_NAMES = ("Warning", "Critical")
 
-# YOLO thresholds
-CONF_THRESHOLD = 0.35
-IOU_THRESHOLD = 0.5
+# A frame arriving this much before the capture interval elapses is still inferred.
+CAPTURE_INTERVAL_TOLERANCE_SECONDS = 5
+
+# system_settings key holding the registry version to load at startup.
+MODEL_VERSION_SETTING = "ml_model_version"
+
 
-# Fallback input size if ONNX model declares dynamic spatial dims
-DEFAULT_INPUT_SIZE = 640
+@dataclass
+class _SceneReference:
+    signature: object  # np.ndarray from scene_signature
+    roi: Roi | None     # the ROI the signature was taken over
+    percentage: float
+    status: str
+    inferred_at: float  # time.monotonic()
 
 
 class MLService:
     """
     YOLOv8 ONNX inference on JPEG frames from the camera.
-    Throttled to FRAME_CAPTURE_INTERVAL_SECONDS per device.
-    Per-frame status is smoothed (2-of-3) before broadcast + fusion so a single
-    frame with debris just passing through doesn't flip the status.
-    Bounding boxes are drawn on the frame before upload to Cloudinary.
+    Throttled to FRAME_CAPTURE_INTERVAL_SECONDS per device (faster while fusion
+    risk is elevated).
+    Per-frame status is smoothed by a confidence window before broadcast + fusion
+    so a single frame with debris just passing through doesn't flip the status.
     Falls back to random placeholder values when weights are absent.
     """
 
     def __init__(self):
         self._last_processed: dict[int, datetime] = {}
         # F1 — rolling window of recent raw statuses per camera (confidence engine).
-        self._windows: dict[int, deque] = {}
+        self._windows = ConfidenceWindows(settings.OBSTRUCTION_WINDOW_K)
         # F1 — adaptive sampling: monotonic deadline until which the fast interval holds.
         self._elevated_until: dict[int, float] = {}
-        self._session = self._load_session()
-        self._input_name, self._input_size = self._inspect_input()
+        # Scene-change gate: signature + result of the last inferred frame per camera.
+        self._scene_refs: dict[int, _SceneReference] = {}
+        # Waiters parked in wait_for_cadence_change, per location; woken on alert changes.
+        self._cadence_waiters: dict[int, set[asyncio.Event]] = {}
+        fusion_state_manager.add_alert_listener(self._on_alert_change)
+        self._registry = ModelRegistry(
+            Path(settings.ML_MODEL_REGISTRY_DIR) if settings.ML_MODEL_REGISTRY_DIR else REGISTRY_PATH
+        )
+        # Set once start() (or activate_model) finds usable weights; each batch
+        # reads it once, so a swap takes effect between batches.
+        self._active: LoadedModel | None = None
+        self._shadow: LoadedModel | None = None
+        self._shadow_stats: ShadowComparison | None = None
+        self._shadow_busy = False
+        self._shadow_tasks: set[asyncio.Task] = set()
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self._swap_lock = asyncio.Lock()
+        self._batcher = InferenceBatcher(
+            run_batch=self._dispatch_batch,
+            max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+            max_wait_ms=settings.INFERENCE_BATCH_MAX_WAIT_MS,
+        )
 
     def _capture_interval_seconds(self, camera_device_id: int, location_id: int) -> int:
+        if self._is_elevated(camera_device_id, location_id):
+            return settings.FRAME_CAPTURE_INTERVAL_ELEVATED_SECONDS
+        return settings.FRAME_CAPTURE_INTERVAL_SECONDS
+
+    def _is_elevated(self, camera_device_id: int, location_id: int) -> bool:
         """F1 adaptive sampling: drop to the elevated interval while fusion risk is
         elevated (Warning/Critical), with hysteresis so it doesn't flap back."""
-        import time
-
         alert_name = fusion_state_manager.get_alert_name(location_id)
         now_ts = time.monotonic()
 
         if alert_name in ELEVATED_ALERT_NAMES:
             self._elevated_until[camera_device_id] = now_ts + ELEVATED_RELAX_HYSTERESIS_SECONDS
-            return settings.FRAME_CAPTURE_INTERVAL_ELEVATED_SECONDS
+            return True
 
-        if now_ts < self._elevated_until.get(camera_device_id, 0.0):
-            return settings.FRAME_CAPTURE_INTERVAL_ELEVATED_SECONDS
+        return now_ts < self._elevated_until.get(camera_device_id, 0.0)
 
-        return settings.FRAME_CAPTURE_INTERVAL_SECONDS
+    def get_capture_schedule(self, camera_device_id: int, location_id: int) -> CaptureSchedule:
+        """Current cadence for a camera, with wall-clock deadlines the device can act on."""
+        elevated = self._is_elevated(camera_device_id, location_id)
+        interval = (
+            settings.FRAME_CAPTURE_INTERVAL_ELEVATED_SECONDS if elevated
+            else settings.FRAME_CAPTURE_INTERVAL_SECONDS
+        )
+        now = datetime.now(timezone.utc)
 
-    def _load_session(self):
-        if not WEIGHTS_PATH.exists():
-            logger.warning(
-                "ONNX weights not found at %s; using placeholder predictions",
-                WEIGHTS_PATH,
-            )
-            return None
+        elevated_until = None
+        remaining = self._elevated_until.get(camera_device_id, 0.0) - time.monotonic()
+        if elevated and remaining > 0:
+            elevated_until = now + timedelta(seconds=remaining)
+
+        next_capture_at = None
+        last = self._last_processed.get(camera_device_id)
+        if last is not None:
+            due = last + timedelta(seconds=interval - CAPTURE_INTERVAL_TOLERANCE_SECONDS)
+            next_capture_at = due if due > now else None
+
+        return CaptureSchedule(
+            interval_seconds=interval,
+            mode="elevated" if elevated else "normal",
+            next_capture_at=next_capture_at,
+            elevated_until=elevated_until,
+        )
+
+    async def wait_for_cadence_change(self, camera_device_id: int, location_id: int) -> None:
+        """Park until the capture interval may have changed: the location's fusion
+        alert level changed, or the elevated-cadence hysteresis ran out."""
+        timeout = None
+        remaining = self._elevated_until.get(camera_device_id, 0.0) - time.monotonic()
+        if remaining > 0:
+            timeout = remaining
+
+        event = asyncio.Event()
+        waiters = self._cadence_waiters.setdefault(location_id, set())
+        waiters.add(event)
         try:
-            import onnxruntime as ort
-            session = ort.InferenceSession(
-                str(WEIGHTS_PATH), providers=["CPUExecutionProvider"]
-            )
-            logger.info("ONNX model loaded from %s", WEIGHTS_PATH)
-            return session
-        except Exception as e:
-            logger.warning(
-                "Failed to load ONNX model (%s); using placeholder",
-                type(e).__name__,
-            )
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters.discard(event)
+
+    def _on_alert_change(self, location_id: int, alert_name: str) -> None:
+        for event in self._cadence_waiters.get(location_id, ()):
+            event.set()
+
+    @property
+    def model_loaded(self) -> bool:
+        return self._active is not None
+
+    @property
+    def registry(self) -> ModelRegistry:
+        return self._registry
+
+    @property
+    def active_version(self) -> str | None:
+        return self._active.version if self._active is not None else None
+
+    @property
+    def swap_in_progress(self) -> bool:
+        return self._swap_lock.locked()
+
+    def model_report(self) -> dict | None:
+        """Version, session configuration and warm-up latency of the loaded model."""
+        return self._active.report() if self._active is not None else None
+
+    def shadow_report(self) -> dict | None:
+        return self._shadow_stats.report() if self._shadow_stats is not None else None
+
+    @staticmethod
+    def _session_config() -> SessionConfig:
+        intra = settings.ONNX_INTRA_OP_THREADS or default_intra_op_threads(settings.INFERENCE_WORKERS)
+        return SessionConfig(
+            variant=settings.ONNX_MODEL_VARIANT,
+            graph_optimization=settings.ONNX_GRAPH_OPTIMIZATION,
+            intra_op_threads=intra,
+            inter_op_threads=settings.ONNX_INTER_OP_THREADS,
+            cache_optimized_model=settings.ONNX_CACHE_OPTIMIZED_MODEL,
+            warmup_runs=settings.ONNX_WARMUP_RUNS,
+            draft_decode=settings.INFERENCE_DRAFT_DECODE,
+            input_size=settings.INFERENCE_INPUT_SIZE,
+        )
+
+    async def start(self) -> None:
+        """Load and warm up the stored registry version (falling back to the
+        default weights) — in the worker processes, or in-process when
+        INFERENCE_WORKERS=0. Idempotent; called from the app lifespan."""
+        async with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+
+            version = await self._stored_version()
+            loaded = await self._load(version) if self._registry.path_for(version) else None
+            if loaded is None and version != DEFAULT_VERSION:
+                logger.warning("Model version '%s' is unavailable; loading the default weights", version)
+                loaded = await self._load(DEFAULT_VERSION) if self._registry.path_for(DEFAULT_VERSION) else None
+            if loaded is None:
+                logger.warning("No usable ONNX weights; using placeholder predictions")
+                return
+
+            self._active = loaded
+            logger.info("ONNX model ready: %s", loaded.report())
+            # One batch in flight per worker.
+            self._batcher.configure(max_concurrent_batches=loaded.concurrency)
+            if not loaded.info.dynamic_batch:
+                logger.info("ONNX model has a fixed batch dim; batches run frame by frame")
+
+    async def stop(self) -> None:
+        await self._batcher.stop()
+        await self._stop_shadow()
+        if self._active is not None:
+            await self._active.close()
+            self._active = None
+        self._started = False
+
+    def snapshot_state(self) -> dict:
+        """Per-camera state worth keeping across a restart: confidence windows,
+        elevated-cadence deadlines (as wall-clock epochs) and last processed times."""
+        offset = time.time() - time.monotonic()
+        return {
+            "windows": self._windows.snapshot(),
+            "elevated_until": {
+                camera_id: deadline + offset for camera_id, deadline in self._elevated_until.items()
+            },
+            "last_processed": {
+                camera_id: processed_at.isoformat() for camera_id, processed_at in self._last_processed.items()
+            },
+        }
+
+    def restore_state(self, data: dict) -> None:
+        """Inverse of snapshot_state(); JSON object keys arrive as strings."""
+        offset = time.time() - time.monotonic()
+        self._windows.restore({int(camera_id): codes for camera_id, codes in data.get("windows", {}).items()})
+        for camera_id, deadline in data.get("elevated_until", {}).items():
+            self._elevated_until.setdefault(int(camera_id), deadline - offset)
+        for camera_id, processed_at in data.get("last_processed", {}).items():
+            self._last_processed.setdefault(int(camera_id), datetime.fromisoformat(processed_at))
+
+    async def activate_model(self, version: str) -> dict:
+        """Load and warm `version` while the current model keeps serving, then
+        swap it in; the old model is stopped once its in-flight batches return.
+        Raises LookupError for an unknown version and RuntimeError when the
+        weights can't be loaded (the current model stays active)."""
+        async with self._swap_lock:
+            if self._registry.path_for(version) is None:
+                raise LookupError(f"Unknown model version '{version}'")
+            if not self._started:
+                await self.start()
+
+            loaded = await self._load(version)
+            if loaded is None:
+                raise RuntimeError(f"Model version '{version}' could not be loaded")
+
+            previous, self._active = self._active, loaded
+            # Only effective before the first frame (the batcher's slots are fixed
+            # after that); INFERENCE_WORKERS doesn't change at runtime anyway.
+            self._batcher.configure(max_concurrent_batches=loaded.concurrency)
+            logger.info("Activated ONNX model %s", loaded.report())
+
+            if self._shadow is not None and self._shadow.version == version:
+                await self._stop_shadow()
+            if previous is not None:
+                await previous.close(drain_timeout=settings.ML_MODEL_DRAIN_TIMEOUT_SECONDS)
+            return loaded.report()
+
+    async def start_shadow(self, version: str, sample_rate: float) -> dict:
+        """Run `version` beside the active model on `sample_rate` of batches,
+        replacing any current shadow. Same errors as activate_model."""
+        async with self._swap_lock:
+            if self._registry.path_for(version) is None:
+                raise LookupError(f"Unknown model version '{version}'")
+
+            # A single worker: the shadow only sees a sample and must not take
+            # cores from the active model.
+            loaded = await self._load(version, workers=min(1, settings.INFERENCE_WORKERS))
+            if loaded is None:
+                raise RuntimeError(f"Model version '{version}' could not be loaded")
+
+            await self._stop_shadow()
+            self._shadow = loaded
+            self._shadow_stats = ShadowComparison(version, sample_rate)
+            logger.info("Shadowing ONNX model %s on %.0f%% of batches", version, sample_rate * 100)
+            return self._shadow_stats.report()
+
+    async def stop_shadow(self) -> dict | None:
+        """Stop the shadow model; returns its final comparison report."""
+        async with self._swap_lock:
+            report = self.shadow_report()
+            await self._stop_shadow()
+            return report
+
+    async def _stop_shadow(self) -> None:
+        shadow, self._shadow, self._shadow_stats = self._shadow, None, None
+        if shadow is not None:
+            await shadow.close(drain_timeout=settings.ML_MODEL_DRAIN_TIMEOUT_SECONDS)
+
+    async def _load(self, version: str, workers: int | None = None) -> LoadedModel | None:
+        path = self._registry.path_for(version)
+        if path is None:
             return None
+        return await load_model(
+            version, path, self._session_config(),
+            settings.INFERENCE_WORKERS if workers is None else workers,
+        )
 
-    def _inspect_input(self):
-        if self._session is None:
-            return None, (DEFAULT_INPUT_SIZE, DEFAULT_INPUT_SIZE)
-        inp = self._session.get_inputs()[0]
-        shape = inp.shape  # [batch, 3, H, W]
-        h = shape[2] if isinstance(shape[2], int) else DEFAULT_INPUT_SIZE
-        w = shape[3] if isinstance(shape[3], int) else DEFAULT_INPUT_SIZE
-        return inp.name, (w, h)
+    @staticmethod
+    async def _stored_version() -> str:
+        """The version last activated by an admin; default when unset or unreadable."""
+        try:
+            async with AsyncSessionLocal() as db:
+                value = await system_settings_crud.get_value(db=db, key=MODEL_VERSION_SETTING)
+        except Exception:
+            return DEFAULT_VERSION
+        return value if isinstance(value, str) and value else DEFAULT_VERSION
 
     async def process_frame_bytes(
         self,
@@ -110,35 +329,52 @@ class MLService:
         camera_device_id: int,
         location_id: int,
     ) -> dict:
+        """Infer one camera frame, then broadcast the smoothed status and feed
+        fusion. Returns {} for frames inside the capture interval.
+
+        Frames are cropped to the camera's ROI (if set) and a scene-change gate
+        reuses the previous detections, without a new reading or upload, for a
+        frame that looks like the last inferred one. Otherwise the detections are
+        stored with the reading and the original frame goes to the frame spool;
+        annotated frames are rendered on demand."""
         now = datetime.now(timezone.utc)
         capture_interval = self._capture_interval_seconds(camera_device_id, location_id)
         last = self._last_processed.get(camera_device_id)
         if last is not None:
             elapsed = (now - last).total_seconds()
-            if elapsed < capture_interval - 5:
+            if elapsed < capture_interval - CAPTURE_INTERVAL_TOLERANCE_SECONDS:
                 return {}
 
         self._last_processed[camera_device_id] = now
 
-        raw_percentage, raw_status, upload_bytes = await self._infer_and_annotate(image_bytes)
+        roi = await self._camera_roi(camera_device_id)
+        signature = await self._scene_signature(image_bytes, roi)
+        reused = self._reuse_detections(camera_device_id, signature, roi)
+        if reused is not None:
+            # Unchanged scene: the previous detections still stand. They keep
+            # feeding the confidence window, but no new reading or upload.
+            raw_percentage, raw_status = reused
+        else:
+            result = await self._infer(image_bytes, camera_device_id, roi)
+            if result is None:
+                # Failed frame: report clear for it, but never let it stand in
+                # for the following ones.
+                raw_percentage, raw_status, detections = 0.0, "clear", []
+            else:
+                raw_percentage, raw_status, detections = result
+                if signature is not None:
+                    self._scene_refs[camera_device_id] = _SceneReference(
+                        signature, roi, raw_percentage, raw_status, time.monotonic()
+                    )
+
         confidence = self._compute_confidence(camera_device_id, raw_status, raw_percentage)
         # Sustained-evidence status drives fusion; a lone flagged frame stays "possible".
         smoothed_status = self._status_from_tier(confidence.tier)
 
-        public_id = f"rpi_{camera_device_id}_{int(now.timestamp())}"
-        upload_result = await upload_image(BytesIO(upload_bytes), filename=public_id)
-        image_url = upload_result["secure_url"] if upload_result else f"rpi_frame_{public_id}.jpg"
-
-        async with AsyncSessionLocal() as db:
-            obj_in = ModelReadingCreate(
-                camera_device_id=camera_device_id,
-                image_path=image_url,
-                timestamp=now,
-                blockage_percentage=raw_percentage,
-                blockage_status=raw_status,
-            )
-            db_obj: ModelReadings = await model_readings_crud.create_and_return(
-                db=db, obj_in=obj_in
+        if reused is None:
+            await self._persist_reading(
+                camera_device_id, now, raw_percentage, raw_status,
+                pack_detections(detections, roi), image_bytes,
             )
 
         blockage_reading = ModelWebSocketResponse(
@@ -157,7 +393,7 @@ class MLService:
         await fusion_state_manager.recalculate_visual_status_score(
             blockage_status=BlockageStatus(
                 status=smoothed_status,
-                timestamp=db_obj.timestamp,
+                timestamp=now,
                 confidence=confidence,
             ),
             location_id=location_id,
@@ -165,163 +401,147 @@ class MLService:
 
         return blockage_reading.model_dump(mode="json")
 
-    async def _infer_and_annotate(self, image_bytes: bytes) -> tuple[float, str, bytes]:
-        """Return (raw_percentage, raw_status, bytes_to_upload)."""
-        if self._session is None:
-            pct, status = self._placeholder_inference()
-            return pct, status, image_bytes
+    async def _persist_reading(
+        self,
+        camera_device_id: int,
+        now: datetime,
+        raw_percentage: float,
+        raw_status: str,
+        detections: dict,
+        image_bytes: bytes,
+    ) -> None:
+        # Persist with a provisional path now; the spool uploads the original
+        # frame in the background and patches image_path, so upload latency never
+        # delays fusion. Annotated frames are rendered from `detections` on demand.
+        public_id = f"rpi_{camera_device_id}_{int(now.timestamp())}"
 
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self._run_inference, image_bytes)
+        async with AsyncSessionLocal() as db:
+            obj_in = ModelReadingCreate(
+                camera_device_id=camera_device_id,
+                image_path=f"rpi_frame_{public_id}.jpg",
+                timestamp=now,
+                blockage_percentage=raw_percentage,
+                blockage_status=raw_status,
+                detections=detections,
+            )
+            db_obj: ModelReadings = await model_readings_crud.create_and_return(
+                db=db, obj_in=obj_in
+            )
 
-    def _run_inference(self, image_bytes: bytes) -> tuple[float, str, bytes]:
+        if frame_spool_service.enabled:
+            try:
+                await frame_spool_service.enqueue(db_obj.id, public_id, image_bytes, now)
+            except OSError as e:
+                logger.warning("Could not spool frame %s (%s)", public_id, type(e).__name__)
+
+    async def _scene_signature(self, image_bytes: bytes, roi: Roi | None):
+        """Signature for the scene-change gate, or None when the gate is off, no
+        model is loaded (placeholder values are never reused) or the frame can't
+        be read; the frame is then always inferred."""
+        if not settings.SCENE_GATE_ENABLED or not self.model_loaded:
+            return None
+        loop = asyncio.get_running_loop()
         try:
-            import numpy as np
-            from PIL import Image
-
-            img = Image.open(BytesIO(image_bytes)).convert("RGB")
-            img_np = np.array(img)
-            orig_h, orig_w = img_np.shape[:2]
+            return await loop.run_in_executor(None, scene_signature, image_bytes, roi)
+        except Exception as e:
+            logger.warning("Scene signature failed (%s); running inference", type(e).__name__)
+            return None
 
-            x, scale, pad = self._preprocess(img_np)
-            outputs = self._session.run(None, {self._input_name: x})
-            detections = self._postprocess(outputs[0], scale, pad, (orig_h, orig_w))
+    def _reuse_detections(self, camera_device_id: int, signature, roi: Roi | None) -> tuple[float, str] | None:
+        """(pct, status) of the last inferred frame if this one shows the same
+        scene and the forced refresh interval hasn't elapsed; otherwise None.
+        A reference taken over a different ROI is dropped."""
+        ref = self._scene_refs.get(camera_device_id)
+        if ref is not None and ref.roi != roi:
+            del self._scene_refs[camera_device_id]
+            ref = None
+        if signature is None or ref is None:
+            if signature is not None:
+                SCENE_GATE_FRAMES.labels(outcome="inferred").inc()
+            return None
 
-            pct = self._compute_coverage_pct(detections, (orig_h, orig_w))
-            annotated = self._draw_boxes(img, detections)
+        change = scene_change(ref.signature, signature)
+        SCENE_CHANGE_SCORE.observe(change)
+        fresh = time.monotonic() - ref.inferred_at < settings.SCENE_FORCE_REFRESH_SECONDS
+        if fresh and change < settings.SCENE_CHANGE_THRESHOLD:
+            SCENE_GATE_FRAMES.labels(outcome="skipped").inc()
+            return ref.percentage, ref.status
+        SCENE_GATE_FRAMES.labels(outcome="inferred").inc()
+        return None
+
+    async def _infer(
+        self, image_bytes: bytes, camera_device_id: int, roi: Roi | None
+    ) -> FrameResult | None:
+        """Return (raw_percentage, raw_status, detections), or None when the
+        frame could not be inferred (bad frame, failed run or batch).
+
+        Frames from all cameras share one micro-batching queue, so concurrent
+        cameras are served by a single (N, 3, H, W) run in the inference workers."""
+        if not self._started:
+            await self.start()
+
+        if not self.model_loaded:
+            pct, status = self._placeholder_inference()
+            return pct, status, []
 
-            buf = BytesIO()
-            annotated.save(buf, format="JPEG", quality=85)
-            return pct, self._status_from_pct(pct), buf.getvalue()
+        try:
+            return await self._batcher.submit(camera_device_id, (image_bytes, roi))
         except Exception as e:
             logger.warning("Inference failed (%s); treating as clear", type(e).__name__)
-            return 0.0, "clear", image_bytes
-
-    def _preprocess(self, img_np):
-        """Letterbox resize to model input, normalize to [0,1], HWC->CHW, add batch."""
-        import numpy as np
-        from PIL import Image
-
-        w_in, h_in = self._input_size
-        h, w = img_np.shape[:2]
-        scale = min(w_in / w, h_in / h)
-        new_w, new_h = int(w * scale), int(h * scale)
-
-        resized = np.array(Image.fromarray(img_np).resize((new_w, new_h), Image.BILINEAR))
-
-        pad_w = w_in - new_w
-        pad_h = h_in - new_h
-        left, top = pad_w // 2, pad_h // 2
-        padded = np.full((h_in, w_in, 3), 114, dtype=np.uint8)
-        padded[top:top + new_h, left:left + new_w] = resized
-
-        x = padded.astype(np.float32) / 255.0
-        x = x.transpose(2, 0, 1)[np.newaxis, ...]
-        return x, scale, (left, top)
-
-    def _postprocess(self, output, scale, pad, orig_shape):
-        """YOLOv8 single-class output (1, 5, N) -> list of (x1,y1,x2,y2,conf)."""
-        import numpy as np
-
-        pred = output[0].T  # (N, 5): cx, cy, w, h, conf
-        mask = pred[:, 4] >= CONF_THRESHOLD
-        pred = pred[mask]
-        if len(pred) == 0:
-            return []
-
-        boxes = np.empty((len(pred), 4), dtype=np.float32)
-        boxes[:, 0] = pred[:, 0] - pred[:, 2] / 2
-        boxes[:, 1] = pred[:, 1] - pred[:, 3] / 2
-        boxes[:, 2] = pred[:, 0] + pred[:, 2] / 2
-        boxes[:, 3] = pred[:, 1] + pred[:, 3] / 2
-        scores = pred[:, 4].copy()
-
-        pad_x, pad_y = pad
-        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / scale
-        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / scale
-
-        h, w = orig_shape
-        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
-        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
-
-        keep = self._nms(boxes, scores, IOU_THRESHOLD)
-        return [
-            (float(boxes[i, 0]), float(boxes[i, 1]),
-             float(boxes[i, 2]), float(boxes[i, 3]),
-             float(scores[i]))
-            for i in keep
-        ]
-
-    @staticmethod
-    def _nms(boxes, scores, iou_thresh):
-        import numpy as np
-
-        x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
-        areas = (x2 - x1) * (y2 - y1)
-        order = scores.argsort()[::-1]
-
-        keep = []
-        while len(order) > 0:
-            i = int(order[0])
-            keep.append(i)
-            if len(order) == 1:
-                break
-            xx1 = np.maximum(x1[i], x1[order[1:]])
-            yy1 = np.maximum(y1[i], y1[order[1:]])
-            xx2 = np.minimum(x2[i], x2[order[1:]])
-            yy2 = np.minimum(y2[i], y2[order[1:]])
-            w = np.maximum(0.0, xx2 - xx1)
-            h = np.maximum(0.0, yy2 - yy1)
-            inter = w * h
-            iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
-            order = order[1:][iou <= iou_thresh]
-        return keep
-
-    @staticmethod
-    def _compute_coverage_pct(detections, orig_shape) -> float:
-        """Union of detection-box widths over the full frame width, as a percentage."""
-        _, w = orig_shape
-        if not detections:
-            return 0.0
-
-        spans: list[tuple[int, int]] = []
-        for x1, y1, x2, y2, _ in detections:
-            x1i, x2i = max(0, int(x1)), min(w, int(x2))
-            if x2i > x1i and y2 > y1:
-                spans.append((x1i, x2i))
-
-        if not spans:
-            return 0.0
-
-        spans.sort()
-        merged: list[list[int]] = []
-        for start, end in spans:
-            if not merged or start > merged[-1][1]:
-                merged.append([start, end])
-            else:
-                merged[-1][1] = max(merged[-1][1], end)
-
-        blocked_width = sum(end - start for start, end in merged)
-        return round(100.0 * float(blocked_width) / float(w), 2)
-
-    @staticmethod
-    def _status_from_pct(pct: float) -> str:
-        if pct < CLEAR_MAX:
-            return "clear"
-        if pct < PARTIAL_MAX:
-            return "partial"
-        return "blocked"
-
-    @staticmethod
-    def _draw_boxes(img, detections):
-        from PIL import ImageDraw
+            return None
 
-        out = img.copy()
-        draw = ImageDraw.Draw(out)
-        for x1, y1, x2, y2, conf in detections:
-            draw.rectangle([x1, y1, x2, y2], outline="red", width=3)
-            draw.text((x1 + 2, y1 + 2), f"{conf:.2f}", fill="red")
-        return out
+    async def _camera_roi(self, camera_device_id: int) -> Roi | None:
+        """The camera's ROI from the cache (whole frame if unset or unreadable)."""
+        try:
+            async with AsyncSessionLocal() as db:
+                roi = await cache_service.get_camera_roi(db=db, camera_device_id=camera_device_id)
+        except Exception as e:
+            logger.warning("Could not load camera ROI (%s); using the whole frame", type(e).__name__)
+            return None
+        return roi.as_tuple() if roi is not None else None
+
+    async def _dispatch_batch(self, payloads: list[tuple[bytes, Roi | None]]) -> list[FrameResult | None]:
+        model = self._active
+        if model is None:
+            raise RuntimeError("No ONNX model loaded")
+        frames = [frame for frame, _ in payloads]
+        rois = [roi for _, roi in payloads]
+        started = time.monotonic()
+        results = await model.run_batch(frames, rois)
+        self._maybe_shadow(frames, rois, results, time.monotonic() - started)
+        return results
+
+    def _maybe_shadow(
+        self, frames: list[bytes], rois: list[Roi | None], results: list[FrameResult | None], seconds: float
+    ) -> None:
+        """Re-run a sampled batch on the shadow model in the background. At most
+        one shadow batch runs at a time; samples arriving meanwhile are dropped."""
+        shadow, stats = self._shadow, self._shadow_stats
+        if shadow is None or stats is None or self._shadow_busy or random.random() >= stats.sample_rate:
+            return
+        self._shadow_busy = True
+        task = asyncio.create_task(self._run_shadow(shadow, stats, frames, rois, results, seconds))
+        self._shadow_tasks.add(task)
+        task.add_done_callback(self._shadow_tasks.discard)
+
+    async def _run_shadow(
+        self,
+        shadow: LoadedModel,
+        stats: ShadowComparison,
+        frames: list[bytes],
+        rois: list[Roi | None],
+        primary: list[FrameResult | None],
+        primary_seconds: float,
+    ) -> None:
+        try:
+            started = time.monotonic()
+            results = await shadow.run_batch(frames, rois)
+            stats.record(primary, results, primary_seconds, time.monotonic() - started)
+        except Exception as e:
+            stats.record_failure()
+            logger.warning("Shadow inference failed (%s)", type(e).__name__)
+        finally:
+            self._shadow_busy = False
 
     def _compute_confidence(
         self, camera_device_id: int, raw_status: str, raw_percentage: float
@@ -331,22 +551,17 @@ class MLService:
         Pushes the raw status into a rolling window of the last K readings and
         derives a graded tier + score. `blocked` counts fully; `partial` counts
         as `OBSTRUCTION_PARTIAL_WEIGHT`. The window must be full before escalating
-        past `possible` (cold-start guard)."""
+        past `possible` (cold-start guard). The window keeps running counts, so
+        this is O(1) in K."""
         k = max(1, settings.OBSTRUCTION_WINDOW_K)
-        buf = self._windows.get(camera_device_id)
-        if buf is None or buf.maxlen != k:
-            buf = deque(buf or [], maxlen=k)
-            self._windows[camera_device_id] = buf
-        buf.append(raw_status)
-
-        flagged_in_window = sum(1 for s in buf if s != "clear")
-        weighted = sum(
-            1.0 if s == "blocked"
-            else (settings.OBSTRUCTION_PARTIAL_WEIGHT if s == "partial" else 0.0)
-            for s in buf
-        )
+        if self._windows.k != k:
+            self._windows.resize(k)
+        counts = self._windows.push(camera_device_id, raw_status)
+
+        flagged_in_window = counts.blocked + counts.partial
+        weighted = counts.blocked + settings.OBSTRUCTION_PARTIAL_WEIGHT * counts.partial
         fraction = weighted / k
-        window_full = len(buf) >= k
+        window_full = counts.filled >= k
 
         if window_full and fraction >= settings.OBSTRUCTION_TIER_CONFIRMED:
             tier = "confirmed"
@@ -58,6 +58,8 @@ class ModelReadingLogService:
             blockage_percentage=reading.blockage_percentage,
             timestamp=reading.timestamp,
             created_at=reading.created_at,
+            detections=reading.detections,
+            annotated_image_url=f"/api/v1/model-reading-logs/{reading.id}/annotated",
         )
 
 
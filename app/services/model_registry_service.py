@@ -0,0 +1,106 @@
+import asyncio
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.dependencies import CurrentUser
+from app.core.config import settings
+from app.crud import system_settings_crud, admin_audit_log_crud
+from app.schemas import AdminAuditLogCreate, ModelRegistryResponse, ModelVersionItem
+from app.services.ml_service import ml_service, MODEL_VERSION_SETTING
+
+
+class ModelRegistryService:
+
+    async def list_models(self) -> ModelRegistryResponse:
+
+        # Hashing the weight files is blocking I/O; keep it off the event loop.
+        loop = asyncio.get_running_loop()
+        versions = await loop.run_in_executor(None, ml_service.registry.list_versions)
+
+        shadow = ml_service.shadow_report()
+        shadow_version = shadow["version"] if shadow else None
+
+        return ModelRegistryResponse(
+            active_version=ml_service.active_version,
+            active_model=ml_service.model_report(),
+            shadow=shadow,
+            versions=[
+                ModelVersionItem(
+                    name=v.name,
+                    size_bytes=v.size_bytes,
+                    sha256=v.sha256,
+                    modified_at=v.modified_at,
+                    active=v.name == ml_service.active_version,
+                    shadow=v.name == shadow_version,
+                )
+                for v in versions
+            ],
+        )
+
+
+    async def activate(self, db: AsyncSession, version: str, current_user: CurrentUser) -> dict:
+
+        self._ensure_idle()
+        previous = ml_service.active_version
+
+        try:
+            report = await ml_service.activate_model(version)
+        except LookupError:
+            raise HTTPException(status_code=404, detail=f"Model version '{version}' not found")
+        except RuntimeError:
+            raise HTTPException(status_code=422, detail=f"Model version '{version}' could not be loaded")
+
+        # Persist so a restart comes back on the same weights.
+        await system_settings_crud.set_value(db=db, key=MODEL_VERSION_SETTING, value=version)
+        await admin_audit_log_crud.create_only(db=db, obj_in=AdminAuditLogCreate(
+            admin_user_id=current_user.id,
+            action=f"Activated ML model version '{version}' (was '{previous or 'placeholder'}')"
+        ))
+        return report
+
+
+    async def start_shadow(self, db: AsyncSession, version: str, sample_rate: float | None, current_user: CurrentUser) -> dict:
+
+        self._ensure_idle()
+        rate = sample_rate if sample_rate is not None else settings.ML_SHADOW_SAMPLE_RATE
+
+        try:
+            report = await ml_service.start_shadow(version, rate)
+        except LookupError:
+            raise HTTPException(status_code=404, detail=f"Model version '{version}' not found")
+        except RuntimeError:
+            raise HTTPException(status_code=422, detail=f"Model version '{version}' could not be loaded")
+
+        await admin_audit_log_crud.create_only(db=db, obj_in=AdminAuditLogCreate(
+            admin_user_id=current_user.id,
+            action=f"Started shadowing ML model version '{version}' on {rate:.0%} of batches"
+        ))
+        return report
+
+
+    def get_shadow(self) -> dict:
+
+        report = ml_service.shadow_report()
+        if report is None:
+            raise HTTPException(status_code=404, detail="No shadow model running")
+        return report
+
+
+    async def stop_shadow(self, db: AsyncSession, current_user: CurrentUser) -> dict:
+
+        report = await ml_service.stop_shadow()
+        if report is None:
+            raise HTTPException(status_code=404, detail="No shadow model running")
+
+        await admin_audit_log_crud.create_only(db=db, obj_in=AdminAuditLogCreate(
+            admin_user_id=current_user.id,
+            action=f"Stopped shadowing ML model version '{report['version']}'"
+        ))
+        return report
+
+
+    def _ensure_idle(self) -> None:
+        if ml_service.swap_in_progress:
+            raise HTTPException(status_code=409, detail="A model swap is already in progress")
+
+
+model_registry_service = ModelRegistryService()
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.fusion_cluster import fusion_cluster
+from app.core.metrics import NOTIFICATION_INTENTS, NOTIFICATION_INTENT_QUEUE_DEPTH
+from app.crud import notification_intent_crud, notification_template_crud, responder_crud
+from app.models import NotificationIntent, NotificationIntentStatus, NotificationType
+from app.schemas.subscription import SendNotificationSchema
+from app.services.notification_service import notification_service
+
+
+logger = logging.getLogger(__name__)
+
+# Minimum gap between two auto-notifications of one type for one location.
+NOTIFY_COOLDOWN_SECONDS = {
+    NotificationType.WARNING: 30 * 60,       # 30 minutes
+    NotificationType.CRITICAL: 30 * 60,      # 30 minutes
+    NotificationType.BLOCKAGE: 4 * 60 * 60,  # 4 hours — blockages persist
+}
+LOG_LABELS = {
+    NotificationType.WARNING: "⚠️ [WARNING]",
+    NotificationType.CRITICAL: "🚨 [CRITICAL]",
+    NotificationType.BLOCKAGE: "🪵 [SURFACE OBSTRUCTION]",
+}
+FIRST_RETRY_DELAY_SECONDS = 5
+
+IntentKey = tuple[int, NotificationType]
+
+
+class NotificationIntentService:
+    """
+    Background delivery of fusion-triggered auto-notifications.
+    Fusion calls submit(), which records a pending notification_intents row and
+    queues its id; NOTIFICATION_DISPATCH_WORKERS workers then apply the
+    per-(location, type) cooldown, resolve the system template and the
+    responders with push subscriptions, and send. Sensor and camera ingest
+    therefore only pay for one INSERT, however many responders there are.
+
+    A key that already has an intent in flight, or is still cooling down, is
+    dropped in submit() without touching the database. The cooldown is armed
+    only by a successful send, so a missing template doesn't silence alerts,
+    and is checked against the table again right before sending.
+
+    A worker claims an intent (pending -> sending, one UPDATE) before
+    delivering it, so only one worker sends it however many queued it. A claim
+    older than NOTIFICATION_INTENT_CLAIM_TIMEOUT_SECONDS (its worker died
+    mid-send) goes back to pending on start(). Pending rows and recent sends
+    are reloaded on start(), so a restart neither loses an intent nor re-sends
+    inside a cooldown. Under FUSION_CLUSTER_MODE="postgres" that happens per
+    location instead, in adopt_locations(), when fusion_cluster claims it.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue[int] | None = None
+        self._workers: list[asyncio.Task] = []
+        self._last_sent: dict[IntentKey, float] = {}  # wall-clock epoch seconds
+        self._inflight: set[IntentKey] = set()
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            released = await notification_intent_crud.release_stale_claims(
+                db, claimed_before=now - timedelta(seconds=settings.NOTIFICATION_INTENT_CLAIM_TIMEOUT_SECONDS)
+            )
+            expired = await notification_intent_crud.expire_pending(
+                db, older_than=now - timedelta(minutes=settings.NOTIFICATION_INTENT_MAX_AGE_MINUTES)
+            )
+        if released:
+            print(f"📨 Released {released} notification intent(s) interrupted mid-send")
+        if expired:
+            print(f"📨 Expired {expired} stale notification intent(s)")
+        if not fusion_cluster.enabled:
+            await self.adopt_locations(None)
+
+        self._workers = [
+            asyncio.create_task(self._worker())
+            for _ in range(max(1, settings.NOTIFICATION_DISPATCH_WORKERS))
+        ]
+
+    async def stop(self) -> None:
+        # Intents still queued stay pending in the table for the next start().
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._inflight.clear()
+        NOTIFICATION_INTENT_QUEUE_DEPTH.set(0)
+
+    async def adopt_locations(self, location_ids: list[int] | None) -> None:
+        """Take over auto-notifications for these locations (None = all): load
+        their cooldowns from recent sends and queue their pending intents."""
+        if location_ids is not None and not location_ids:
+            return
+        since = datetime.now(timezone.utc) - timedelta(seconds=max(NOTIFY_COOLDOWN_SECONDS.values()))
+        async with AsyncSessionLocal() as db:
+            last_sent = await notification_intent_crud.get_last_sent(db, since=since, location_ids=location_ids)
+            pending = await notification_intent_crud.get_pending(db, location_ids=location_ids)
+
+        for key, sent_at in last_sent.items():
+            self._last_sent[key] = max(self._last_sent.get(key, 0.0), sent_at.timestamp())
+        if self._queue is None:
+            return
+        resumed = 0
+        for intent in pending:
+            key = (intent.location_id, intent.type)
+            if key in self._inflight:
+                continue
+            self._inflight.add(key)
+            self._put(intent.id)
+            resumed += 1
+        if resumed:
+            print(f"📨 Resuming {resumed} pending notification intent(s)")
+
+    async def submit(self, location_id: int, notification_type: NotificationType) -> None:
+        """Record an auto-notification for delivery in the background. Cheap
+        no-op while one is already in flight or the cooldown is running."""
+        key = (location_id, notification_type)
+        if key in self._inflight or self._cooling_down(key):
+            return
+        self._inflight.add(key)
+        try:
+            async with AsyncSessionLocal() as db:
+                intent_id = await notification_intent_crud.create_pending(
+                    db, location_id=location_id, notification_type=notification_type
+                )
+        except Exception:
+            self._inflight.discard(key)
+            raise
+        NOTIFICATION_INTENTS.labels(outcome="enqueued").inc()
+
+        if self._queue is None:
+            # Not started (e.g. scripts): the next start() picks the row up.
+            self._inflight.discard(key)
+            return
+        self._put(intent_id)
+
+    def _put(self, intent_id: int) -> None:
+        self._queue.put_nowait(intent_id)
+        NOTIFICATION_INTENT_QUEUE_DEPTH.inc()
+
+    def _cooling_down(self, key: IntentKey) -> bool:
+        last = self._last_sent.get(key)
+        return last is not None and time.time() - last < NOTIFY_COOLDOWN_SECONDS.get(key[1], 0)
+
+    async def _worker(self) -> None:
+        while True:
+            intent_id = await self._queue.get()
+            NOTIFICATION_INTENT_QUEUE_DEPTH.dec()
+            try:
+                await self._process(intent_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Notification intent %s could not be processed", intent_id)
+
+    async def _process(self, intent_id: int) -> None:
+        async with AsyncSessionLocal() as db:
+            intent = await notification_intent_crud.claim(db, intent_id)
+            if intent is None:
+                # Claimed by another worker, or already processed.
+                intent = await notification_intent_crud.get(db, intent_id)
+                if intent is not None:
+                    self._inflight.discard((intent.location_id, intent.type))
+                return
+            key = (intent.location_id, intent.type)
+
+            try:
+                outcome, error = await self._deliver(db, intent)
+            except Exception as e:
+                await db.rollback()
+                intent = await notification_intent_crud.get(db, intent_id)
+                intent.attempts += 1
+                if intent.attempts < settings.NOTIFICATION_INTENT_MAX_ATTEMPTS:
+                    await notification_intent_crud.mark(db, intent, NotificationIntentStatus.PENDING, str(e))
+                    NOTIFICATION_INTENTS.labels(outcome="retry").inc()
+                    delay = FIRST_RETRY_DELAY_SECONDS * 2 ** (intent.attempts - 1)
+                    print(f"⚠️ Auto-notify {intent.type.value} failed ({e}); retrying in {delay}s")
+                    asyncio.get_running_loop().call_later(delay, self._retry, intent_id)
+                    return
+                outcome, error = NotificationIntentStatus.FAILED, str(e)
+                print(f"⚠️ Auto-notify {intent.type.value} failed permanently: {e}")
+
+            await notification_intent_crud.mark(db, intent, outcome, error)
+            NOTIFICATION_INTENTS.labels(outcome=outcome.value).inc()
+            if outcome == NotificationIntentStatus.SENT:
+                self._last_sent[key] = time.time()
+            self._inflight.discard(key)
+
+    def _retry(self, intent_id: int) -> None:
+        if self._queue is not None:
+            self._put(intent_id)
+
+    async def _deliver(self, db: AsyncSession, intent: NotificationIntent) -> tuple[NotificationIntentStatus, str | None]:
+        """Send the system template for the intent's type to every responder with
+        a push subscription."""
+        key = (intent.location_id, intent.type)
+        if self._cooling_down(key):
+            return NotificationIntentStatus.SKIPPED, "Cooldown"
+        # Another worker may have sent this key (e.g. before the location moved here).
+        cooldown = NOTIFY_COOLDOWN_SECONDS.get(intent.type, 0)
+        last_sent = await notification_intent_crud.get_last_sent(
+            db, since=datetime.now(timezone.utc) - timedelta(seconds=cooldown), location_ids=[intent.location_id]
+        )
+        if key in last_sent:
+            self._last_sent[key] = last_sent[key].timestamp()
+            return NotificationIntentStatus.SKIPPED, "Cooldown"
+
+        template = await notification_template_crud.get_by_type(db=db, notification_type=intent.type)
+        if not template:
+            print(f"⚠️ No system template configured for {intent.type.value} — skipping auto-notify")
+            return NotificationIntentStatus.SKIPPED, "No system template configured"
+
+        responder_ids = await responder_crud.get_responder_ids_with_push_subscription(db=db)
+        if not responder_ids:
+            return NotificationIntentStatus.SKIPPED, "No responders with push subscriptions"
+
+        payload = SendNotificationSchema(
+            responder_ids=responder_ids,
+            template_id=template.id,
+            custom_notification=None,
+            system_initiated=True,
+        )
+        await notification_service.send_notification_to_subscribers(payload=payload, db=db)
+        print(
+            f"{LOG_LABELS.get(intent.type, intent.type.value)} Auto-notified "
+            f"{len(responder_ids)} responders (location {intent.location_id})"
+        )
+        return NotificationIntentStatus.SENT, None
+
+
+notification_intent_service = NotificationIntentService()
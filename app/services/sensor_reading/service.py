@@ -160,6 +160,13 @@ class SensorReadingService:
         prev_reading = await sensor_reading_crud.get_previous_reading(
             db=db, before_timestamp=reading.timestamp
         )
+        return await self.summarize_reading(db=db, reading=reading, prev_reading=prev_reading)
+
+    async def summarize_reading(
+        self, db: AsyncSession, reading: SensorReading, prev_reading: SensorReading | None
+    ) -> SensorReadingSummary:
+        """calculate_record_summary with the previous reading already loaded
+        (the fusion warm start fetches both in bulk)."""
         water_level_summary = self._calculate_water_level_summary(
             current_cm=reading.water_level_cm, prev_reading=prev_reading
         )
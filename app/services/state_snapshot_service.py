@@ -0,0 +1,112 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.state import fusion_state_manager
+from app.services.ml_service import ml_service
+
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = Path(__file__).parent.parent / "storage" / "state_snapshot.json"
+# Bump when the layout of a section changes; older files are ignored.
+SNAPSHOT_VERSION = 1
+
+
+class StateSnapshotService:
+    """
+    Keeps the in-memory fusion and ML state across restarts.
+    Every STATE_SNAPSHOT_INTERVAL_SECONDS, and once more on shutdown, the
+    fusion inputs per location and MLService's confidence windows, elevated
+    cadence deadlines and last processed times are written to one JSON file
+    (atomically, like the frame spool). restore() reads it back once at
+    startup; a file from another SNAPSHOT_VERSION or older than
+    STATE_SNAPSHOT_MAX_AGE_SECONDS is ignored and locations cold-start from
+    the DB. Notification cooldowns are not included: they are rebuilt from
+    notification_intents.
+
+    Layout: {"version", "saved_at" (epoch seconds), "fusion": {location_id: {...}},
+    "ml": {...}}.
+    """
+
+    def __init__(self, path: Path = SNAPSHOT_PATH):
+        self._path = Path(settings.STATE_SNAPSHOT_PATH) if settings.STATE_SNAPSHOT_PATH else path
+        self._task: asyncio.Task | None = None
+
+    def restore(self) -> dict[int, dict] | None:
+        """Apply the ML section of a valid snapshot and return its fusion section
+        for fusion_state_manager.start_all_states(); None when there is none."""
+        try:
+            snapshot = json.loads(self._path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable state snapshot %s: %s", self._path, e)
+            return None
+
+        version = snapshot.get("version") if isinstance(snapshot, dict) else None
+        if version != SNAPSHOT_VERSION:
+            print(f"⚠️ State snapshot has version {version}, expected {SNAPSHOT_VERSION}; cold start")
+            return None
+        age = time.time() - snapshot.get("saved_at", 0)
+        if age > settings.STATE_SNAPSHOT_MAX_AGE_SECONDS:
+            print(f"⚠️ State snapshot is {age:.0f}s old; cold start")
+            return None
+
+        try:
+            ml_service.restore_state(snapshot.get("ml", {}))
+        except Exception as e:
+            logger.warning("Could not restore ML state from snapshot: %s", e)
+        print(f"💾 Restoring state snapshot saved {age:.0f}s ago")
+        return {int(location_id): entry for location_id, entry in snapshot.get("fusion", {}).items()}
+
+    async def start(self) -> None:
+        if self._task is None and settings.STATE_SNAPSHOT_INTERVAL_SECONDS > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.save()
+        except Exception:
+            logger.exception("Final state snapshot failed")
+
+    async def save(self) -> None:
+        # Collected synchronously on the event loop, so the sections are consistent.
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": time.time(),
+            "fusion": fusion_state_manager.snapshot_states(),
+            "ml": ml_service.snapshot_state(),
+        }
+        data = json.dumps(snapshot, separators=(",", ":")).encode()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_atomic, self._path, data)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.STATE_SNAPSHOT_INTERVAL_SECONDS)
+            try:
+                await self.save()
+            except Exception:
+                logger.exception("Periodic state snapshot failed")
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+state_snapshot_service = StateSnapshotService()
@@ -0,0 +1 @@
+from .frame_slot import LatestFrameSlot
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Any
+
+
+class LatestFrameSlot:
+    """
+    Single-item mailbox between a camera socket's receive loop and a consumer.
+    `put` never blocks: a frame the consumer hasn't taken yet is overwritten,
+    so a slow consumer always picks up the newest frame instead of a backlog.
+    """
+
+    def __init__(self):
+        self._item: Any = None
+        self._has_item = asyncio.Event()
+        self._closed = False
+        self.overwritten = 0
+
+    def put(self, item: Any) -> bool:
+        """Store `item`; returns True if it replaced a frame nobody consumed."""
+        replaced = self._item is not None
+        if replaced:
+            self.overwritten += 1
+        self._item = item
+        self._has_item.set()
+        return replaced
+
+    async def get(self) -> Any:
+        """Wait for and take the latest frame. Returns None once closed."""
+        while self._item is None:
+            if self._closed:
+                return None
+            self._has_item.clear()
+            await self._has_item.wait()
+        item, self._item = self._item, None
+        return item
+
+    def close(self) -> None:
+        self._closed = True
+        self._has_item.set()
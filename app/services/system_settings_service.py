@@ -1,15 +1,23 @@
 from fastapi import HTTPException
+from pydantic import ValidationError
 from app.api.v1.dependencies import CurrentUser
 from app.schemas import SystemSettingsUpdate
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.crud import system_settings_crud
 from app.crud import admin_audit_log_crud
-from app.schemas import AdminAuditLogCreate
+from app.schemas import AdminAuditLogCreate, AlertThresholdsResponse
 
 class SystemSettingsService:
 
     async def update_setting(self, db: AsyncSession, key: str, value: SystemSettingsUpdate, current_user: CurrentUser) -> any:
         
+        thresholds = None
+        if key == "alert_thresholds":
+            try:
+                thresholds = AlertThresholdsResponse.model_validate(value.json_value)
+            except ValidationError:
+                raise HTTPException(status_code=422, detail="Invalid alert thresholds")
+
         settings = await system_settings_crud.get(db=db, key=key)
 
         if not settings:
@@ -27,6 +35,11 @@ class SystemSettingsService:
             action=audit_message
         ))
 
+        # Fusion reads thresholds from an in-memory snapshot; push the new one.
+        if thresholds is not None:
+            from app.core.state import fusion_state_manager
+            await fusion_state_manager.update_alert_thresholds(thresholds)
+
         return updated_settings.json_value
 
 
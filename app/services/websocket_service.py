@@ -3,14 +3,13 @@ from app.schemas import WeatherConditionResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services import sensor_reading_service
 from app.services import weather_service
-from fastapi import WebSocket
 from app.models import SensorReading
 from app.crud import sensor_reading_crud
 from app.crud import model_readings_crud
 from app.crud import weather_crud
 from datetime import timedelta, datetime, timezone
 from app.core.config import settings
-from app.core.ws_manager import ws_manager
+from app.core.ws_manager import ws_manager, ClientConnection
 from app.services.cache_service import cache_service
 from app.core.state import fusion_state_manager
 from app.schemas import DevicePerLocation
@@ -18,32 +17,34 @@ from app.schemas import DevicePerLocation
 
 class WebSocketService:
 
-    async def send_initial_data(self, websocket: WebSocket, db: AsyncSession, location_id: int):
+    async def send_initial_data(self, client: ClientConnection, db: AsyncSession, location_id: int):
+        """Latest sensor, blockage, weather and fusion state for a new client.
+        Queued on the client like any broadcast, so its writer sends everything in order."""
 
         device_ids: DevicePerLocation = await cache_service.get_device_ids_per_location(db=db, location_id=location_id)
         if not device_ids:
             raise ValueError(f"No device IDs found for location ID {location_id}")
 
         initial_sensor_reading_data = await self._get_initial_sensor_reading_data(db=db, sensor_device_id=device_ids.sensor_device_id)
-        await websocket.send_json({
+        ws_manager.send_to_client(client, location_id, {
             "type": "sensor_update",
             "data": initial_sensor_reading_data.model_dump(mode='json')
         })
 
         initial_model_reading_data = await self._get_initial_model_reading_data(db=db, camera_device_id=device_ids.camera_device_id)
-        await websocket.send_json({
+        ws_manager.send_to_client(client, location_id, {
             "type": "blockage_detection_update",
             "data": initial_model_reading_data.model_dump(mode='json')
         })
 
         initial_weather_condition_data = await self._get_initial_weather_data(db=db, location_id=location_id)
-        await websocket.send_json({
+        ws_manager.send_to_client(client, location_id, {
             "type": "weather_update",
             "data": initial_weather_condition_data.model_dump(mode='json')
         })
 
         initial_fusion_analysis_data = await self._get_initial_fusion_analysis_data(location_id=location_id)
-        await websocket.send_json({
+        ws_manager.send_to_client(client, location_id, {
             "type": "fusion_analysis_update",
             "data": initial_fusion_analysis_data.model_dump(mode='json')
         })
@@ -159,6 +160,24 @@ class WebSocketService:
         )
 
 
+    async def broadcast_fusion_update(self, location_id: int, data: dict, patch: dict | None, seq: int):
+
+        await ws_manager.broadcast_fusion(location_id=location_id, data=data, patch=patch, seq=seq)
+
+
+    async def send_fusion_snapshot(self, client: ClientConnection, location_id: int):
+        """Full fusion state tagged with its seq, for delta clients joining or
+        resyncing; later fusion_analysis_delta messages build on this seq.
+        Read and queued without yielding, so every delta already queued is
+        older than the snapshot and every later one newer."""
+
+        snapshot = fusion_state_manager.get_fusion_snapshot(location_id=location_id)
+        if snapshot is None:
+            return
+        seq, data = snapshot
+        ws_manager.send_to_client(client, location_id, {"type": "fusion_analysis_update", "seq": seq, "data": data})
+
+
     async def broadcast_update(self, update_type: str, data: dict, location_id: int):
 
         await ws_manager.broadcast_to_location({
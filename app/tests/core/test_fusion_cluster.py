@@ -0,0 +1,114 @@
+import pytest
+
+from app.core import fusion_cluster as cluster_module
+from app.core.fusion_cluster import FusionCluster
+from app.core.metrics import FUSION_CLUSTER_MESSAGES
+from app.core.pg_notify import MAX_PAYLOAD_BYTES
+from app.core.ws_backplane import PostgresBackplane
+
+
+class FakeHub:
+    """Stands in for pg_notify_hub; every advisory lock is free."""
+
+    def __init__(self):
+        self.connected = False
+        self._running = False
+        self.handlers = {}
+        self.listeners = []
+        self.published = []
+
+    async def subscribe(self, channel, handler):
+        self.handlers[channel] = handler
+
+    def add_connection_listener(self, listener):
+        self.listeners.append(listener)
+
+    async def start(self):
+        if self._running:
+            return
+        self._running = True
+        self.connected = True
+        for listener in self.listeners:
+            await listener(True)
+
+    async def fetchval(self, query, *args):
+        return True
+
+    async def publish_many(self, channel, payloads):
+        if not self.connected:
+            raise ConnectionError("Postgres notify connection is down")
+        self.published.extend((channel, payload) for payload in payloads)
+
+
+class ReplicaManager:
+    def __init__(self):
+        self.applied = []
+
+    async def apply_replica(self, location_id, seq, payload):
+        self.applied.append((location_id, seq, payload))
+
+
+@pytest.fixture
+def cluster_mode(monkeypatch):
+    monkeypatch.setattr(cluster_module.settings, "FUSION_CLUSTER_MODE", "postgres")
+    monkeypatch.setattr(cluster_module.settings, "FUSION_CLUSTER_WORKERS", 1)
+
+
+@pytest.mark.asyncio
+async def test_claims_when_backplane_started_the_hub_first(cluster_mode, monkeypatch):
+    adopted = []
+
+    async def adopt(self, location_ids):
+        adopted.extend(location_ids)
+
+    monkeypatch.setattr(FusionCluster, "_adopt_notifications", adopt)
+    hub = FakeHub()
+
+    async def deliver(broadcast):
+        pass
+
+    await PostgresBackplane(hub).start(deliver)
+    cluster = FusionCluster(hub)
+    await cluster.start(manager=None, location_ids=[1, 2])
+    try:
+        assert cluster.owns(1) and cluster.owns(2)
+        assert sorted(adopted) == [1, 2]
+    finally:
+        await cluster.stop()
+
+
+@pytest.mark.asyncio
+async def test_state_over_the_payload_limit_reaches_replicas(cluster_mode):
+    owner_hub = FakeHub()
+    owner_hub.connected = True
+    owner = FusionCluster(owner_hub)
+    owner.worker_id = "owner:1"
+    owner._owned.add(7)
+    replica_hub = FakeHub()
+    replica = FusionCluster(replica_hub)
+    manager = ReplicaManager()
+    await replica.start(manager, location_ids=[])
+    payload = {"location_id": 7, "history": ["évacuation"] * 2000}
+
+    await owner.publish_state(7, seq=3, payload=payload)
+
+    assert len(owner_hub.published) > 1
+    for channel, chunk in owner_hub.published:
+        assert len(chunk.encode()) <= MAX_PAYLOAD_BYTES
+        await replica_hub.handlers[channel](chunk)
+    assert manager.applied == [(7, 3, payload)]
+    await replica.stop()
+
+
+@pytest.mark.asyncio
+async def test_unpublishable_state_is_counted_as_dropped(cluster_mode):
+    hub = FakeHub()  # never connected
+    cluster = FusionCluster(hub)
+    cluster._owned.add(1)
+    dropped = FUSION_CLUSTER_MESSAGES.labels(kind="state", direction="dropped")
+    before = dropped._value.get()
+
+    await cluster.publish_state(1, seq=1, payload={"score": 1})
+
+    assert dropped._value.get() == before + 1
+    assert hub.published == []
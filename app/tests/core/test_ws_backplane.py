@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.pg_notify import split_utf8
+from app.core.ws_backplane import Broadcast, PostgresBackplane, _decode, _encode
+
+
+class FakeHub:
+    """Stands in for pg_notify_hub: records NOTIFY payloads instead of sending them."""
+
+    connected = True
+
+    def __init__(self):
+        self.published = []
+        self.handler = None
+
+    async def subscribe(self, channel, handler):
+        self.handler = handler
+
+    async def start(self):
+        pass
+
+    async def publish_many(self, channel, payloads):
+        self.published.extend(payloads)
+
+
+def test_encode_decode_round_trips_texts():
+    broadcast = Broadcast(kind="fusion", location_id=3, texts=('{"a":"é|\\n"}', ""))
+
+    assert _decode(_encode(broadcast)) == broadcast
+
+
+def test_encode_decode_round_trips_camera_frame():
+    broadcast = Broadcast(
+        kind="camera",
+        location_id=1,
+        image=bytes(range(256)),
+        timestamp=datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    )
+
+    assert _decode(_encode(broadcast)) == broadcast
+
+
+def test_split_utf8_never_cuts_a_character():
+    data = ("a" + "水" * 10 + "🌧" * 5).encode()
+
+    for size in range(4, 12):
+        pieces = split_utf8(data, size)
+        assert all(len(piece.encode()) <= size for piece in pieces)
+        assert "".join(pieces).encode() == data
+
+
+def test_split_utf8_empty_gives_one_piece():
+    assert split_utf8(b"", 10) == [""]
+
+
+@pytest.mark.asyncio
+async def test_chunks_from_two_origins_are_reassembled(monkeypatch):
+    monkeypatch.setattr("app.core.pg_notify.CHUNK_BYTES", 16)
+    first = PostgresBackplane(FakeHub())
+    first.worker_id = "a:1"
+    second = PostgresBackplane(FakeHub())
+    second.worker_id = "b:2"
+    one = Broadcast(kind="text", location_id=1, texts=("ç" * 40,))
+    two = Broadcast(kind="text", location_id=2, texts=("rain " * 10,))
+    await first.publish(one)
+    await second.publish(two)
+    assert len(first._hub.published) > 1
+
+    received = []
+    receiver = PostgresBackplane(FakeHub())
+
+    async def deliver(broadcast):
+        received.append(broadcast)
+
+    await receiver.start(deliver)
+    interleaved = [p for pair in zip(first._hub.published, second._hub.published) for p in pair]
+    longer = max(first._hub.published, second._hub.published, key=len)
+    for payload in interleaved + longer[len(interleaved) // 2:]:
+        await receiver._hub.handler(payload)
+
+    assert sorted(received, key=lambda b: b.location_id) == [one, two]
+    assert receiver._chunks._partial == {}
+
+
+@pytest.mark.asyncio
+async def test_own_echo_is_ignored():
+    hub = FakeHub()
+    backplane = PostgresBackplane(hub)
+    received = []
+
+    async def deliver(broadcast):
+        received.append(broadcast)
+
+    await backplane.start(deliver)
+    await backplane.publish(Broadcast(kind="text", location_id=1, texts=("hi",)))
+    for payload in hub.published:
+        await hub.handler(payload)
+
+    assert received == []
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.ml.batcher import InferenceBatcher
+
+
+class RecordingRunner:
+    def __init__(self, delay: float = 0.0):
+        self.batches: list[list] = []
+        self.delay = delay
+
+    async def __call__(self, payloads: list) -> list:
+        self.batches.append(list(payloads))
+        await asyncio.sleep(self.delay)
+        return [payload * 10 for payload in payloads]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_runs_once_and_routes_results():
+    """Frames submitted together share one run; each caller gets its own result."""
+    runner = RecordingRunner()
+    batcher = InferenceBatcher(runner, max_batch_size=4, max_wait_ms=1000)
+
+    results = await asyncio.gather(*(batcher.submit(i, i) for i in range(4)))
+
+    assert results == [0, 10, 20, 30]
+    assert runner.batches == [[0, 1, 2, 3]]
+    await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushes_after_max_wait():
+    """A lone frame is not held back waiting for the batch to fill."""
+    runner = RecordingRunner()
+    batcher = InferenceBatcher(runner, max_batch_size=8, max_wait_ms=20)
+
+    result = await asyncio.wait_for(batcher.submit(1, 7), timeout=1)
+
+    assert result == 70
+    assert runner.batches == [[7]]
+    await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_run_batch_error_fails_every_frame():
+    async def failing(payloads):
+        raise ValueError("onnx")
+
+    batcher = InferenceBatcher(failing, max_batch_size=2, max_wait_ms=1000)
+    results = await asyncio.gather(batcher.submit(1, 1), batcher.submit(2, 2), return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_result_count_mismatch_is_an_error():
+    async def short(payloads):
+        return payloads[:1]
+
+    batcher = InferenceBatcher(short, max_batch_size=2, max_wait_ms=1000)
+    results = await asyncio.gather(batcher.submit(1, 1), batcher.submit(2, 2), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    await batcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_frames_of_a_batch_still_being_collected():
+    """Frames already taken off the queue must not leave their callers hanging."""
+    runner = RecordingRunner()
+    batcher = InferenceBatcher(runner, max_batch_size=8, max_wait_ms=10_000)
+    pending = [asyncio.create_task(batcher.submit(i, i)) for i in range(3)]
+    await asyncio.sleep(0.01)  # collector is now waiting for more frames
+
+    await asyncio.wait_for(batcher.stop(), timeout=1)
+    results = await asyncio.wait_for(asyncio.gather(*pending, return_exceptions=True), timeout=1)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert runner.batches == []
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_running_batch():
+    runner = RecordingRunner(delay=0.05)
+    batcher = InferenceBatcher(runner, max_batch_size=1, max_wait_ms=0)
+    task = asyncio.create_task(batcher.submit(1, 3))
+    await asyncio.sleep(0.01)
+
+    await batcher.stop()
+
+    assert await task == 30
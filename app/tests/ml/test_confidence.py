@@ -0,0 +1,77 @@
+from app.ml.confidence import ConfidenceWindows, WindowCounts
+
+
+def _push_all(windows: ConfidenceWindows, camera_device_id: int, statuses: list[str]) -> WindowCounts:
+    counts = WindowCounts(0, 0, 0)
+    for status in statuses:
+        counts = windows.push(camera_device_id, status)
+    return counts
+
+
+def test_oldest_reading_is_evicted_once_full():
+    windows = ConfidenceWindows(k=3)
+
+    assert _push_all(windows, 1, ["blocked", "partial", "clear"]) == WindowCounts(3, 1, 1)
+    # "blocked" drops out
+    assert windows.push(1, "clear") == WindowCounts(3, 0, 1)
+
+
+def test_unknown_status_counts_as_clear():
+    windows = ConfidenceWindows(k=2)
+
+    assert windows.push(1, "fog") == WindowCounts(1, 0, 0)
+
+
+def test_cameras_have_separate_windows_beyond_initial_capacity():
+    windows = ConfidenceWindows(k=2, capacity=1)
+    for camera_device_id in range(5):
+        windows.push(camera_device_id, "blocked" if camera_device_id % 2 else "clear")
+
+    assert windows.counts(3) == WindowCounts(1, 1, 0)
+    assert windows.counts(4) == WindowCounts(1, 0, 0)
+    assert windows.counts(99) == WindowCounts(0, 0, 0)
+
+
+def test_shrink_keeps_newest_readings():
+    windows = ConfidenceWindows(k=4)
+    # Wrap the ring so the newest readings don't start at slot 0.
+    _push_all(windows, 1, ["clear", "clear", "blocked", "partial", "blocked", "clear"])
+
+    windows.resize(2)
+
+    assert windows.k == 2
+    assert windows.counts(1) == WindowCounts(2, 1, 0)
+    assert windows.snapshot() == {1: "20"}
+    assert windows.push(1, "partial") == WindowCounts(2, 0, 1)
+
+
+def test_grow_keeps_partial_window_and_fills_up():
+    windows = ConfidenceWindows(k=2)
+    _push_all(windows, 1, ["partial", "blocked", "blocked"])
+
+    windows.resize(4)
+
+    assert windows.counts(1) == WindowCounts(2, 2, 0)
+    assert _push_all(windows, 1, ["clear", "partial"]) == WindowCounts(4, 2, 1)
+    assert windows.snapshot() == {1: "2201"}
+
+
+def test_snapshot_round_trip():
+    windows = ConfidenceWindows(k=3)
+    _push_all(windows, 7, ["clear", "partial", "blocked", "blocked"])
+
+    restored = ConfidenceWindows(k=3)
+    restored.restore(windows.snapshot())
+
+    assert restored.counts(7) == windows.counts(7)
+    assert restored.snapshot() == {7: "122"}
+
+
+def test_restore_trims_to_k_and_skips_live_cameras():
+    windows = ConfidenceWindows(k=2)
+    windows.push(1, "blocked")
+
+    windows.restore({1: "000", 2: "1122"})
+
+    assert windows.counts(1) == WindowCounts(1, 1, 0)
+    assert windows.snapshot()[2] == "22"
@@ -0,0 +1,104 @@
+import random
+from io import BytesIO
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.ml.detector import FrameDetector, roi_region
+
+
+BOX_ROI = ((0.25, 0.1), (0.75, 0.1), (0.75, 0.9), (0.25, 0.9))
+
+
+def test_roi_region_without_roi_is_whole_frame():
+    assert roi_region(None, 640, 480) == (0, 0, 640, 480)
+
+
+def test_roi_region_is_polygon_bounding_box():
+    polygon = ((0.5, 0.2), (0.9, 0.5), (0.1, 0.75))
+
+    # Floors the top-left corner and ceils the bottom-right one.
+    assert roi_region(polygon, 640, 480) == (64, 96, 576, 360)
+
+
+def test_roi_region_clamps_to_frame():
+    assert roi_region(((-0.2, -0.1), (1.3, 1.5)), 100, 50) == (0, 0, 100, 50)
+
+
+def test_roi_region_sliver_falls_back_to_whole_frame():
+    assert roi_region(((0.5, 0.1), (0.501, 0.9)), 100, 100) == (0, 0, 100, 100)
+
+
+@pytest.mark.parametrize(
+    "detections, expected",
+    [
+        ([], 0),
+        ([(10, 0, 20, 5, 0.9), (15, 0, 30, 5, 0.9)], 20),           # overlapping
+        ([(10, 0, 20, 5, 0.9), (20, 0, 30, 5, 0.9)], 20),           # touching
+        ([(10, 0, 40, 5, 0.9), (15, 0, 20, 5, 0.9)], 30),           # nested
+        ([(10, 0, 20, 5, 0.9), (50, 0, 60, 5, 0.9)], 20),           # disjoint
+        ([(-10, 0, 20, 5, 0.9), (90, 0, 150, 5, 0.9)], 30),         # clipped to [0, 100]
+        ([(10, 5, 20, 5, 0.9), (30, 0, 30, 5, 0.9)], 0),            # zero height / width
+    ],
+)
+def test_merged_width_vectorized_matches_cases(detections, expected):
+    assert FrameDetector._merged_width(detections, 0, 100) == expected
+    assert FrameDetector._merged_width_vectorized(detections, 0, 100) == expected
+
+
+def test_merged_width_vectorized_matches_scalar_on_random_boxes():
+    rng = random.Random(13)
+    for _ in range(200):
+        detections = []
+        for _ in range(rng.randint(1, 60)):
+            x1 = rng.uniform(-50, 650)
+            detections.append((x1, 0, x1 + rng.uniform(-5, 120), rng.uniform(-1, 10), 0.5))
+        left, right = sorted(rng.sample(range(0, 640), 2))
+        assert FrameDetector._merged_width_vectorized(detections, left, right) == FrameDetector._merged_width(
+            detections, left, right
+        )
+
+
+def test_coverage_is_relative_to_roi_width():
+    region = roi_region(BOX_ROI, 640, 480)  # x from 160 to 480
+
+    # Half of the box is outside the ROI and doesn't count.
+    assert FrameDetector._compute_coverage_pct([(80, 100, 240, 200, 0.9)], region) == 25.0
+
+
+class FakeSession:
+    """Fixed 64x64 single-frame model; `fail` makes every run raise."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="images", shape=[1, 3, 64, 64])]
+
+    def run(self, output_names, feeds):
+        if self.fail:
+            raise RuntimeError("session exploded")
+        return [np.zeros((len(feeds["images"]), 5, 8), dtype=np.float32)]
+
+
+def _jpeg(color=(90, 120, 150)):
+    buf = BytesIO()
+    Image.new("RGB", (128, 96), color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def test_run_batch_session_failure_returns_none_per_frame():
+    detector = FrameDetector(FakeSession(fail=True))
+
+    assert detector.run_batch([_jpeg(), _jpeg()]) == [None, None]
+
+
+def test_run_batch_bad_frame_does_not_fail_the_rest():
+    detector = FrameDetector(FakeSession())
+
+    results = detector.run_batch([_jpeg(), b"not a jpeg", _jpeg()])
+
+    assert results[1] is None
+    assert results[0] == results[2] == (0.0, "clear", [])
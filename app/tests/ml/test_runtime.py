@@ -0,0 +1,25 @@
+import sys
+
+from app.ml.runtime import SessionConfig, prepare_model
+
+
+def test_int8_without_onnx_falls_back_to_fp32(tmp_path, monkeypatch):
+    weights = tmp_path / "best.onnx"
+    weights.write_bytes(b"fp32")
+    monkeypatch.setitem(sys.modules, "onnx", None)  # import onnx -> ImportError
+
+    prepared = prepare_model(weights, SessionConfig(variant="int8", cache_optimized_model=False))
+
+    assert prepared.path == weights
+    assert not prepared.preoptimized
+
+
+def test_shipped_int8_weights_are_used_as_is(tmp_path, monkeypatch):
+    weights = tmp_path / "best.onnx"
+    weights.write_bytes(b"fp32")
+    (tmp_path / "best.int8.onnx").write_bytes(b"int8")
+    monkeypatch.setitem(sys.modules, "onnx", None)
+
+    prepared = prepare_model(weights, SessionConfig(variant="int8", cache_optimized_model=False))
+
+    assert prepared.path == tmp_path / "best.int8.onnx"
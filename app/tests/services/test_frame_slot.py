@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from app.services.stream import LatestFrameSlot
+
+
+@pytest.mark.asyncio
+async def test_unconsumed_frame_is_overwritten():
+    """A slow consumer gets the newest frame, not a backlog."""
+    slot = LatestFrameSlot()
+
+    assert slot.put("a") is False
+    assert slot.put("b") is True
+    assert slot.overwritten == 1
+    assert await slot.get() == "b"
+
+
+@pytest.mark.asyncio
+async def test_get_waits_for_next_frame():
+    slot = LatestFrameSlot()
+    waiter = asyncio.create_task(slot.get())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    slot.put("frame")
+
+    assert await asyncio.wait_for(waiter, timeout=1) == "frame"
+    assert slot.put("next") is False  # the taken frame doesn't count as overwritten
+
+
+@pytest.mark.asyncio
+async def test_close_wakes_consumer_with_none():
+    slot = LatestFrameSlot()
+    waiter = asyncio.create_task(slot.get())
+    await asyncio.sleep(0)
+
+    slot.close()
+
+    assert await asyncio.wait_for(waiter, timeout=1) is None
+
+
+@pytest.mark.asyncio
+async def test_frame_put_before_close_is_still_delivered():
+    slot = LatestFrameSlot()
+    slot.put("last")
+    slot.close()
+
+    assert await slot.get() == "last"
+    assert await slot.get() is None
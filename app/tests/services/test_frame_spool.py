@@ -0,0 +1,60 @@
+import importlib
+from datetime import datetime, timezone
+
+import pytest
+
+# app.services re-exports the frame_spool_service singleton under the module's name.
+spool_module = importlib.import_module("app.services.frame_spool_service")
+
+
+class FlakyStore:
+    """Raises an unexpected (non-FrameStoreError) error on the first save."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def save(self, image_bytes, public_id, captured_at):
+        self.calls += 1
+        if self.calls == 1:
+            raise KeyError("secure_url")
+        return f"https://frames.example/{public_id}.jpg"
+
+
+class FakeSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FlakyReadings:
+    """The first image_path patch fails (e.g. the database dropped the connection)."""
+
+    def __init__(self):
+        self.patched = []
+        self.failed = False
+
+    async def update_image_path(self, db, reading_id, image_path):
+        if not self.failed:
+            self.failed = True
+            raise ConnectionError("connection reset")
+        self.patched.append((reading_id, image_path))
+
+
+@pytest.mark.asyncio
+async def test_unexpected_errors_are_retried_until_the_reading_is_patched(tmp_path, monkeypatch):
+    store, readings = FlakyStore(), FlakyReadings()
+    monkeypatch.setattr(spool_module, "frame_store", store)
+    monkeypatch.setattr(spool_module, "model_readings_crud", readings)
+    monkeypatch.setattr(spool_module, "AsyncSessionLocal", FakeSession)
+    monkeypatch.setattr(spool_module, "FIRST_RETRY_DELAY_SECONDS", 0)
+    service = spool_module.FrameSpoolService(tmp_path)
+    await service.enqueue(7, "rpi_1_1700000000", b"jpeg", datetime.fromtimestamp(1700000000, tz=timezone.utc))
+    path = next(tmp_path.glob("*.jpg"))
+
+    await service._upload_with_retry(path)
+
+    assert store.calls == 2  # the successful upload isn't repeated for the failed patch
+    assert readings.patched == [(7, "https://frames.example/rpi_1_1700000000.jpg")]
+    assert not path.exists()
@@ -0,0 +1,72 @@
+import importlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+# app.services re-exports the ml_service singleton under the module's name.
+ml_module = importlib.import_module("app.services.ml_service")
+MLService = ml_module.MLService
+
+
+def _jpeg():
+    buf = BytesIO()
+    Image.new("RGB", (128, 96), (90, 120, 150)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """An MLService with a "loaded" model whose I/O (DB, sockets, fusion) is stubbed."""
+    monkeypatch.setattr(ml_module.settings, "SCENE_GATE_ENABLED", True)
+    svc = MLService()
+    svc._started = True
+    svc._active = object()
+    svc.persisted = []
+
+    async def no_roi(camera_device_id):
+        return None
+
+    async def persist(camera_device_id, now, pct, status, detections, image_bytes):
+        svc.persisted.append(status)
+
+    async def ignore(**kwargs):
+        pass
+
+    monkeypatch.setattr(svc, "_camera_roi", no_roi)
+    monkeypatch.setattr(svc, "_persist_reading", persist)
+    monkeypatch.setattr(ml_module.websocket_service, "broadcast_update", ignore)
+    monkeypatch.setattr(ml_module.fusion_state_manager, "recalculate_visual_status_score", ignore)
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_failed_frame_is_not_reused_for_the_next_one(service, monkeypatch):
+    results = [None, (72.0, "blocked", [])]
+    calls = []
+
+    async def infer(image_bytes, camera_device_id, roi):
+        calls.append(camera_device_id)
+        return results.pop(0)
+
+    monkeypatch.setattr(service, "_infer", infer)
+    frame = _jpeg()
+
+    await service.process_frame_bytes(frame, camera_device_id=1, location_id=1)
+    assert 1 not in service._scene_refs
+
+    service._last_processed.clear()  # skip the capture-interval throttle
+    await service.process_frame_bytes(frame, camera_device_id=1, location_id=1)
+
+    assert len(calls) == 2
+    assert service.persisted == ["clear", "blocked"]
+    assert service._scene_refs[1].status == "blocked"
+
+
+@pytest.mark.asyncio
+async def test_placeholder_output_never_becomes_a_scene_reference(service):
+    service._active = None  # no weights: placeholder predictions
+
+    await service.process_frame_bytes(_jpeg(), camera_device_id=2, location_id=1)
+
+    assert service._scene_refs == {}
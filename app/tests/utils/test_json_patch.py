@@ -0,0 +1,57 @@
+from app.utils.json_patch import apply_merge_patch, merge_patch
+
+
+def test_identical_documents_give_empty_patch():
+    doc = {"a": 1, "nested": {"b": [1, 2]}}
+
+    assert merge_patch(doc, dict(doc)) == {}
+
+
+def test_only_changed_nested_keys_are_sent():
+    old = {"fusion_data": {"score": 10, "alert_name": "Normal"}, "status": "success"}
+    new = {"fusion_data": {"score": 55, "alert_name": "Normal"}, "status": "success"}
+
+    assert merge_patch(old, new) == {"fusion_data": {"score": 55}}
+
+
+def test_lists_are_replaced_whole():
+    assert merge_patch({"boxes": [1, 2, 3]}, {"boxes": [1, 2]}) == {"boxes": [1, 2]}
+
+
+def test_removed_key_becomes_null():
+    old = {"a": 1, "gone": {"x": 1}}
+    new = {"a": 1}
+
+    patch = merge_patch(old, new)
+
+    assert patch == {"gone": None}
+    assert apply_merge_patch(old, patch) == new
+
+
+def test_value_turning_null_is_removed_on_apply():
+    """RFC 7396 can't tell "set to null" from "removed"; clients see the key disappear."""
+    old = {"weather_status": {"condition": "Rain"}, "score": 1}
+    new = {"weather_status": None, "score": 1}
+
+    patch = merge_patch(old, new)
+
+    assert patch == {"weather_status": None}
+    assert apply_merge_patch(old, patch) == {"score": 1}
+
+
+def test_object_replacing_scalar_and_back():
+    old = {"a": 1, "b": {"c": 1}}
+    new = {"a": {"x": 1}, "b": 2}
+
+    patch = merge_patch(old, new)
+
+    assert patch == {"a": {"x": 1}, "b": 2}
+    assert apply_merge_patch(old, patch) == new
+
+
+def test_round_trip_restores_new_document():
+    old = {"seq": 1, "data": {"water": {"level": 1.2, "trend": "rising"}, "blockage": {"status": "clear"}}}
+    new = {"seq": 2, "data": {"water": {"level": 1.4, "trend": "rising"}, "weather": {"mm": 3}}}
+
+    assert apply_merge_patch(old, merge_patch(old, new)) == new
+    assert old["data"]["water"]["level"] == 1.2  # inputs are not mutated
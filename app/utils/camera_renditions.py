@@ -0,0 +1,41 @@
+from io import BytesIO
+
+# Preview renditions relayed to dashboards: name -> bounding box (max width, max height).
+# None means the camera's original JPEG, passed through untouched.
+CAMERA_RENDITIONS: dict[str, tuple[int, int] | None] = {
+    "thumbnail": (320, 240),
+    "medium": (960, 720),
+    "original": None,
+}
+DEFAULT_RENDITION = "original"
+RENDITION_JPEG_QUALITY = 75
+
+
+def build_renditions(image_bytes: bytes, names: set[str]) -> dict[str, bytes]:
+    """Produce each requested rendition of a JPEG frame once.
+
+    Downscaled renditions use Pillow's draft mode, so the JPEG is decoded
+    directly at 1/2, 1/4 or 1/8 scale instead of at full size. A rendition
+    whose box is not smaller than the frame reuses the original bytes.
+    CPU-bound — call from an executor."""
+    from PIL import Image
+
+    out: dict[str, bytes] = {}
+    for name in names:
+        box = CAMERA_RENDITIONS.get(name)
+        if box is None:
+            out[name] = image_bytes
+            continue
+
+        img = Image.open(BytesIO(image_bytes))
+        if img.width <= box[0] and img.height <= box[1]:
+            out[name] = image_bytes
+            continue
+
+        img.draft("RGB", box)
+        img = img.convert("RGB")
+        img.thumbnail(box)
+        buf = BytesIO()
+        img.save(buf, format="JPEG", quality=RENDITION_JPEG_QUALITY)
+        out[name] = buf.getvalue()
+    return out
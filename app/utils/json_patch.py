@@ -0,0 +1,35 @@
+from typing import Any
+
+
+def merge_patch(old: dict, new: dict) -> dict:
+    """JSON Merge Patch (RFC 7396) turning `old` into `new`: only keys whose
+    value changed, recursing into nested objects. Lists are replaced whole and
+    a null value means the key was removed (or became null)."""
+    patch: dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            patch[key] = merge_patch(previous, value)
+        else:
+            patch[key] = value
+    for key in old.keys() - new.keys():
+        patch[key] = None
+    return patch
+
+
+def apply_merge_patch(target: Any, patch: Any) -> Any:
+    """Apply a merge patch (what a client does with a fusion_analysis_delta)."""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
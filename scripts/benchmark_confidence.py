@@ -0,0 +1,152 @@
+"""
+Microbenchmark for the per-frame confidence and coverage math.
+
+Compares the previous pure-Python implementations with the current ones:
+
+  window    per-camera deque recounted with generator sums on every reading
+            vs ConfidenceWindows (shared ring array + running counts)
+  coverage  sorted Python loop merging detection spans
+            vs the vectorized merge in FrameDetector._compute_coverage_pct
+
+at several window sizes / camera counts and detection counts, and reports the
+mean cost per call in microseconds.
+
+    python scripts/benchmark_confidence.py
+    python scripts/benchmark_confidence.py --windows 5,50,500 --cameras 1,50,500 --detections 2,20,200
+"""
+import argparse
+import random
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.ml.confidence import ConfidenceWindows
+from app.ml.detector import FrameDetector
+
+
+STATUSES = ("clear", "partial", "blocked")
+PARTIAL_WEIGHT = 0.5
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Confidence window / coverage microbenchmark")
+    parser.add_argument("--windows", default="5,50,500", help="Comma-separated window sizes (K)")
+    parser.add_argument("--cameras", default="1,50,500", help="Comma-separated camera counts")
+    parser.add_argument("--detections", default="2,20,200", help="Comma-separated detections per frame")
+    parser.add_argument("--readings", type=int, default=50_000, help="Readings pushed per window case")
+    parser.add_argument("--frames", type=int, default=5_000, help="Frames per coverage case")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+# ── Previous implementations ────────────────────────────────────────────────
+def legacy_window(windows: dict[int, deque], camera_id: int, status: str, k: int) -> tuple[int, float, bool]:
+    buf = windows.get(camera_id)
+    if buf is None or buf.maxlen != k:
+        buf = deque(buf or [], maxlen=k)
+        windows[camera_id] = buf
+    buf.append(status)
+    flagged = sum(1 for s in buf if s != "clear")
+    weighted = sum(1.0 if s == "blocked" else (PARTIAL_WEIGHT if s == "partial" else 0.0) for s in buf)
+    return flagged, weighted / k, len(buf) >= k
+
+
+def legacy_coverage(detections, region) -> float:
+    left, _, right, _ = region
+    w = right - left
+    if not detections:
+        return 0.0
+    spans = []
+    for x1, y1, x2, y2, _ in detections:
+        x1i, x2i = max(left, int(x1)), min(right, int(x2))
+        if x2i > x1i and y2 > y1:
+            spans.append((x1i, x2i))
+    if not spans:
+        return 0.0
+    spans.sort()
+    merged = []
+    for start, end in spans:
+        if not merged or start > merged[-1][1]:
+            merged.append([start, end])
+        else:
+            merged[-1][1] = max(merged[-1][1], end)
+    return round(100.0 * float(sum(end - start for start, end in merged)) / float(w), 2)
+
+
+# ── Current implementations ─────────────────────────────────────────────────
+def array_window(windows: ConfidenceWindows, camera_id: int, status: str, k: int) -> tuple[int, float, bool]:
+    counts = windows.push(camera_id, status)
+    weighted = counts.blocked + PARTIAL_WEIGHT * counts.partial
+    return counts.blocked + counts.partial, weighted / k, counts.filled >= k
+
+
+def time_per_call(fn, calls) -> float:
+    started = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    return (time.perf_counter() - started) / len(calls) * 1e6
+
+
+def bench_windows(k: int, cameras: int, readings: int, rng: random.Random) -> tuple[float, float]:
+    stream = [(rng.randrange(cameras), rng.choice(STATUSES)) for _ in range(readings)]
+    legacy: dict[int, deque] = {}
+    current = ConfidenceWindows(k)
+    legacy_us = time_per_call(lambda cam, st: legacy_window(legacy, cam, st, k), stream)
+    array_us = time_per_call(lambda cam, st: array_window(current, cam, st, k), stream)
+    for cam in range(cameras):
+        # Same window contents -> same flagged count.
+        buf = legacy.get(cam, ())
+        assert current.counts(cam).blocked + current.counts(cam).partial == sum(1 for s in buf if s != "clear")
+    return legacy_us, array_us
+
+
+def random_detections(n: int, rng: random.Random) -> list[tuple]:
+    out = []
+    for _ in range(n):
+        x1, y1 = rng.uniform(0, 600), rng.uniform(0, 440)
+        out.append((x1, y1, x1 + rng.uniform(5, 200), y1 + rng.uniform(5, 100), rng.random()))
+    return out
+
+
+def bench_coverage(n: int, frames: int, rng: random.Random) -> tuple[float, float]:
+    region = (0, 0, 640, 480)
+    calls = [(random_detections(n, rng), region) for _ in range(frames)]
+    for detections, _ in calls[:100]:
+        assert legacy_coverage(detections, region) == FrameDetector._compute_coverage_pct(detections, region)
+    return (
+        time_per_call(legacy_coverage, calls),
+        time_per_call(FrameDetector._compute_coverage_pct, calls),
+    )
+
+
+def print_row(label: str, legacy_us: float, current_us: float) -> None:
+    print(f"   {label:<24}{legacy_us:>12.2f}{current_us:>12.2f}{legacy_us / current_us:>9.1f}x")
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    header = f"   {'case':<24}{'legacy us':>12}{'current us':>12}{'speedup':>10}"
+
+    print("\n📊 Confidence window (per reading)")
+    print(header)
+    for k in ints(args.windows):
+        for cameras in ints(args.cameras):
+            print_row(f"K={k} cameras={cameras}", *bench_windows(k, cameras, args.readings, rng))
+
+    print("\n📊 Span coverage (per frame)")
+    print(header)
+    for n in ints(args.detections):
+        print_row(f"detections={n}", *bench_coverage(n, args.frames, rng))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Per-stage benchmark for the ML inference pipeline.
+
+Runs every JPEG in a directory through the same stages as
+FrameDetector.run_batch — decode, preprocess, session.run, postprocess/NMS —
+at one or more camera resolutions, and reports p50/p95/p99 per stage plus
+overall frames per second. `render` (box drawing + JPEG encode) is timed
+separately: it runs on demand when an annotated frame is requested, so it is
+not part of `total` or fps.
+
+    python scripts/benchmark_inference.py --frames samples/ --resolutions native,1280x720,1920x1080
+    python scripts/benchmark_inference.py --frames samples/ --save-baseline bench.json
+    python scripts/benchmark_inference.py --frames samples/ --compare bench.json --tolerance 0.15
+
+--compare exits with status 1 when any stage's p50 or p95 is slower than the
+baseline by more than --tolerance (fractional), so it can gate preprocessing or
+NMS changes in CI. Baselines are only comparable on the same machine.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.ml.detector import WEIGHTS_PATH, FrameDetector, Roi, pack_detections, render_annotated
+from app.ml.runtime import SessionConfig, prepare_model
+
+
+STAGES = ("decode", "preprocess", "inference", "postprocess", "total", "render")
+PERCENTILES = (50, 95, 99)
+BASELINE_VERSION = 3
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-stage ML inference benchmark")
+    parser.add_argument("--frames", type=Path, required=True, help="Directory of sample .jpg/.jpeg frames")
+    parser.add_argument("--weights", type=Path, default=WEIGHTS_PATH)
+    parser.add_argument(
+        "--resolutions", default="native",
+        help="Comma-separated WxH list; 'native' keeps the frames as they are (default: native)",
+    )
+    parser.add_argument("--iterations", type=int, default=5, help="Passes over the frame set per resolution")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed frames before measuring")
+    parser.add_argument("--variant", default="fp32", choices=("fp32", "int8"))
+    parser.add_argument("--graph-optimization", default="all", choices=("disable", "basic", "extended", "all"))
+    parser.add_argument("--intra-threads", type=int, default=0)
+    parser.add_argument("--inter-threads", type=int, default=1)
+    parser.add_argument("--no-draft", action="store_true", help="Full-resolution JPEG decode (INFERENCE_DRAFT_DECODE=false)")
+    parser.add_argument("--input-size", type=int, default=0, help="Model input for dynamic-shape exports")
+    parser.add_argument(
+        "--roi", help="ROI polygon as normalized x,y pairs, e.g. '0.1,0.4 0.9,0.4 0.9,1 0.1,1'",
+    )
+    parser.add_argument("--save-baseline", type=Path, help="Write results as a JSON baseline")
+    parser.add_argument("--compare", type=Path, help="Compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown vs baseline (0.15 = 15%%)")
+    return parser.parse_args()
+
+
+def load_frames(directory: Path, resolution: str) -> list[bytes]:
+    paths = sorted(p for p in directory.iterdir() if p.suffix.lower() in (".jpg", ".jpeg"))
+    frames = [p.read_bytes() for p in paths]
+    if resolution == "native":
+        return frames
+
+    w, h = (int(v) for v in resolution.lower().split("x"))
+    resized = []
+    for data in frames:
+        buf = BytesIO()
+        Image.open(BytesIO(data)).convert("RGB").resize((w, h), Image.BILINEAR).save(buf, format="JPEG", quality=85)
+        resized.append(buf.getvalue())
+    return resized
+
+
+def run_frame(detector: FrameDetector, image_bytes: bytes, roi: Roi | None = None) -> dict[str, float]:
+    """One frame through the run_batch stages, timed separately (seconds),
+    plus the on-demand render of its annotated frame."""
+    timings = {}
+    canvas, batch = detector._buffers(1)
+
+    t0 = time.perf_counter()
+    img, orig_shape, region = detector._decode(image_bytes, roi)
+    t1 = time.perf_counter()
+    scale, pad = detector._preprocess(img, orig_shape, region, roi, canvas, batch[0])
+    t2 = time.perf_counter()
+    output = detector._run_session(batch[:1])
+    t3 = time.perf_counter()
+    detections = detector._postprocess(output[0:1], scale, pad, region)
+    detector._compute_coverage_pct(detections, region)
+    t4 = time.perf_counter()
+    render_annotated(image_bytes, pack_detections(detections, roi))
+    t5 = time.perf_counter()
+
+    timings["decode"] = t1 - t0
+    timings["preprocess"] = t2 - t1
+    timings["inference"] = t3 - t2
+    timings["postprocess"] = t4 - t3
+    timings["total"] = t4 - t0
+    timings["render"] = t5 - t4
+    return timings
+
+
+def summarize(samples: dict[str, list[float]]) -> dict:
+    stages = {}
+    for stage in STAGES:
+        values_ms = np.array(samples[stage]) * 1000.0
+        stages[stage] = {f"p{p}": round(float(np.percentile(values_ms, p)), 3) for p in PERCENTILES}
+        stages[stage]["mean"] = round(float(values_ms.mean()), 3)
+    total_seconds = sum(samples["total"])
+    return {
+        "frames": len(samples["total"]),
+        "fps": round(len(samples["total"]) / total_seconds, 2) if total_seconds else 0.0,
+        "stages_ms": stages,
+    }
+
+
+def benchmark(
+    detector: FrameDetector, frames: list[bytes], iterations: int, warmup: int, roi: Roi | None
+) -> dict:
+    for i in range(warmup):
+        run_frame(detector, frames[i % len(frames)], roi)
+
+    samples: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    for _ in range(iterations):
+        for frame in frames:
+            for stage, seconds in run_frame(detector, frame, roi).items():
+                samples[stage].append(seconds)
+    return summarize(samples)
+
+
+def print_report(resolution: str, result: dict) -> None:
+    print(f"\n📐 {resolution}: {result['frames']} frames, {result['fps']} fps")
+    print(f"   {'stage':<12}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES))
+    for stage in STAGES:
+        row = result["stages_ms"][stage]
+        print(f"   {stage:<12}" + "".join(f"{row[f'p{p}']:>10.2f}" for p in PERCENTILES))
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for resolution, result in results.items():
+        base = baseline["results"].get(resolution)
+        if base is None:
+            continue
+        for stage in STAGES:
+            for key in ("p50", "p95"):
+                old = base["stages_ms"][stage][key]
+                new = result["stages_ms"][stage][key]
+                if old > 0 and new > old * (1 + tolerance):
+                    regressions.append(
+                        f"{resolution} {stage} {key}: {old:.2f} ms -> {new:.2f} ms (+{100 * (new / old - 1):.0f}%)"
+                    )
+    return regressions
+
+
+def main():
+    args = parse_args()
+
+    config = SessionConfig(
+        variant=args.variant,
+        graph_optimization=args.graph_optimization,
+        intra_op_threads=args.intra_threads,
+        inter_op_threads=args.inter_threads,
+        warmup_runs=args.warmup,
+        draft_decode=not args.no_draft,
+        input_size=args.input_size,
+    )
+    roi = tuple(tuple(float(v) for v in point.split(",")) for point in args.roi.split()) if args.roi else None
+    model = prepare_model(args.weights, config)
+    detector = FrameDetector.load(model.path, config, model.preoptimized)
+    if detector is None:
+        print(f"❌ Could not load ONNX model from {args.weights}")
+        sys.exit(2)
+    detector.warm_up()
+
+    results = {}
+    for resolution in [r.strip() for r in args.resolutions.split(",") if r.strip()]:
+        frames = load_frames(args.frames, resolution)
+        if not frames:
+            print(f"❌ No .jpg frames found in {args.frames}")
+            sys.exit(2)
+        results[resolution] = benchmark(detector, frames, args.iterations, args.warmup, roi)
+        print_report(resolution, results[resolution])
+
+    report = {
+        "version": BASELINE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "machine": {"platform": platform.platform(), "processor": platform.processor(), "python": platform.python_version()},
+        "model": detector.describe().report(),
+        "results": results,
+    }
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Baseline written to {args.save_baseline}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("version") != BASELINE_VERSION:
+            print(f"❌ Baseline version {baseline.get('version')} is not {BASELINE_VERSION}")
+            sys.exit(2)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} vs {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -59,6 +59,7 @@ async def seed_db():
                 {"key": "data_retention_days", "json_value": 30},
                 {"key": "alert_retention_days", "json_value": 60},
                 {"key": "alert_retention_max", "json_value": 50},
+                {"key": "ml_model_version", "json_value": "default"},
             ]
             for setting in settings:
                 existing_setting = await db.execute(
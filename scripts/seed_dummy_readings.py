@@ -22,6 +22,7 @@ from app.crud.daily_summary import daily_summary_crud
 from app.models import CameraDevice, DailySummary, ModelReadings, SensorDevice, SensorReading, Weather
 from app.services.daily_summary.service import daily_summary_service
 from app.services.ml_service import ml_service
+from app.ml.detector import pack_detections, render_annotated
 
 
 # ============================================
@@ -189,7 +190,15 @@ async def _prepare_model_image_assets(images: list[Path]) -> list[ModelImageAsse
         upload_bytes = image_bytes
 
         if USE_ML_MODEL_FOR_IMAGES:
-            blockage_percentage, blockage_status, upload_bytes = await ml_service._infer_and_annotate(image_bytes)
+            result = await ml_service._infer(image_bytes, camera_device_id=0, roi=None)
+            if result is None:
+                print(f"⚠️ Inference failed for {path.name}; seeding it as clear")
+                detections = []
+            else:
+                blockage_percentage, blockage_status, detections = result
+            if detections:
+                # Seeded rows carry no detections, so upload the annotated frame.
+                upload_bytes = render_annotated(image_bytes, pack_detections(detections, None))
 
         print(
             f"Uploading dummy image {index}/{len(images)}: {path.name} "